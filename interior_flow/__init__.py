@@ -0,0 +1,9 @@
+"""Floorplan sketch -> colored floorplan -> renders -> hi-fi render -> 3D model.
+
+`pipeline` is the headless API, `workflows` runs the ComfyUI workflows, `ui` is the
+Gradio app and `cli` the command line (`python -m interior_flow`). The remaining
+modules are helpers shared with the scripts in `tools/`.
+
+Modules are imported directly (e.g. `from interior_flow.gemini_client import generate_image`)
+so that importing the package itself stays cheap.
+"""
@@ -0,0 +1,5 @@
+import sys
+
+from interior_flow.cli import main
+
+sys.exit(main())
@@ -0,0 +1,387 @@
+"""Image-to-3D providers behind one async interface.
+
+Every provider implements `submit(image, prompt) -> job_id`, `poll(job_id) ->
+JobStatus` and `download(status, outdir) -> [paths]`; `run_job()` drives one job
+through all three; its status checks go through the event loop's shared poller
+(interior_flow/polling.py), so a single loop (the shared background loop) tracks any
+number of in-flight 3D jobs.
+
+- `TripoProvider`: the tripo3d SDK when it is installed and accepts the key, the
+  HTTP API (multipart upload in the form layout negotiated by
+  interior_flow/capabilities.py) otherwise.
+- `TencentProvider`: Tencent Hunyuan AI3D (SubmitHunyuanTo3DProJob); the SDK is
+  synchronous, so its calls run in worker threads via `asyncio.to_thread`.
+
+    TRIPO_API_KEY / TRIPO_KEY                          Tripo
+    TENCENTCLOUD_SECRET_ID / TENCENTCLOUD_SECRET_KEY   Tencent
+    TENCENTCLOUD_REGION                                default ap-guangzhou
+"""
+import asyncio
+import base64
+import json
+import os
+import time
+import weakref
+from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+from interior_flow.downloads import Download, download_all
+from interior_flow.http_pool import get_async_client
+
+QUEUED, RUNNING, SUCCESS, FAILED = 'queued', 'running', 'success', 'failed'
+TRIPO_API = 'https://api.tripo3d.ai/v2/openapi'
+TRIPO_PROMPT = '将这张3d的室内空间生成逼真材质的3d模型'
+MODEL_SUFFIXES = ('.glb', '.gltf', '.obj', '.fbx', '.usdz', '.stl', '.zip')
+
+
+class Provider3DError(RuntimeError):
+    def __init__(self, message: str, debug=None):
+        super().__init__(message)
+        self.debug = debug  # request/response details for a debug dump
+
+
+class JobStatus(NamedTuple):
+    job_id: str
+    state: str  # QUEUED, RUNNING, SUCCESS or FAILED
+    progress: int = 0
+    urls: tuple = ()  # result file URLs once SUCCESS
+    raw: object = None  # the provider's last response (or SDK task)
+
+
+class Result3D(NamedTuple):
+    provider: str
+    job_id: str
+    state: str
+    files: List[Path]
+    seconds: float
+    raw: object = None
+
+    @property
+    def model(self) -> Optional[Path]:
+        """The first 3D model among the files (preview and rendered images skipped)."""
+        return next((f for f in self.files if f.suffix.lower() in MODEL_SUFFIXES), None)
+
+
+def _state(value, success=('success', 'succeed', 'succeeded', 'done', 'completed'),
+           failed=('failed', 'fail', 'error', 'cancelled', 'banned', 'expired')) -> str:
+    s = str(getattr(value, 'value', value) or '').lower()
+    if s in success:
+        return SUCCESS
+    if s in failed:
+        return FAILED
+    return QUEUED if s in ('queued', 'wait', 'waiting', 'pending') else RUNNING
+
+
+class Provider3D:
+    name = ''
+
+    async def submit(self, image: Path, prompt: str = '') -> str:
+        raise NotImplementedError
+
+    async def poll(self, job_id: str) -> JobStatus:
+        raise NotImplementedError
+
+    async def poll_many(self, job_ids: List[str]) -> Dict[str, JobStatus]:
+        """Statuses of several jobs in one round; jobs whose query failed are left out.
+
+        Concurrent single polls unless the provider has a batch query.
+        """
+        results = await asyncio.gather(*(self.poll(j) for j in job_ids), return_exceptions=True)
+        return {j: r for j, r in zip(job_ids, results) if not isinstance(r, BaseException)}
+
+    def downloads(self, status: JobStatus) -> List[Download]:
+        return [Download(url) for url in status.urls]
+
+    async def download(self, status: JobStatus, outdir: Path) -> List[Path]:
+        """The job's files, fetched concurrently (streamed, resumable); failed ones are left out."""
+        results = await download_all(self.downloads(status), outdir)
+        return [r for r in results if isinstance(r, Path)]
+
+    def source(self, job_id: str) -> str:
+        """Which implementation handles `job_id` (recorded with the model)."""
+        return self.name
+
+    async def close(self):
+        pass
+
+
+class TripoHTTP(Provider3D):
+    name = 'tripo_http'
+    FILE_KEYS = ('image', 'file', 'image_file', 'upload')
+    # poll answers worth another try; any other error status ends the job
+    RETRY_STATUS = (408, 429, 500, 502, 503, 504)
+
+    def __init__(self, key: str, base_url: str = TRIPO_API):
+        self.key = key
+        self.base_url = base_url
+        self.headers = {'Authorization': f'Bearer {key}'}
+
+    @property
+    def http(self):
+        return get_async_client(self.base_url)
+
+    def form_variants(self, prompt: str) -> dict:
+        """Every multipart layout the task endpoint has taken, as '<file key>/<form>' ids."""
+        forms = {
+            'type': {'type': 'image_to_model', 'prompt': prompt},
+            'task_type': {'task_type': 'image_to_model', 'prompt': prompt},
+            'inputs': {'type': 'image_to_model', 'inputs': json.dumps({'prompt': prompt})},
+            'payload': {'payload': json.dumps({'type': 'image_to_model', 'prompt': prompt})},
+        }
+        return {f'{fk}/{name}': (fk, form) for fk in self.FILE_KEYS for name, form in forms.items()}
+
+    async def submit(self, image: Path, prompt: str = TRIPO_PROMPT) -> str:
+        from interior_flow.capabilities import NegotiationError, negotiate
+
+        data = Path(image).read_bytes()
+        url = f'{self.base_url}/task'
+
+        async def _send(shape):
+            fk, form = shape
+            return await self.http.post(url, headers=self.headers, data=form,
+                                        files={fk: (Path(image).name, data, 'image/png')})
+
+        # the layout accepted last time goes first; others are only tried after a schema error
+        try:
+            _variant, r, attempts = await negotiate(url, self.form_variants(prompt), _send)
+        except NegotiationError as e:
+            raise Provider3DError(f'Tripo HTTP submit failed: {e}', e.attempts) from e
+        try:
+            j = r.json()
+        except ValueError:
+            j = {}
+        task_id = j.get('id') or j.get('task_id') or (j.get('data') or {}).get('task_id') or (j.get('data') or {}).get('id')
+        if not task_id:
+            raise Provider3DError('Tripo HTTP submit returned no task id', attempts)
+        return str(task_id)
+
+    async def poll(self, job_id: str) -> JobStatus:
+        r = await self.http.get(f'{self.base_url}/task/{job_id}', headers=self.headers)
+        try:
+            j = r.json()
+        except ValueError:
+            j = {}
+        if not isinstance(j, dict):
+            j = {}
+        # an error answer ({"code": 2001, "message": ...} or a 4xx) is final, not "still running"
+        if (r.status_code >= 400 and r.status_code not in self.RETRY_STATUS) or j.get('code') not in (None, 0):
+            return JobStatus(job_id, FAILED, 0, (), j or {'status_code': r.status_code, 'text': r.text[:500]})
+        data = j.get('data') or {}
+        state = _state(j.get('status') or data.get('status'))
+        urls = []
+        for f in data.get('files') or j.get('files') or []:
+            url = f.get('url') or f.get('download_url') or f.get('uri')
+            if url:
+                urls.append(url)
+        # v2 task responses list the model URLs under data.output
+        for key in ('pbr_model', 'model', 'base_model'):
+            value = (data.get('output') or {}).get(key)
+            url = value.get('url') if isinstance(value, dict) else value
+            if url and not urls:
+                urls.append(url)
+        return JobStatus(job_id, state, int(data.get('progress') or 0), tuple(urls), j)
+
+    def downloads(self, status: JobStatus) -> List[Download]:
+        items = []
+        for url in status.urls:
+            name = url.split('?')[0].rsplit('/', 1)[-1]
+            if not name.lower().endswith(MODEL_SUFFIXES):
+                name = f'{status.job_id}.glb'
+            items.append(Download(url, name))
+        return items
+
+
+class TripoSDK(Provider3D):
+    name = 'tripo_sdk'
+    OUTPUTS = ('model', 'base_model', 'pbr_model', 'rendered_image')
+    SUFFIXES = {'model': 'model', 'base_model': 'base', 'pbr_model': 'pbr', 'rendered_image': 'rendered'}
+
+    def __init__(self, key: str):
+        from tripo3d import TripoClient
+        try:
+            self.client = TripoClient(key)
+        except Exception:
+            # some SDK versions enforce a key prefix; build the client without its constructor
+            from tripo3d.client_impl import ClientImpl
+            self.client = TripoClient.__new__(TripoClient)
+            self.client.api_key = key
+            self.client.BASE_URL = getattr(TripoClient, 'BASE_URL', TRIPO_API)
+            self.client._impl = ClientImpl(key, self.client.BASE_URL)
+
+    async def submit(self, image: Path, prompt: str = TRIPO_PROMPT) -> str:
+        image = str(Path(image))
+        try:
+            return str(await self.client.image_to_model(image=image))
+        except TypeError:
+            # older SDKs take the image positionally
+            return str(await self.client.image_to_model(image))
+
+    async def poll(self, job_id: str) -> JobStatus:
+        task = await self.client.get_task(job_id)
+        output = getattr(task, 'output', None)
+        urls = tuple(getattr(output, f, None) for f in self.OUTPUTS)
+        return JobStatus(job_id, _state(task.status), int(getattr(task, 'progress', 0) or 0), urls, task)
+
+    def downloads(self, status: JobStatus) -> List[Download]:
+        # the SDK's own file names (<task>_model.glb, ...); its downloader buffers whole files
+        items = []
+        for field, url in zip(self.OUTPUTS, status.urls):
+            if url:
+                ext = os.path.splitext(url.split('?')[0])[1] or ('.jpg' if field == 'rendered_image' else '.glb')
+                items.append(Download(url, f'{status.job_id}_{self.SUFFIXES[field]}{ext}'))
+        return items
+
+    async def close(self):
+        try:
+            await self.client.close()
+        except Exception:
+            pass
+
+
+class TripoProvider(Provider3D):
+    """SDK first, HTTP API when the SDK is missing or its submit fails."""
+    name = 'tripo'
+    MAX_OWNED = 1000
+
+    def __init__(self, key: str = None):
+        self.key = key or os.environ.get('TRIPO_API_KEY') or os.environ.get('TRIPO_KEY')
+        if not self.key:
+            raise Provider3DError('no TRIPO_API_KEY set')
+        self.http = TripoHTTP(self.key)
+        try:
+            self.sdk = TripoSDK(self.key)
+        except Exception:
+            self.sdk = None
+        self._owner = {}  # job id -> implementation that submitted it (recent jobs only)
+        self.sdk_error = None
+
+    def _own(self, job_id: str, impl: Provider3D):
+        self._owner[job_id] = impl
+        while len(self._owner) > self.MAX_OWNED:
+            self._owner.pop(next(iter(self._owner)))
+
+    async def submit(self, image: Path, prompt: str = TRIPO_PROMPT) -> str:
+        if self.sdk is not None:
+            try:
+                job_id = await self.sdk.submit(image, prompt)
+                self._own(job_id, self.sdk)
+                return job_id
+            except Exception as e:
+                self.sdk_error = e
+        job_id = await self.http.submit(image, prompt)
+        self._own(job_id, self.http)
+        return job_id
+
+    def _impl(self, job_id: str) -> Provider3D:
+        return self._owner.get(job_id, self.http)
+
+    async def poll(self, job_id: str) -> JobStatus:
+        return await self._impl(job_id).poll(job_id)
+
+    async def download(self, status: JobStatus, outdir: Path) -> List[Path]:
+        return await self._impl(status.job_id).download(status, outdir)
+
+    def source(self, job_id: str) -> str:
+        return self._impl(job_id).name
+
+    async def close(self):
+        if self.sdk is not None:
+            await self.sdk.close()
+
+
+class TencentProvider(Provider3D):
+    name = 'tencent_ai3d'
+    ENDPOINT = 'ai3d.tencentcloudapi.com'
+
+    def __init__(self, secret_id: str = None, secret_key: str = None, region: str = None):
+        from tencentcloud.ai3d.v20250513 import ai3d_client, models
+        from tencentcloud.common import credential
+        from tencentcloud.common.profile.client_profile import ClientProfile
+        from tencentcloud.common.profile.http_profile import HttpProfile
+
+        secret_id = secret_id or os.environ.get('TENCENTCLOUD_SECRET_ID')
+        secret_key = secret_key or os.environ.get('TENCENTCLOUD_SECRET_KEY')
+        if not secret_id or not secret_key:
+            raise Provider3DError('TENCENTCLOUD_SECRET_ID / TENCENTCLOUD_SECRET_KEY not set')
+        self.region = region or os.environ.get('TENCENTCLOUD_REGION') or 'ap-guangzhou'
+        http_profile = HttpProfile()
+        http_profile.endpoint = self.ENDPOINT
+        client_profile = ClientProfile()
+        client_profile.httpProfile = http_profile
+        self.client = ai3d_client.Ai3dClient(credential.Credential(secret_id, secret_key), self.region, client_profile)
+        self.models = models
+
+    def _call(self, method: str, request: str, params: dict) -> dict:
+        req = getattr(self.models, request)()
+        req.from_json_string(json.dumps(params))
+        return json.loads(getattr(self.client, method)(req).to_json_string())
+
+    async def submit(self, image: Path, prompt: str = '') -> str:
+        params = {'ImageBase64': base64.b64encode(Path(image).read_bytes()).decode('ascii')}
+        if prompt:
+            params['Prompt'] = prompt
+        j = await asyncio.to_thread(self._call, 'SubmitHunyuanTo3DProJob', 'SubmitHunyuanTo3DProJobRequest', params)
+        job_id = j.get('JobId') or j.get('JobID') or (j.get('Response') or {}).get('JobId')
+        if not job_id:
+            raise Provider3DError('Tencent AI3D submit returned no JobId', j)
+        return job_id
+
+    async def poll(self, job_id: str) -> JobStatus:
+        j = await asyncio.to_thread(self._call, 'QueryHunyuanTo3DProJob', 'QueryHunyuanTo3DProJobRequest', {'JobId': job_id})
+        body = j.get('Response') if isinstance(j.get('Response'), dict) else j
+        status = next((body[k] for k in ('Status', 'JobStatus', 'State') if k in body), None)
+        results = body.get('ResultFile3Ds') or []
+        # model files first, then their preview images
+        urls = [f.get('Url') or f.get('url') for f in results] + [f.get('PreviewImageUrl') for f in results]
+        return JobStatus(job_id, _state(status), 0, tuple(u for u in urls if u), j)
+
+
+# event loop -> {api key: TripoProvider}
+_tripo_providers = weakref.WeakKeyDictionary()
+
+
+def tripo_provider(key: str = None) -> TripoProvider:
+    """The running loop's shared TripoProvider for `key` (call it on that loop).
+
+    One instance per key lets the poller check all of its in-flight jobs in one
+    round (it groups jobs by provider); it stays open for the life of the loop.
+    """
+    key = key or os.environ.get('TRIPO_API_KEY') or os.environ.get('TRIPO_KEY')
+    providers = _tripo_providers.setdefault(asyncio.get_running_loop(), {})
+    provider = providers.get(key)
+    if provider is None:
+        provider = providers[key] = TripoProvider(key)
+    return provider
+
+
+def get_provider(name: str, **kwargs) -> Provider3D:
+    """'tripo' or 'tencent'."""
+    if name == 'tripo':
+        return TripoProvider(**kwargs)
+    if name in ('tencent', 'tencent_ai3d', 'hunyuan'):
+        return TencentProvider(**kwargs)
+    raise ValueError(f'unknown 3D provider: {name}')
+
+
+async def run_job(provider: Provider3D, image, outdir, prompt: str = None, timeout: float = 1200.0,
+                  on_status: Optional[Callable[[JobStatus], None]] = None, poller=None) -> Result3D:
+    """Submit `image`, wait for the job to finish (or `timeout`), then download its files.
+
+    Status checks are scheduled by the loop's shared poller (interior_flow/polling.py),
+    which learns how long this provider's jobs take. `outdir` may be a callable taking
+    the job id; `on_status` sees every status.
+    """
+    from interior_flow.polling import get_poller
+
+    started = time.monotonic()
+    job_id = await (provider.submit(Path(image), prompt) if prompt is not None else provider.submit(Path(image)))
+    status = JobStatus(job_id, QUEUED)
+    if on_status is not None:
+        on_status(status)
+    status = await (poller or get_poller()).wait(provider, job_id, started=started, timeout=timeout, on_status=on_status)
+    if status.state not in (SUCCESS, FAILED):
+        return Result3D(provider.source(job_id), job_id, 'timeout', [], time.monotonic() - started, status.raw)
+    if callable(outdir):
+        outdir = outdir(job_id)
+    files = await provider.download(status, Path(outdir)) if status.state == SUCCESS else []
+    return Result3D(provider.source(job_id), job_id, status.state, files, time.monotonic() - started, status.raw)
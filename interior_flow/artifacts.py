@@ -0,0 +1,120 @@
+"""Run-scoped artifact store.
+
+Each flow run gets its own directory `runs/<run_id>/` and a `manifest.json` that
+records every artifact the run produced (kind, path, optional metadata). Callers
+get exact paths back from the store and look artifacts up through the manifest,
+so nothing has to glob a shared folder and sort by mtime to find "the file this
+run just wrote", and concurrent runs never share a filename.
+
+    RUNS_DIR   where run directories are created (default <repo>/runs)
+"""
+import json
+import os
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import List, Optional
+
+from interior_flow.settings import RUNS_DIR
+MANIFEST_NAME = 'manifest.json'
+
+
+class RunArtifacts:
+    def __init__(self, run_id: str, root: Path = RUNS_DIR, manifest: dict = None):
+        self.run_id = run_id
+        self.dir = Path(root) / run_id
+        self._lock = threading.Lock()
+        self._manifest = manifest or {
+            'run_id': run_id,
+            'created': time.time(),
+            'meta': {},
+            'artifacts': [],
+        }
+
+    @property
+    def manifest_path(self) -> Path:
+        return self.dir / MANIFEST_NAME
+
+    def path(self, name: str) -> Path:
+        """Exact path for `name` inside the run directory (not recorded until `record()`)."""
+        self.dir.mkdir(parents=True, exist_ok=True)
+        return self.dir / name
+
+    def new_path(self, prefix: str, suffix: str = '.png') -> Path:
+        """A fresh, collision-free path inside the run directory."""
+        return self.path(f'{prefix}_{uuid.uuid4().hex[:8]}{suffix}')
+
+    def record(self, kind: str, path, **meta) -> Path:
+        """Add an artifact to the manifest and return its path."""
+        p = Path(path)
+        entry = {'kind': kind, 'path': self._relative(p), 'created': time.time()}
+        entry.update(meta)
+        with self._lock:
+            self._manifest['artifacts'].append(entry)
+            self._save()
+        return p
+
+    def write_text(self, name: str, text: str, kind: str, **meta) -> Path:
+        p = self.path(name)
+        p.write_text(text, encoding='utf-8')
+        return self.record(kind, p, **meta)
+
+    def write_json(self, name: str, obj, kind: str, **meta) -> Path:
+        return self.write_text(name, json.dumps(obj, ensure_ascii=False, indent=2), kind, **meta)
+
+    def set_meta(self, **fields):
+        with self._lock:
+            self._manifest['meta'].update(fields)
+            self._save()
+
+    @property
+    def meta(self) -> dict:
+        with self._lock:
+            return dict(self._manifest['meta'])
+
+    def files(self, kind: str = None) -> List[Path]:
+        """Recorded artifacts (optionally of one kind) in the order they were recorded."""
+        with self._lock:
+            entries = list(self._manifest['artifacts'])
+        return [self._absolute(e['path']) for e in entries if kind is None or e['kind'] == kind]
+
+    def latest(self, kind: str) -> Optional[Path]:
+        found = self.files(kind)
+        return found[-1] if found else None
+
+    def _relative(self, p: Path) -> str:
+        # artifacts inside the run dir are stored relative so the run can be moved; others absolute
+        try:
+            return p.resolve().relative_to(self.dir.resolve()).as_posix()
+        except ValueError:
+            return str(p.resolve())
+
+    def _absolute(self, s: str) -> Path:
+        p = Path(s)
+        return p if p.is_absolute() else self.dir / p
+
+    def _save(self):
+        # callers hold self._lock; write to a temp file and rename so readers never see half a manifest
+        self.dir.mkdir(parents=True, exist_ok=True)
+        tmp = self.dir / f'{MANIFEST_NAME}.{uuid.uuid4().hex[:8]}.part'
+        tmp.write_text(json.dumps(self._manifest, ensure_ascii=False, indent=2), encoding='utf-8')
+        os.replace(tmp, self.manifest_path)
+
+
+def new_run(prefix: str = 'run', root: Path = RUNS_DIR) -> RunArtifacts:
+    run_id = f'{prefix}_{time.strftime("%Y%m%d_%H%M%S")}_{uuid.uuid4().hex[:6]}'
+    run = RunArtifacts(run_id, root)
+    with run._lock:
+        run._save()
+    return run
+
+
+def open_run(run_id: str, root: Path = RUNS_DIR) -> Optional[RunArtifacts]:
+    """Load an existing run from its manifest, or None if it does not exist."""
+    manifest_path = Path(root) / run_id / MANIFEST_NAME
+    try:
+        manifest = json.loads(manifest_path.read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return None
+    return RunArtifacts(run_id, root, manifest)
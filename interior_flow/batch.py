@@ -0,0 +1,252 @@
+"""Run the pipeline over a whole catalog of floorplan sketches.
+
+The input is either a directory of sketches or a manifest:
+
+- directory: every *.png / *.jpg / *.jpeg / *.webp is one item, using the layout and
+  spaces given on the command line; a sidecar `<sketch>.json` with
+  {"layout": ..., "spaces": [...], "tripo": ...} overrides them for that sketch;
+- manifest (.json list, .jsonl or .csv): one item per entry with `sketch` (relative
+  to the manifest), optional `id`, `layout`, `spaces` (or `space1`..`space4`) and `tripo`.
+
+Items run `concurrency` at a time (image calls stay bounded by MAX_PROVIDER_CALLS).
+Each item gets its own run directory inside the batch directory, and `batch.json`
+there is rewritten after every item, so an interrupted batch resumes where it
+stopped: items already done with the same inputs are skipped. It is also the
+summary report (`summary.md` is written at the end). Its `finished` time is cleared
+while the batch runs; retention never removes a batch directory without one.
+
+    BATCH_CONCURRENCY   items processed at once (default 2)
+"""
+import csv
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, List, NamedTuple, Optional
+
+from interior_flow.artifacts import new_run
+from interior_flow.render_cache import file_sha256
+from interior_flow.settings import RUNS_DIR
+
+CONCURRENCY = int(os.environ.get('BATCH_CONCURRENCY', '2'))
+IMAGE_SUFFIXES = ('.png', '.jpg', '.jpeg', '.webp')
+STATE_NAME = 'batch.json'
+DONE, FAILED, SKIPPED = 'done', 'failed', 'skipped'
+
+
+class BatchItem(NamedTuple):
+    id: str
+    sketch: str
+    layout: str = ''
+    spaces: tuple = ()
+    tripo: bool = False
+
+    def fingerprint(self) -> str:
+        """Changes when the sketch file or the item's specs change (the item then re-runs)."""
+        sketch = file_sha256(self.sketch) if self.sketch and Path(self.sketch).is_file() else self.sketch
+        raw = json.dumps([sketch, self.layout, list(self.spaces), self.tripo], ensure_ascii=False)
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+def _item_id(text: str) -> str:
+    return re.sub(r'[^\w.-]+', '_', text).strip('_') or uuid.uuid4().hex[:8]
+
+
+def _spaces(entry: dict, default=()) -> tuple:
+    spaces = entry.get('spaces')
+    if isinstance(spaces, str):
+        spaces = [s.strip() for s in spaces.split(',')]
+    if spaces is None:
+        spaces = [entry.get(f'space{i}') for i in range(1, 5)]
+    spaces = tuple(s for s in (spaces or ()) if s)[:4]
+    return spaces or tuple(default)
+
+
+def _flag(value) -> bool:
+    return str(value).strip().lower() in ('1', 'true', 'yes', 'y') if value is not None else False
+
+
+def load_items(source, layout: str = '', spaces=(), tripo: bool = False) -> List[BatchItem]:
+    """Items from a directory of sketches or a .json / .jsonl / .csv manifest."""
+    source = Path(source)
+    if source.is_dir():
+        items = []
+        for p in sorted(source.iterdir()):
+            if p.suffix.lower() not in IMAGE_SUFFIXES:
+                continue
+            entry = {}
+            sidecar = p.with_suffix('.json')
+            if sidecar.exists():
+                entry = json.loads(sidecar.read_text(encoding='utf-8'))
+            items.append(BatchItem(_item_id(p.stem), str(p), entry.get('layout', layout), _spaces(entry, spaces),
+                                   _flag(entry['tripo']) if 'tripo' in entry else tripo))
+        return items
+
+    text = source.read_text(encoding='utf-8-sig')
+    if source.suffix.lower() == '.csv':
+        entries = list(csv.DictReader(text.splitlines()))
+    elif source.suffix.lower() == '.jsonl':
+        entries = [json.loads(line) for line in text.splitlines() if line.strip()]
+    else:
+        entries = json.loads(text)
+        if isinstance(entries, dict):
+            entries = entries.get('items') or []
+
+    items, seen = [], set()
+    for n, entry in enumerate(entries, start=1):
+        sketch = entry.get('sketch') or entry.get('image') or ''
+        if sketch and not Path(sketch).is_absolute():
+            sketch = str(source.parent / sketch)
+        item_id = _item_id(str(entry.get('id') or (Path(sketch).stem if sketch else f'item{n}')))
+        if item_id in seen:
+            item_id = f'{item_id}_{n}'
+        seen.add(item_id)
+        items.append(BatchItem(item_id, sketch, entry.get('layout') or layout, _spaces(entry, spaces),
+                               _flag(entry['tripo']) if entry.get('tripo') not in (None, '') else tripo))
+    return items
+
+
+class ItemResult(NamedTuple):
+    id: str
+    status: str
+    run_id: str = ''
+    images: tuple = ()
+    model: str = ''
+    error: str = ''
+    seconds: float = 0.0
+
+
+class Batch:
+    """A batch directory: its items' runs plus the resumable state / report file."""
+
+    def __init__(self, directory):
+        self.dir = Path(directory)
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        try:
+            self.state = json.loads(self.state_path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            self.state = {'created': time.time(), 'items': {}}
+
+    @property
+    def state_path(self) -> Path:
+        return self.dir / STATE_NAME
+
+    def completed(self, item: BatchItem) -> bool:
+        entry = self.state['items'].get(item.id) or {}
+        return (entry.get('status') == DONE and entry.get('fingerprint') == item.fingerprint()
+                and (self.dir / entry.get('run_id', '')).is_dir())
+
+    def record(self, item: BatchItem, result: ItemResult):
+        entry = dict(result._asdict(), images=list(result.images), sketch=item.sketch,
+                     fingerprint=item.fingerprint(), finished=time.time())
+        with self._lock:
+            self.state['items'][item.id] = entry
+            self.state['updated'] = time.time()
+            self._save()
+
+    def set_finished(self, finished: Optional[float]):
+        with self._lock:
+            self.state['finished'] = finished
+            self._save()
+
+    def _save(self):
+        # callers hold self._lock; same temp-file-and-rename as the run manifests
+        tmp = self.dir / f'{STATE_NAME}.{uuid.uuid4().hex[:8]}.part'
+        tmp.write_text(json.dumps(self.state, ensure_ascii=False, indent=2), encoding='utf-8')
+        os.replace(tmp, self.state_path)
+
+
+def run_item(batch: Batch, item: BatchItem, api_model=None, aspect_ratio='16:9', force=False) -> ItemResult:
+    from interior_flow.pipeline import run_pipeline
+
+    started = time.time()
+    if not item.sketch or not Path(item.sketch).is_file():
+        return ItemResult(item.id, FAILED, error=f'sketch not found: {item.sketch}')
+    run = new_run(f'item_{item.id}', root=batch.dir)
+    spaces = (list(item.spaces) + ['', '', '', ''])[:4]
+    try:
+        gallery, captions, _model, status = run_pipeline(
+            item.layout, item.sketch, *spaces, api_model=api_model, aspect_ratio=aspect_ratio,
+            enable_tripo=item.tripo, force_regenerate=force, wait_3d=True, run=run)
+    except Exception as e:
+        return ItemResult(item.id, FAILED, run.run_id, error=str(e) or type(e).__name__, seconds=time.time() - started)
+    # the model comes from this run's manifest; the status store is shared by concurrent items
+    model = run.latest('model')
+    error = ''
+    if not gallery:
+        error = captions
+    elif item.tripo and not model:
+        error = status
+    return ItemResult(item.id, FAILED if error else DONE, run.run_id, tuple(img for img, _cap in gallery),
+                      str(model or ''), error, time.time() - started)
+
+
+def run_batch(items: List[BatchItem], directory, concurrency: int = None, api_model=None, aspect_ratio='16:9',
+              force=False, on_result: Optional[Callable[[BatchItem, ItemResult], None]] = None) -> List[ItemResult]:
+    """Run every item not already completed in `directory` (all of them with `force`)."""
+    batch = Batch(directory)
+    batch.set_finished(None)
+    results = {}
+    todo = []
+    for item in items:
+        if not force and batch.completed(item):
+            prev = batch.state['items'][item.id]
+            results[item.id] = ItemResult(item.id, SKIPPED, prev.get('run_id', ''), tuple(prev.get('images') or ()),
+                                          prev.get('model', ''))
+            if on_result is not None:
+                on_result(item, results[item.id])
+        else:
+            todo.append(item)
+
+    def _one(item):
+        result = run_item(batch, item, api_model=api_model, aspect_ratio=aspect_ratio, force=force)
+        batch.record(item, result)
+        if on_result is not None:
+            on_result(item, result)
+        return result
+
+    with ThreadPoolExecutor(max_workers=max(1, int(concurrency or CONCURRENCY)), thread_name_prefix='batch') as pool:
+        for result in pool.map(_one, todo):
+            results[result.id] = result
+    ordered = [results[item.id] for item in items]
+    write_summary(batch, ordered)
+    batch.set_finished(time.time())
+    return ordered
+
+
+def write_summary(batch: Batch, results: List[ItemResult]) -> Path:
+    counts = {s: sum(1 for r in results if r.status == s) for s in (DONE, SKIPPED, FAILED)}
+    lines = [
+        f'# Batch {batch.dir.name}',
+        '',
+        f"{len(results)} items: {counts[DONE]} done, {counts[SKIPPED]} already done (skipped), {counts[FAILED]} failed",
+        '',
+        '| item | status | images | model | seconds | run / error |',
+        '| --- | --- | --- | --- | --- | --- |',
+    ]
+    for r in results:
+        detail = r.error.replace('\n', ' ')[:200] if r.error else r.run_id
+        lines.append(f'| {r.id} | {r.status} | {len(r.images)} | {Path(r.model).name if r.model else ""} '
+                     f'| {r.seconds:.0f} | {detail} |')
+    path = batch.dir / 'summary.md'
+    path.write_text('\n'.join(lines) + '\n', encoding='utf-8')
+    return path
+
+
+def default_batch_dir(source) -> Path:
+    return RUNS_DIR / f'batch_{_item_id(Path(source).stem)}'
+
+
+def is_unfinished(directory) -> bool:
+    """True while the batch in `directory` is running or was interrupted (it can resume)."""
+    try:
+        state = json.loads((Path(directory) / STATE_NAME).read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return False  # not a batch directory (no state to resume from)
+    return not state.get('finished')
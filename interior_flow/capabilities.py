@@ -0,0 +1,121 @@
+"""Which request shape each provider endpoint accepts, remembered across runs.
+
+Some endpoints (the Tripo HTTP task API, OpenAI-compatible image gateways) have taken
+different payload layouts over time. `negotiate()` sends the shape that worked last
+time first; only a schema error (HTTP 400/404/405/415/422) drops it and probes the
+other candidates, in order, until one is accepted and saved. Auth, quota, server and
+network errors stop at once: every other shape would fail the same way. So a job
+normally makes one request (one upload), not one per candidate.
+
+    CAPABILITIES_PATH   accepted shapes per endpoint (default tools/provider_capabilities.json)
+"""
+import json
+import os
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, Optional
+
+from interior_flow.settings import TOOLS_DIR
+
+CAPABILITIES_PATH = Path(os.environ.get('CAPABILITIES_PATH') or TOOLS_DIR / 'provider_capabilities.json')
+SCHEMA_ERROR_CODES = (400, 404, 405, 415, 422)
+
+
+class NegotiationError(RuntimeError):
+    def __init__(self, message: str, attempts: list):
+        super().__init__(message)
+        self.attempts = attempts  # one dict per request sent, for a debug dump
+
+
+def is_schema_error(status_code: int) -> bool:
+    return status_code in SCHEMA_ERROR_CODES
+
+
+class CapabilityCache:
+    """endpoint -> id of the request shape it accepted; loaded on first use, saved on change."""
+
+    def __init__(self, path: Path = CAPABILITIES_PATH):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._entries = None
+
+    def _load(self) -> dict:
+        # callers hold self._lock
+        if self._entries is None:
+            try:
+                self._entries = json.loads(self.path.read_text(encoding='utf-8'))
+            except (OSError, ValueError):
+                self._entries = {}
+        return self._entries
+
+    def _save(self):
+        # callers hold self._lock
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_name(f'{self.path.name}.{uuid.uuid4().hex[:8]}.part')
+            tmp.write_text(json.dumps(self._entries, ensure_ascii=False, indent=2), encoding='utf-8')
+            os.replace(tmp, self.path)
+        except OSError:
+            pass
+
+    def get(self, endpoint: str) -> Optional[str]:
+        with self._lock:
+            return (self._load().get(endpoint) or {}).get('variant')
+
+    def remember(self, endpoint: str, variant: str):
+        with self._lock:
+            self._load()[endpoint] = {'variant': variant, 'updated': time.time()}
+            self._save()
+
+    def forget(self, endpoint: str):
+        with self._lock:
+            if self._load().pop(endpoint, None) is not None:
+                self._save()
+
+
+async def negotiate(endpoint: str, variants: Dict[str, object], send: Callable[[object], Awaitable],
+                    accepted: Callable[[object], bool] = None, cache: CapabilityCache = None):
+    """Send the request in a shape `endpoint` accepts; returns (variant_id, response, attempts).
+
+    `variants` maps stable ids to request shapes in probing order; `send(shape)` returns
+    an httpx response. Raises NegotiationError (with the attempts) when none is accepted.
+    """
+    cache = cache or get_capabilities()
+    accepted = accepted or (lambda r: 200 <= r.status_code < 300)
+    known = cache.get(endpoint)
+    order = ([known] if known in variants else []) + [v for v in variants if v != known]
+    attempts = []
+    for vid in order:
+        attempt = {'variant': vid}
+        attempts.append(attempt)
+        try:
+            r = await send(variants[vid])
+        except Exception as e:
+            attempt['exception'] = str(e)
+            raise NegotiationError(f'{endpoint}: {e}', attempts) from e
+        attempt.update(status_code=r.status_code, text=r.text[:2000])
+        if accepted(r):
+            if vid != known:
+                cache.remember(endpoint, vid)
+            return vid, r, attempts
+        if not is_schema_error(r.status_code):
+            raise NegotiationError(f'{endpoint}: HTTP {r.status_code}: {r.text[:200]}', attempts)
+        if vid == known:
+            cache.forget(endpoint)
+    last = attempts[-1] if attempts else {}
+    raise NegotiationError(f"{endpoint}: no request shape accepted (HTTP {last.get('status_code')}: "
+                           f"{(last.get('text') or '')[:200]})", attempts)
+
+
+_capabilities = None
+_capabilities_lock = threading.Lock()
+
+
+def get_capabilities() -> CapabilityCache:
+    global _capabilities
+    with _capabilities_lock:
+        if _capabilities is None:
+            _capabilities = CapabilityCache()
+        return _capabilities
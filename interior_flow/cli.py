@@ -0,0 +1,126 @@
+"""Command line entry point: `python -m interior_flow [command]`.
+
+    ui          serve the Gradio app (default)
+    run         run the pipeline once, headless: floorplan -> renders -> hi-fi (-> 3D)
+    batch       run the pipeline over a directory or manifest of sketches (resumable)
+    workflows   list the selectable ComfyUI workflows
+"""
+import argparse
+import json
+import sys
+
+
+def _print_progress(message):
+    print(message, flush=True)
+
+
+def cmd_ui(args) -> int:
+    from interior_flow.ui import launch
+
+    launch(server_name=args.host, server_port=args.port, share=args.share)
+    return 0
+
+
+def cmd_run(args) -> int:
+    from interior_flow.pipeline import run_pipeline
+
+    spaces = (list(args.space or []) + ['', '', '', ''])[:4]
+    gallery, captions, model, status = run_pipeline(
+        args.layout, args.sketch, *spaces,
+        api_model=args.model, aspect_ratio=args.aspect_ratio, enable_tripo=args.tripo,
+        force_regenerate=args.force, max_concurrency=args.concurrency, wait_3d=True,
+        progress=None if args.json else _print_progress,
+    )
+    if args.json:
+        print(json.dumps({'images': [img for img, _cap in gallery], 'captions': captions,
+                          'model': model, 'tripo_status': status}, ensure_ascii=False, indent=2))
+    else:
+        print(captions)
+        for img, cap in gallery:
+            print(f'  {cap}: {img}')
+        if args.tripo:
+            print(status)
+            if model:
+                print(f'  model: {model}')
+    return 0 if gallery else 1
+
+
+def cmd_batch(args) -> int:
+    from interior_flow.batch import FAILED, default_batch_dir, load_items, run_batch
+
+    if len(args.space or []) > 4:
+        print('batch: at most 4 --space values', file=sys.stderr)
+        return 2
+    items = load_items(args.source, layout=args.layout, spaces=args.space or (), tripo=args.tripo)
+    if not items:
+        print(f'batch: no sketches found in {args.source}', file=sys.stderr)
+        return 2
+    out = args.out or default_batch_dir(args.source)
+    print(f'{len(items)} items -> {out}', flush=True)
+
+    def _on_result(item, result):
+        detail = result.error.splitlines()[0] if result.error else f'{len(result.images)} images'
+        print(f'[{result.status}] {item.id}: {detail}', flush=True)
+
+    results = run_batch(items, out, concurrency=args.concurrency, api_model=args.model,
+                        aspect_ratio=args.aspect_ratio, force=args.force, on_result=_on_result)
+    failed = sum(1 for r in results if r.status == FAILED)
+    print(f'{len(results) - failed}/{len(results)} ok; report: {out}')
+    return 1 if failed else 0
+
+
+def cmd_workflows(args) -> int:
+    from interior_flow.workflows import list_workflows
+
+    for name in list_workflows():
+        print(name)
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='interior_flow', description='Floorplan sketch to renders and 3D model')
+    sub = parser.add_subparsers(dest='command')
+
+    p = sub.add_parser('ui', help='serve the Gradio app (default)')
+    p.add_argument('--host', default=None, help='address to bind (Gradio default: 127.0.0.1)')
+    p.add_argument('--port', type=int, default=None, help='port to serve on (Gradio default: 7860)')
+    p.add_argument('--share', action='store_true', help='create a public Gradio share link')
+    p.set_defaults(func=cmd_ui)
+
+    p = sub.add_parser('run', help='run the pipeline once without the UI')
+    p.add_argument('--sketch', help='black-and-white floorplan image')
+    p.add_argument('--layout', default='', help='spaces and materials, e.g. "wood floor living room, tile bathroom"')
+    p.add_argument('--space', action='append', help='a room to render (up to 4, repeat the option)')
+    p.add_argument('--model', default=None, help='image model (default gemini-2.5-flash-image)')
+    p.add_argument('--aspect-ratio', default='16:9')
+    p.add_argument('--tripo', action='store_true', help='also generate the 3D model with Tripo and wait for it')
+    p.add_argument('--force', action='store_true', help='ignore the render cache')
+    p.add_argument('--concurrency', type=int, default=None, help='image calls in flight (default RENDER_CONCURRENCY)')
+    p.add_argument('--json', action='store_true', help='print the result as JSON')
+    p.set_defaults(func=cmd_run)
+
+    p = sub.add_parser('batch', help='run the pipeline over many sketches')
+    p.add_argument('source', help='directory of sketches, or a .json / .jsonl / .csv manifest')
+    p.add_argument('--out', default=None, help='batch directory (default runs/batch_<source name>); rerun to resume')
+    p.add_argument('--layout', default='', help='layout prompt for items that do not set one')
+    p.add_argument('--space', action='append', help='room to render for items that do not set spaces (up to 4)')
+    p.add_argument('--model', default=None, help='image model (default gemini-2.5-flash-image)')
+    p.add_argument('--aspect-ratio', default='16:9')
+    p.add_argument('--tripo', action='store_true', help='also generate 3D models (unless an item says otherwise)')
+    p.add_argument('--force', action='store_true', help='re-run completed items and ignore the render cache')
+    p.add_argument('--concurrency', type=int, default=None, help='items processed at once (default BATCH_CONCURRENCY)')
+    p.set_defaults(func=cmd_batch)
+
+    p = sub.add_parser('workflows', help='list the ComfyUI workflows')
+    p.set_defaults(func=cmd_workflows)
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.command is None:
+        args = build_parser().parse_args(['ui'])
+    if args.command == 'run' and len(args.space or []) > 4:
+        print('run: at most 4 --space values', file=sys.stderr)
+        return 2
+    return args.func(args)
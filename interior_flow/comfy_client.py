@@ -0,0 +1,235 @@
+"""Async ComfyUI client, used on the background loop (interior_flow/loop.py).
+
+`AsyncComfyClient` talks to one ComfyUI server over a pooled httpx client
+(POST /prompt, GET /history, GET /view) and a single persistent websocket
+(`/ws?clientId=...`). A reader task routes websocket events to the prompt they
+belong to, so any number of concurrent runs share that one connection. The
+websocket is reopened on demand after a disconnect.
+"""
+import asyncio
+import json
+import threading
+import uuid
+from typing import Callable, Dict, NamedTuple, Optional
+from urllib.parse import urlsplit
+
+import websockets
+
+from interior_flow.http_pool import get_async_client
+from interior_flow.workflow_graph import IMAGE_OUTPUT_CLASSES
+
+# events that arrive before their prompt is registered (the POST /prompt response
+# can lose the race with the first websocket message)
+MAX_EARLY_EVENTS = 256
+
+
+class ComfyExecutionError(RuntimeError):
+    pass
+
+
+class ComfyConnectionError(ComfyExecutionError):
+    """The backend went away or is failing (5xx, dropped websocket), as opposed to a bad graph."""
+
+
+class ComfyUpdate(NamedTuple):
+    kind: str  # 'dispatched', 'fallback', 'executing', 'progress', 'cached', 'images' or 'done'
+    node: str = ''
+    value: int = 0
+    max: int = 0
+    images: tuple = ()  # ((filename, bytes), ...) for 'images'
+    refs: tuple = ()  # the matching {'filename', 'subfolder', 'type'} entries on the backend
+
+
+class AsyncComfyClient:
+    def __init__(self, base_url: str, client_id: str = None):
+        self.base_url = base_url.rstrip('/')
+        parts = urlsplit(self.base_url)
+        ws_scheme = 'wss' if parts.scheme == 'https' else 'ws'
+        self.client_id = client_id or uuid.uuid4().hex
+        self.ws_url = f'{ws_scheme}://{parts.netloc}{parts.path}/ws?clientId={self.client_id}'
+        self._ws = None
+        self._reader = None
+        self._ws_lock = None
+        self._listeners: Dict[str, asyncio.Queue] = {}
+        self._early: Dict[str, list] = {}
+
+    # -- HTTP -------------------------------------------------------------------------
+
+    @property
+    def http(self):
+        return get_async_client(self.base_url)
+
+    async def queue_prompt(self, prompt: dict) -> str:
+        await self._ensure_ws()
+        r = await self.http.post(f'{self.base_url}/prompt', json={'prompt': dict(prompt), 'client_id': self.client_id})
+        if r.status_code != 200:
+            error = ComfyConnectionError if r.status_code >= 500 else ComfyExecutionError
+            raise error(f'ComfyUI /prompt error {r.status_code}: {r.text[:1000]}')
+        prompt_id = r.json()['prompt_id']
+        self._listen(prompt_id)
+        return prompt_id
+
+    async def get_history(self, prompt_id: str) -> dict:
+        r = await self.http.get(f'{self.base_url}/history/{prompt_id}')
+        r.raise_for_status()
+        return r.json()
+
+    async def get_image(self, filename: str, subfolder: str = '', folder_type: str = 'output') -> bytes:
+        r = await self.http.get(f'{self.base_url}/view', params={'filename': filename, 'subfolder': subfolder, 'type': folder_type})
+        r.raise_for_status()
+        return r.content
+
+    # -- websocket --------------------------------------------------------------------
+
+    async def _ensure_ws(self):
+        if self._ws_lock is None:
+            self._ws_lock = asyncio.Lock()
+        async with self._ws_lock:
+            if self._reader is not None and not self._reader.done():
+                return
+            self._ws = await websockets.connect(self.ws_url, max_size=None)
+            self._reader = asyncio.get_running_loop().create_task(self._read(self._ws))
+
+    async def _read(self, ws):
+        try:
+            async for raw in ws:
+                if not isinstance(raw, str):
+                    # binary frames are live previews; nobody consumes them here
+                    continue
+                try:
+                    message = json.loads(raw)
+                except ValueError:
+                    continue
+                prompt_id = (message.get('data') or {}).get('prompt_id')
+                if not prompt_id:
+                    continue
+                queue = self._listeners.get(prompt_id)
+                if queue is not None:
+                    queue.put_nowait(message)
+                else:
+                    self._early.setdefault(prompt_id, []).append(message)
+                    while len(self._early) > MAX_EARLY_EVENTS:
+                        self._early.pop(next(iter(self._early)))
+        except Exception:
+            pass
+        finally:
+            # wake every waiter; the next queue_prompt() reconnects
+            for queue in self._listeners.values():
+                queue.put_nowait({'type': 'disconnected', 'data': {}})
+
+    def _listen(self, prompt_id: str) -> asyncio.Queue:
+        queue = self._listeners.get(prompt_id)
+        if queue is None:
+            queue = self._listeners[prompt_id] = asyncio.Queue()
+            for message in self._early.pop(prompt_id, []):
+                queue.put_nowait(message)
+        return queue
+
+    async def events(self, prompt_id: str):
+        """Yield every websocket event for the prompt until it finished executing.
+
+        Raises ComfyExecutionError on execution errors, interrupts, or a disconnect before
+        the prompt is found in /history.
+        """
+        queue = self._listen(prompt_id)
+        try:
+            while True:
+                message = await queue.get()
+                kind, data = message.get('type'), message.get('data') or {}
+                if kind == 'execution_error':
+                    raise ComfyExecutionError(f"ComfyUI execution error in node {data.get('node_id')}: {data.get('exception_message')}")
+                if kind == 'execution_interrupted':
+                    raise ComfyExecutionError('ComfyUI execution interrupted')
+                if kind == 'disconnected':
+                    # lost the websocket mid-run: fall back to the history entry
+                    history = await self.get_history(prompt_id)
+                    if prompt_id in history:
+                        return
+                    raise ComfyConnectionError('ComfyUI websocket disconnected before the prompt finished')
+                yield message
+                if kind == 'execution_success' or (kind == 'executing' and data.get('node') is None):
+                    return
+        finally:
+            self._listeners.pop(prompt_id, None)
+
+    async def wait(self, prompt_id: str, on_event: Optional[Callable[[dict], None]] = None) -> str:
+        """Wait until the prompt finished executing; `on_event(message)` sees every event for it."""
+        async for message in self.events(prompt_id):
+            if on_event is not None:
+                on_event(message)
+        return prompt_id
+
+    # -- high level -------------------------------------------------------------------
+
+    async def queue_and_wait_images(self, workflow: dict, output_node_title: str, on_event=None) -> dict:
+        """Same contract as ComfyApiWrapper.queue_and_wait_images: {filename: bytes}."""
+        prompt_id = await self.queue_prompt(workflow)
+        await self.wait(prompt_id, on_event)
+        history = (await self.get_history(prompt_id))[prompt_id]
+        node_id = node_id_for_title(workflow, output_node_title)
+        images = history['outputs'][node_id]['images']
+        return {img['filename']: await self.get_image(img['filename'], img['subfolder'], img['type']) for img in images}
+
+    async def stream(self, workflow: dict, output_classes=IMAGE_OUTPUT_CLASSES):
+        """Queue `workflow` and yield ComfyUpdate items while it runs.
+
+        'executing' / 'progress' / 'cached' updates report per-node progress; an 'images'
+        update carries ((filename, bytes), ...) as soon as an output node of
+        `output_classes` finishes, long before the whole graph is done.
+        """
+        prompt_id = await self.queue_prompt(workflow)
+        delivered = set()
+        async for message in self.events(prompt_id):
+            kind, data = message.get('type'), message.get('data') or {}
+            if kind == 'executing' and data.get('node') is not None:
+                yield ComfyUpdate('executing', str(data['node']))
+            elif kind == 'progress':
+                yield ComfyUpdate('progress', str(data.get('node') or ''), data.get('value', 0), data.get('max', 0))
+            elif kind == 'execution_cached':
+                for nid in data.get('nodes') or ():
+                    yield ComfyUpdate('cached', str(nid))
+            elif kind == 'executed':
+                nid = str(data.get('node') or '')
+                images = (data.get('output') or {}).get('images') or []
+                if images and (workflow.get(nid) or {}).get('class_type') in output_classes:
+                    delivered.add(nid)
+                    yield ComfyUpdate('images', nid, images=await self._fetch_images(images), refs=tuple(images))
+        # cached output nodes never send 'executed' (and a dropped websocket loses events):
+        # pick up whatever else the history lists for this prompt
+        outputs = ((await self.get_history(prompt_id)).get(prompt_id) or {}).get('outputs') or {}
+        for nid, output in outputs.items():
+            images = output.get('images') or []
+            if nid not in delivered and images and (workflow.get(nid) or {}).get('class_type') in output_classes:
+                yield ComfyUpdate('images', nid, images=await self._fetch_images(images), refs=tuple(images))
+        yield ComfyUpdate('done')
+
+    async def _fetch_images(self, images) -> tuple:
+        return tuple([(img['filename'], await self.get_image(img['filename'], img.get('subfolder', ''), img.get('type', 'output')))
+                      for img in images])
+
+    async def close(self):
+        if self._ws is not None:
+            await self._ws.close()
+        if self._reader is not None:
+            await asyncio.gather(self._reader, return_exceptions=True)
+
+
+def node_id_for_title(workflow: dict, title: str) -> str:
+    for nid, node in workflow.items():
+        if (node.get('_meta') or {}).get('title') == title:
+            return nid
+    raise KeyError(f'No node titled {title!r} in workflow')
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_comfy_client(base_url: str) -> AsyncComfyClient:
+    """Process-wide client per ComfyUI server (use it on the background loop)."""
+    key = base_url.rstrip('/')
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = _clients[key] = AsyncComfyClient(key)
+        return client
@@ -0,0 +1,212 @@
+"""Pool of ComfyUI backends with health checks, load-aware dispatch and failover.
+
+Backends come from COMFY_API_URLS (comma-separated), falling back to the single
+COMFY_API_URL. Each backend is probed with GET /system_stats (alive) and GET /queue
+(running + pending prompts) at most every COMFY_HEALTH_TTL seconds; a prompt goes
+to the healthy backend with the shortest queue, counting prompts this process has
+in flight there. If a backend refuses the prompt with a server error, or drops the
+connection before the run produced anything, the prompt is retried on the next
+one. Local input images referenced by LoadImage nodes are uploaded to the chosen
+backend (POST /upload/image, once per file content) since the boxes do not share
+a filesystem.
+
+    COMFY_API_URLS      e.g. http://gpu1:8188,http://gpu2:8188
+    COMFY_HEALTH_TTL    seconds between health/queue probes per backend (default 5)
+"""
+import asyncio
+import os
+import threading
+import time
+from pathlib import Path
+from typing import List, NamedTuple, Optional
+
+import httpx
+from websockets.exceptions import WebSocketException
+
+from interior_flow.comfy_client import (IMAGE_OUTPUT_CLASSES, AsyncComfyClient, ComfyConnectionError,
+                                        ComfyUpdate, get_comfy_client)
+from interior_flow.render_cache import file_sha256
+
+HEALTH_TTL = float(os.environ.get('COMFY_HEALTH_TTL', '5'))
+FAILOVER_ERRORS = (ComfyConnectionError, httpx.TransportError, OSError, WebSocketException)
+
+
+class ComfyUnavailable(ComfyConnectionError):
+    pass
+
+
+class Backend:
+    def __init__(self, url: str):
+        self.url = url.rstrip('/')
+        self.client: AsyncComfyClient = get_comfy_client(self.url)
+        self.healthy = True
+        self.queue_depth = 0
+        self.inflight = 0
+        self.checked = 0.0
+        self.uploads = {}  # sha256 -> name on this backend
+
+    @property
+    def load(self) -> int:
+        # /queue already includes our prompts once it has been refreshed; take the larger view
+        return max(self.queue_depth, self.inflight)
+
+    async def refresh(self):
+        http = self.client.http
+        try:
+            r = await http.get(f'{self.url}/system_stats', timeout=5.0)
+            r.raise_for_status()
+            q = (await http.get(f'{self.url}/queue', timeout=5.0)).json()
+            self.queue_depth = len(q.get('queue_running') or []) + len(q.get('queue_pending') or [])
+            self.healthy = True
+        except Exception:
+            self.healthy = False
+        self.checked = time.monotonic()
+
+    def mark_down(self):
+        self.healthy = False
+        self.checked = time.monotonic()
+
+    async def upload_image(self, path: Path) -> str:
+        """Upload a local image once (by content) and return the value for a LoadImage input."""
+        digest = file_sha256(path)
+        name = self.uploads.get(digest)
+        if name:
+            return name
+        files = {'image': (f'{digest[:16]}{path.suffix}', path.read_bytes(), 'application/octet-stream')}
+        r = await self.client.http.post(f'{self.url}/upload/image', files=files, data={'overwrite': 'true', 'type': 'input'})
+        if r.status_code >= 500:
+            raise ComfyConnectionError(f'ComfyUI upload error {r.status_code}: {r.text[:300]}')
+        r.raise_for_status()
+        j = r.json()
+        name = f"{j['subfolder']}/{j['name']}" if j.get('subfolder') else j['name']
+        self.uploads[digest] = name
+        return name
+
+
+class Lease(NamedTuple):
+    backend: Backend
+    prompt_id: str
+    workflow: dict
+
+    @property
+    def client(self) -> AsyncComfyClient:
+        return self.backend.client
+
+
+class ComfyPool:
+    def __init__(self, urls: List[str], health_ttl: float = HEALTH_TTL):
+        if not urls:
+            raise ValueError('ComfyPool needs at least one backend URL')
+        self.backends = [Backend(u) for u in urls]
+        self.health_ttl = health_ttl
+
+    async def _refresh_stale(self):
+        now = time.monotonic()
+        stale = [b for b in self.backends if now - b.checked >= self.health_ttl]
+        if stale:
+            await asyncio.gather(*(b.refresh() for b in stale))
+
+    async def pick(self, exclude=()) -> Backend:
+        """The healthy backend with the least work, refreshing stale health/queue info first."""
+        await self._refresh_stale()
+        candidates = [b for b in self.backends if b.healthy and b not in exclude]
+        if not candidates:
+            raise ComfyUnavailable('No healthy ComfyUI backend available: ' + ', '.join(b.url for b in self.backends))
+        return min(candidates, key=lambda b: b.load)
+
+    async def _localize(self, backend: Backend, workflow: dict) -> dict:
+        # LoadImage inputs that point at files on this machine must be uploaded to the backend
+        graph = None
+        for nid, node in workflow.items():
+            if node.get('class_type') != 'LoadImage':
+                continue
+            value = (node.get('inputs') or {}).get('image')
+            if not isinstance(value, str) or not Path(value).is_absolute() or not Path(value).is_file():
+                continue
+            name = await backend.upload_image(Path(value))
+            graph = graph or dict(workflow)
+            graph[nid] = dict(node, inputs=dict(node['inputs'], image=name))
+        return graph or workflow
+
+    async def submit(self, workflow: dict) -> Lease:
+        """Queue `workflow` on the least-loaded backend (failing over on connection errors)."""
+        tried = []
+        while True:
+            backend = await self.pick(exclude=tried)
+            backend.inflight += 1
+            try:
+                graph = await self._localize(backend, workflow)
+                prompt_id = await backend.client.queue_prompt(graph)
+                return Lease(backend, prompt_id, graph)
+            except FAILOVER_ERRORS:
+                backend.inflight -= 1
+                backend.mark_down()
+                tried.append(backend)
+            except Exception:
+                backend.inflight -= 1
+                raise
+
+    def release(self, lease: Lease):
+        lease.backend.inflight = max(0, lease.backend.inflight - 1)
+
+    def backend(self, url: str) -> Optional[Backend]:
+        url = (url or '').rstrip('/')
+        return next((b for b in self.backends if b.url == url), None)
+
+    async def stream(self, workflow: dict, output_classes=IMAGE_OUTPUT_CLASSES, prefer: str = None, fallback: dict = None):
+        """Like AsyncComfyClient.stream, on the least-loaded backend.
+
+        Starts with a 'dispatched' update naming the backend. Fails over to another
+        backend while the run has not produced any progress yet.
+
+        With `prefer`, `workflow` is pinned to that backend (it references files only
+        that backend has). If the backend is down or rejects the graph, a 'fallback'
+        update is yielded and `fallback` (the self-contained graph) runs instead.
+        """
+        tried = []
+        rejected = False
+        while True:
+            pinned = self.backend(prefer) if prefer else None
+            if prefer and (pinned is None or not pinned.healthy or rejected):
+                prefer, workflow = None, fallback
+                yield ComfyUpdate('fallback')
+                continue
+            backend = pinned or await self.pick(exclude=tried)
+            backend.inflight += 1
+            progressed = False
+            try:
+                yield ComfyUpdate('dispatched', backend.url)
+                graph = await self._localize(backend, workflow)
+                async for upd in backend.client.stream(graph, output_classes):
+                    progressed = True
+                    yield upd
+                return
+            except FAILOVER_ERRORS:
+                backend.mark_down()
+                if progressed:
+                    raise
+                tried.append(backend)
+            except Exception:
+                if progressed or not pinned:
+                    raise
+                # the pinned graph was rejected (e.g. a reused file is gone): run the full graph
+                rejected = True
+            finally:
+                backend.inflight = max(0, backend.inflight - 1)
+
+
+def backend_urls() -> List[str]:
+    urls = os.environ.get('COMFY_API_URLS') or os.environ.get('COMFY_API_URL') or 'http://127.0.0.1:8000/'
+    return [u.strip() for u in urls.split(',') if u.strip()]
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_comfy_pool() -> ComfyPool:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ComfyPool(backend_urls())
+        return _pool
@@ -0,0 +1,155 @@
+"""Streaming, resumable downloads for model files and other large artifacts.
+
+`download()` writes each chunk to `<name>.part` as it arrives, so memory stays flat
+for any file size and a dropped connection loses nothing already received. It then
+resumes with an HTTP Range request instead of starting over, guarded by If-Range with
+the ETag or Last-Modified of the first response; that validator is kept next to the
+part file (`<name>.part.validator`) so a later process resumes safely too, and a part
+file without one is fetched again from the start. The result is checked against the announced size (Content-Length / Content-Range) and,
+when the caller knows them, an expected size and sha256, then renamed into place:
+watchers of the output directory only ever see complete files.
+`download_all()` fetches several files concurrently.
+
+    DOWNLOAD_RETRIES       resumes after a dropped connection or 5xx (default 4)
+    DOWNLOAD_CONCURRENCY   files fetched at once by download_all (default 4)
+"""
+import asyncio
+import os
+import re
+import uuid
+from pathlib import Path
+from typing import Iterable, List, NamedTuple, Optional, Union
+
+import httpx
+
+from interior_flow.http_pool import get_async_client
+from interior_flow.render_cache import file_sha256
+
+RETRIES = int(os.environ.get('DOWNLOAD_RETRIES', '4'))
+CONCURRENCY = int(os.environ.get('DOWNLOAD_CONCURRENCY', '4'))
+# no overall deadline for big files, only for connecting and for a stalled read
+TIMEOUT = httpx.Timeout(None, connect=30.0, read=120.0)
+
+
+class DownloadError(RuntimeError):
+    pass
+
+
+class Download(NamedTuple):
+    url: str
+    name: Optional[str] = None  # file name in the output directory (default: from the URL)
+    size: Optional[int] = None  # expected size in bytes, when known
+    sha256: Optional[str] = None  # expected hex digest, when known
+
+
+def name_from_url(url: str) -> str:
+    return url.split('?')[0].rstrip('/').split('/')[-1] or f'{uuid.uuid4().hex}.bin'
+
+
+def _total_size(r: httpx.Response) -> Optional[int]:
+    """Full size of the remote file from Content-Range (206/416) or Content-Length (200)."""
+    m = re.search(r'/(\d+)\s*$', r.headers.get('content-range', ''))
+    if m:
+        return int(m.group(1))
+    if r.status_code == 200 and r.headers.get('content-length', '').isdigit():
+        return int(r.headers['content-length'])
+    return None
+
+
+def _validator(r: httpx.Response) -> Optional[str]:
+    """The If-Range value for this response: a strong ETag, else Last-Modified."""
+    etag = r.headers.get('etag')
+    if etag and not etag.startswith('W/'):
+        return etag
+    return r.headers.get('last-modified')
+
+
+def _discard(*paths: Path):
+    for p in paths:
+        try:
+            p.unlink()
+        except FileNotFoundError:
+            pass
+
+
+async def download(url: str, outdir, name: str = None, size: int = None, sha256: str = None,
+                   retries: int = RETRIES) -> Path:
+    """Download `url` into `outdir` (see the module docstring); returns the final path."""
+    outdir = Path(outdir)
+    outdir.mkdir(parents=True, exist_ok=True)
+    out = outdir / (name or name_from_url(url))
+    tmp = out.with_name(out.name + '.part')
+    meta = out.with_name(out.name + '.part.validator')
+    total = size  # from the server once it says, else the caller's expectation
+    last_error = None
+    for attempt in range(retries + 1):
+        if attempt:
+            await asyncio.sleep(min(2 ** attempt, 15))
+        offset = tmp.stat().st_size if tmp.exists() else 0
+        validator = meta.read_text(encoding='utf-8').strip() if meta.exists() else ''
+        if offset and not validator:
+            # nothing tells whether the part file still matches the remote one
+            _discard(tmp)
+            offset = 0
+        headers = {}
+        if offset:
+            headers['Range'] = f'bytes={offset}-'
+            headers['If-Range'] = validator
+        try:
+            async with get_async_client(url).stream('GET', url, headers=headers, follow_redirects=True,
+                                                    timeout=TIMEOUT) as r:
+                if r.status_code == 416 and offset:
+                    # nothing left to fetch: the part file is complete, or stale
+                    total = _total_size(r) or total
+                    if total == offset:
+                        break
+                    _discard(tmp, meta)
+                    last_error = DownloadError(f'{url}: stale partial download discarded')
+                    continue
+                if r.status_code >= 500:
+                    last_error = DownloadError(f'{url}: HTTP {r.status_code}')
+                    continue
+                r.raise_for_status()
+                if r.status_code != 206:
+                    offset = 0  # the server ignored the Range (or the file changed): start over
+                    validator = _validator(r)
+                    if validator:
+                        meta.write_text(validator, encoding='utf-8')
+                    else:
+                        _discard(meta)
+                total = _total_size(r) or total
+                with tmp.open('ab' if offset else 'wb') as f:
+                    async for chunk in r.aiter_bytes():
+                        f.write(chunk)
+        except httpx.TransportError as e:
+            last_error = e
+            continue
+        if total is None or tmp.stat().st_size >= total:
+            break
+        last_error = DownloadError(f'{url}: connection closed at {tmp.stat().st_size} of {total} bytes')
+    else:
+        raise DownloadError(f'{url}: download failed after {retries + 1} attempts: {last_error}')
+
+    got = tmp.stat().st_size
+    for expected in {total, size} - {None}:
+        if got != expected:
+            _discard(tmp, meta)
+            raise DownloadError(f'{url}: expected {expected} bytes, got {got}')
+    if sha256 and file_sha256(tmp) != sha256.lower():
+        _discard(tmp, meta)
+        raise DownloadError(f'{url}: sha256 mismatch')
+    os.replace(tmp, out)
+    _discard(meta)
+    return out
+
+
+async def download_all(items: Iterable[Union[str, Download]], outdir, concurrency: int = None) -> List[Union[Path, Exception]]:
+    """Download URLs (or `Download`s) concurrently; one Path or exception per item, in order."""
+    items = [Download(i) if isinstance(i, str) else i for i in items]
+    slots = asyncio.Semaphore(max(1, int(concurrency or CONCURRENCY)))
+
+    async def _one(item: Download):
+        async with slots:
+            return await download(item.url, outdir, item.name, item.size, item.sha256)
+
+    return list(await asyncio.gather(*(_one(i) for i in items), return_exceptions=True))
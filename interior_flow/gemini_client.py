@@ -0,0 +1,120 @@
+"""In-process client for chat-completions style Gemini image models.
+
+Replaces spawning `tools/run_gemini25_chat.py` for every image: the caller gets the
+saved file path back directly instead of diffing `tools/generated_gemini25_from_*`.
+`tools/run_gemini25_chat.py` is now a thin CLI around `generate_image`.
+"""
+import base64
+import json
+import os
+import uuid
+from pathlib import Path
+from typing import Optional
+
+from interior_flow.http_pool import get_client
+from interior_flow.image_payload import decode_to_file, find_image_payload, stream_to_file
+from interior_flow.settings import DOCS_DIR, TOOLS_DIR
+
+DEFAULT_DOC = DOCS_DIR / 'image (5).png'
+DEFAULT_MODEL = 'gemini-2.5-flash-image'
+DEFAULT_PROMPT = (
+    "Convert this black-and-white architectural floor plan into a clean colored 2D floor-plan illustration, "
+    "keeping walls, doors and furniture positions accurate."
+)
+
+
+def api_base() -> str:
+    base = os.environ.get('GOOGLE_GEMINI_BASE_URL') or os.environ.get('NANO_API_URL') or os.environ.get('API_URL') or 'https://newapi.pockgo.com'
+    return base.rstrip('/')
+
+
+def api_key() -> Optional[str]:
+    # Prefer COMFY_GEMINI_API_KEY for local setups, then fall back to other env names
+    return (os.environ.get('COMFY_GEMINI_API_KEY') or os.environ.get('GEMINI_API_KEY') or os.environ.get('NANO_API_KEY')
+            or os.environ.get('API_KEY') or os.environ.get('GOOGLE_API_KEY'))
+
+
+def image_data_url(path: Path) -> str:
+    b64 = base64.b64encode(Path(path).read_bytes()).decode('utf-8')
+    mime = 'image/jpeg' if Path(path).suffix.lower() in ('.jpg', '.jpeg') else 'image/png'
+    return f'data:{mime};base64,{b64}'
+
+
+def build_payload(prompt: str, data_url: str, aspect_ratio: str = '16:9', model: str = DEFAULT_MODEL) -> dict:
+    return {
+        "extra_body": {
+            "imageConfig": {"aspectRatio": aspect_ratio}
+        },
+        "model": model,
+        "messages": [
+            {"role": "system", "content": json.dumps({"imageConfig": {"aspectRatio": aspect_ratio}})},
+            {
+                "role": "user",
+                "content": [
+                    {"type": "text", "text": prompt},
+                    {"type": "image_url", "image_url": {"url": data_url}}
+                ]
+            }
+        ],
+        "max_tokens": 150,
+        "temperature": 0.7
+    }
+
+
+def generate_image(prompt: str, image_path=None, aspect_ratio: str = '16:9', model: str = DEFAULT_MODEL,
+                   out_path: Optional[Path] = None, response_path: Optional[Path] = None,
+                   placeholder_on_quota: bool = True) -> Optional[Path]:
+    """Generate one image and save it to `out_path` (a unique file in tools/ by default).
+
+    `image_path` is sent as the reference image; without one the default floor plan in
+    documents/ is used, as the old helper script did. The raw response is kept at
+    `response_path` (default tools/gemini25_chat_response.json). Returns the saved path,
+    or None when the response contained no image. Request errors and HTTP error
+    statuses (other than the quota error, see `placeholder_on_quota`) propagate to the caller.
+    """
+    key = api_key()
+    if not key:
+        raise RuntimeError('Missing API key in environment (set NANO_API_KEY or GOOGLE_API_KEY).')
+
+    in_path = Path(image_path) if image_path and Path(image_path).exists() else DEFAULT_DOC
+    if not in_path.exists():
+        raise FileNotFoundError(str(in_path))
+    out_path = Path(out_path) if out_path else TOOLS_DIR / f'generated_gemini25_from_{uuid.uuid4().hex}.png'
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+
+    payload = build_payload(prompt or DEFAULT_PROMPT, image_data_url(in_path), aspect_ratio or '16:9', model or DEFAULT_MODEL)
+    headers = {"Authorization": f"Bearer {key}", "Content-Type": "application/json"}
+    endpoint = api_base() + '/v1/chat/completions'
+    r = get_client(endpoint).post(endpoint, headers=headers, json=payload)
+
+    # keep the last raw response around for debugging (raw bytes, no re-serialization)
+    resp_path = Path(response_path) if response_path else TOOLS_DIR / 'gemini25_chat_response.json'
+    try:
+        j = r.json()
+    except Exception:
+        j = None
+    try:
+        resp_path.write_bytes(r.content)
+    except Exception:
+        pass
+
+    # If provider returned insufficient quota, hand back a placeholder so downstream flow can continue for testing
+    if placeholder_on_quota and isinstance(j, dict):
+        err = j.get('error')
+        if isinstance(err, dict) and err.get('code') == 'insufficient_user_quota':
+            # named *_placeholder so callers (e.g. the render cache) can tell it apart from a real render
+            placeholder = out_path.with_name(out_path.stem + '_placeholder' + out_path.suffix)
+            placeholder.write_bytes(DEFAULT_DOC.read_bytes())
+            return placeholder
+    r.raise_for_status()
+
+    # Single pass over the parsed response; base64 is decoded straight to disk
+    found = find_image_payload(j) if j is not None else None
+    if found is None:
+        return None
+    if found.kind == 'base64':
+        return decode_to_file(found, out_path)
+    try:
+        return stream_to_file(get_client(found.source), found.source, out_path)
+    except Exception:
+        return None
@@ -0,0 +1,104 @@
+"""Process-wide pooled HTTP clients for all provider calls.
+
+Every call to the same origin (scheme://host:port) shares one keep-alive client, so
+image requests to the Gemini/nanoapi gateways stop redoing DNS + TLS each time. The
+pool size of each per-origin client is the per-host connection limit. HTTP/2 is used
+when the optional `h2` package is installed.
+
+Sync clients live for the whole process (closed at exit or via `close_clients()`).
+Async clients are bound to the event loop that created them; close them with
+`aclose_async_clients()` before that loop shuts down.
+"""
+import asyncio
+import atexit
+import os
+import threading
+import weakref
+from urllib.parse import urlsplit
+
+import httpx
+
+try:
+    import h2  # noqa: F401
+    HTTP2 = True
+except ImportError:
+    HTTP2 = False
+
+DEFAULT_TIMEOUT = httpx.Timeout(300.0, connect=30.0)
+MAX_CONNECTIONS_PER_HOST = int(os.environ.get('HTTP_MAX_CONNECTIONS_PER_HOST', '8'))
+MAX_KEEPALIVE_PER_HOST = int(os.environ.get('HTTP_MAX_KEEPALIVE_PER_HOST', '4'))
+KEEPALIVE_EXPIRY = 60.0
+
+_lock = threading.Lock()
+_sync_clients = {}
+# event loop -> {origin: AsyncClient}
+_async_clients = weakref.WeakKeyDictionary()
+
+
+def _origin(url) -> str:
+    if not url:
+        return ''
+    parts = urlsplit(str(url))
+    return f'{parts.scheme}://{parts.netloc}'.lower()
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=MAX_CONNECTIONS_PER_HOST,
+        max_keepalive_connections=MAX_KEEPALIVE_PER_HOST,
+        keepalive_expiry=KEEPALIVE_EXPIRY,
+    )
+
+
+def get_client(url=None) -> httpx.Client:
+    """Return the shared sync client for the origin of `url`."""
+    key = _origin(url)
+    with _lock:
+        client = _sync_clients.get(key)
+        if client is None or client.is_closed:
+            client = httpx.Client(timeout=DEFAULT_TIMEOUT, limits=_limits(), http2=HTTP2)
+            _sync_clients[key] = client
+        return client
+
+
+def get_async_client(url=None) -> httpx.AsyncClient:
+    """Return the shared async client for the origin of `url` on the running event loop."""
+    loop = asyncio.get_running_loop()
+    key = _origin(url)
+    with _lock:
+        clients = _async_clients.setdefault(loop, {})
+        client = clients.get(key)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(timeout=DEFAULT_TIMEOUT, limits=_limits(), http2=HTTP2)
+            clients[key] = client
+        return client
+
+
+def request(method: str, url: str, **kwargs) -> httpx.Response:
+    return get_client(url).request(method, url, **kwargs)
+
+
+def close_clients():
+    with _lock:
+        clients = list(_sync_clients.values())
+        _sync_clients.clear()
+    for client in clients:
+        try:
+            client.close()
+        except Exception:
+            pass
+
+
+async def aclose_async_clients():
+    """Close the async clients owned by the running event loop."""
+    loop = asyncio.get_running_loop()
+    with _lock:
+        clients = list(_async_clients.pop(loop, {}).values())
+    for client in clients:
+        try:
+            await client.aclose()
+        except Exception:
+            pass
+
+
+atexit.register(close_clients)
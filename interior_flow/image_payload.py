@@ -0,0 +1,106 @@
+"""Locate and decode image payloads in provider JSON responses.
+
+The parsed response is walked once, in document order, looking for the first
+`data:image/...;base64,` string or `b64_json`/`b64` field; if there is none, the first
+http(s) URL ending in an image extension is returned instead. Base64 payloads are
+decoded in fixed-size chunks straight to disk, so a multi-MB image is never
+re-serialized, regex-scanned, sliced or held fully decoded in memory.
+"""
+import base64
+import re
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+B64_KEYS = ('b64_json', 'b64')
+IMAGE_EXTS = ('.png', '.jpg', '.jpeg', '.webp')
+# 4 * 64K base64 chars -> 192KB decoded per write
+CHUNK_CHARS = 4 * 64 * 1024
+
+_B64_END = re.compile(r'[^A-Za-z0-9+/=]')
+_URL = re.compile(r'https?://[\w\-\.\/:?=&,%~+]+')
+
+
+class ImagePayload(NamedTuple):
+    kind: str  # 'base64' or 'url'
+    source: str  # the string holding the payload (or the URL itself)
+    start: int = 0
+    end: int = 0
+
+
+def _data_url_payload(s: str) -> Optional[ImagePayload]:
+    i = s.find('data:image/')
+    if i == -1:
+        return None
+    j = s.find(';base64,', i)
+    if j == -1:
+        return None
+    start = j + len(';base64,')
+    m = _B64_END.search(s, start)
+    return ImagePayload('base64', s, start, m.start() if m else len(s))
+
+
+def _image_url(s: str) -> Optional[str]:
+    if 'http' not in s:
+        return None
+    for m in _URL.finditer(s):
+        u = m.group(0)
+        if u.lower().endswith(IMAGE_EXTS):
+            return u
+    return None
+
+
+def find_image_payload(obj, b64_keys=B64_KEYS) -> Optional[ImagePayload]:
+    """Return the first embedded base64 image in `obj`, else the first image URL, else None."""
+    first_url = None
+    stack = [obj]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            for k, v in node.items():
+                if k in b64_keys and isinstance(v, str) and v:
+                    found = _data_url_payload(v) if v.startswith('data:') else ImagePayload('base64', v, 0, len(v))
+                    if found:
+                        return found
+            stack.extend(reversed(list(node.values())))
+        elif isinstance(node, list):
+            stack.extend(reversed(node))
+        elif isinstance(node, str):
+            found = _data_url_payload(node)
+            if found:
+                return found
+            if first_url is None:
+                first_url = _image_url(node)
+    if first_url:
+        return ImagePayload('url', first_url, 0, len(first_url))
+    return None
+
+
+def decode_to_file(payload: ImagePayload, out_path: Path) -> Path:
+    """Decode a base64 payload into `out_path` chunk by chunk."""
+    s, pos, end = payload.source, payload.start, payload.end
+    out_path = Path(out_path)
+    if _B64_END.search(s, pos, end):
+        # wrapped/whitespace-separated base64 (only possible for raw b64 fields): let b64decode skip it
+        out_path.write_bytes(base64.b64decode(s[pos:end]))
+        return out_path
+    with out_path.open('wb') as f:
+        while pos < end:
+            stop = min(pos + CHUNK_CHARS, end)
+            piece = s[pos:stop]
+            pos = stop
+            if pos >= end and len(piece) % 4:
+                # tolerate missing trailing padding
+                piece += '=' * (-len(piece) % 4)
+            f.write(base64.b64decode(piece))
+    return out_path
+
+
+def stream_to_file(client, url: str, out_path: Path, timeout: float = 120.0) -> Path:
+    """Download `url` with `client` into `out_path` without buffering the whole body."""
+    out_path = Path(out_path)
+    with client.stream('GET', url, timeout=timeout, follow_redirects=True) as r:
+        r.raise_for_status()
+        with out_path.open('wb') as f:
+            for chunk in r.iter_bytes():
+                f.write(chunk)
+    return out_path
@@ -0,0 +1,138 @@
+"""Background job queue for long-running generation runs.
+
+`submit()` returns a job id immediately; a bounded worker pool executes the job and
+the UI follows it with `subscribe()`, which yields a snapshot every time the job
+reports progress or finishes. `provider_slot()` caps how many provider (image model)
+calls are in flight across all jobs, independent of how many jobs are running.
+
+    JOB_WORKERS          concurrent jobs (default 4)
+    MAX_PROVIDER_CALLS   concurrent provider calls across all jobs (default 6)
+"""
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+QUEUED, RUNNING, DONE, FAILED = 'queued', 'running', 'done', 'failed'
+# finished jobs kept around for late subscribers
+MAX_FINISHED_JOBS = 200
+
+
+class Job:
+    def __init__(self, name: str = ''):
+        self.id = uuid.uuid4().hex[:12]
+        self.name = name
+        self.status = QUEUED
+        self.progress = []
+        self.result = None
+        self.error = None
+        self.created = time.time()
+        self.version = 0
+        self._cond = threading.Condition()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (DONE, FAILED)
+
+    def _update(self, **fields):
+        with self._cond:
+            for k, v in fields.items():
+                setattr(self, k, v)
+            self.version += 1
+            self._cond.notify_all()
+
+    def report(self, message: str):
+        with self._cond:
+            self.progress.append(str(message))
+            self.version += 1
+            self._cond.notify_all()
+
+    def snapshot(self) -> dict:
+        with self._cond:
+            return {
+                'id': self.id,
+                'name': self.name,
+                'status': self.status,
+                'progress': list(self.progress),
+                'result': self.result,
+                'error': self.error,
+            }
+
+
+class JobManager:
+    def __init__(self, max_workers: int = None, max_provider_calls: int = None):
+        self.max_workers = max_workers or int(os.environ.get('JOB_WORKERS', '4'))
+        self.max_provider_calls = max_provider_calls or int(os.environ.get('MAX_PROVIDER_CALLS', '6'))
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='job')
+        self._provider_slots = threading.BoundedSemaphore(self.max_provider_calls)
+        self._lock = threading.Lock()
+        self._jobs = {}
+
+    def submit(self, fn, *args, name: str = '', **kwargs) -> str:
+        """Queue `fn(*args, progress=job.report, **kwargs)` and return the job id."""
+        job = Job(name or getattr(fn, '__name__', 'job'))
+        with self._lock:
+            self._jobs[job.id] = job
+            self._prune()
+        self._pool.submit(self._run, job, fn, args, kwargs)
+        return job.id
+
+    def _run(self, job: Job, fn, args, kwargs):
+        job._update(status=RUNNING)
+        try:
+            result = fn(*args, progress=job.report, **kwargs)
+        except Exception as e:
+            job._update(status=FAILED, error=str(e))
+            return
+        job._update(status=DONE, result=result)
+
+    def _prune(self):
+        finished = [j for j in self._jobs.values() if j.finished]
+        for j in sorted(finished, key=lambda j: j.created)[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            self._jobs.pop(j.id, None)
+
+    def get(self, job_id: str):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def subscribe(self, job_id: str, timeout: float = None):
+        """Yield job snapshots as the job changes, ending with its final state.
+
+        With `timeout`, a snapshot is also yielded when nothing changed for that many seconds.
+        """
+        job = self.get(job_id)
+        if job is None:
+            return
+        seen = -1
+        while True:
+            with job._cond:
+                if job.version == seen and not job.finished:
+                    job._cond.wait(timeout)
+                seen = job.version
+            snap = job.snapshot()
+            yield snap
+            if snap['status'] in (DONE, FAILED):
+                return
+
+    @contextmanager
+    def provider_slot(self):
+        """Hold one of the MAX_PROVIDER_CALLS slots for the duration of a provider call."""
+        self._provider_slots.acquire()
+        try:
+            yield
+        finally:
+            self._provider_slots.release()
+
+
+_manager = None
+_manager_lock = threading.Lock()
+
+
+def get_job_manager() -> JobManager:
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = JobManager()
+        return _manager
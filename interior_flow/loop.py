@@ -0,0 +1,66 @@
+"""The process-wide background event loop.
+
+One daemon thread runs an asyncio loop for the whole process. Sync code (Gradio
+handlers, background jobs, the tools/ scripts) hands coroutines to it with
+`submit()` / `run_on_loop()` instead of calling `asyncio.run()` per request, so
+pooled HTTP connections, the ComfyUI websocket and the 3D job poller survive
+between runs. Nothing here imports a client library.
+"""
+import asyncio
+import threading
+from concurrent.futures import Future
+
+
+class BackgroundLoop:
+    def __init__(self, name: str = 'asyncio-loop'):
+        self.name = name
+        self._loop = None
+        self._lock = threading.Lock()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                ready = threading.Event()
+
+                def _run():
+                    loop = asyncio.new_event_loop()
+                    asyncio.set_event_loop(loop)
+                    self._loop = loop
+                    ready.set()
+                    loop.run_forever()
+
+                threading.Thread(target=_run, name=self.name, daemon=True).start()
+                ready.wait()
+            return self._loop
+
+    def submit(self, coro) -> Future:
+        """Schedule `coro` on the loop; returns a concurrent.futures.Future."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro, timeout: float = None):
+        """Run `coro` on the loop and block the calling thread until it finishes."""
+        return self.submit(coro).result(timeout)
+
+
+background_loop = BackgroundLoop()
+
+
+def submit(coro) -> Future:
+    return background_loop.submit(coro)
+
+
+def run_on_loop(coro, timeout: float = None):
+    return background_loop.run(coro, timeout)
+
+
+def iter_on_loop(agen):
+    """Iterate an async generator on the background loop from synchronous code."""
+    try:
+        while True:
+            try:
+                yield background_loop.run(agen.__anext__())
+            except StopAsyncIteration:
+                return
+    finally:
+        background_loop.run(agen.aclose())
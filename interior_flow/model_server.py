@@ -0,0 +1,212 @@
+"""Serve generated 3D models from the app's own server at `/models/<name>`.
+
+Replaces the `python -m http.server 8000` process that used to be spawned in
+tools/tripo_output (duplicate processes, a clash with ComfyUI's default port 8000,
+one request at a time, no Range support). The route is registered on the FastAPI
+app that Gradio is mounted on, so the model-viewer loads models from the same
+origin as the page, with:
+
+- Range requests (206) for progressive / resumed loading;
+- ETag + Last-Modified validation (304) and a Cache-Control max-age;
+- gzip, or brotli when the `brotli` package is installed, for text `.gltf` files
+  (GLB is binary and sent as is).
+
+`model_url()` is the one place model URLs are built.
+
+    MODEL_BASE_URL        public origin for model URLs (default: the UI's address)
+    MODEL_CACHE_SECONDS   Cache-Control max-age (default 3600)
+"""
+import gzip
+import mimetypes
+import os
+import re
+import threading
+from email.utils import formatdate, parsedate_to_datetime
+from pathlib import Path
+from urllib.parse import quote
+
+from interior_flow.settings import TRIPO_OUTPUT_DIR
+
+MODEL_ROUTE = '/models'
+MODEL_DIR = TRIPO_OUTPUT_DIR
+CACHE_SECONDS = int(os.environ.get('MODEL_CACHE_SECONDS', '3600'))
+CHUNK_SIZE = 256 * 1024
+COMPRESSIBLE = ('.gltf',)
+CONTENT_TYPES = {'.glb': 'model/gltf-binary', '.gltf': 'model/gltf+json', '.bin': 'application/octet-stream'}
+
+_server = {'base': 'http://127.0.0.1:7860'}
+_compressed = {}  # (path, etag, encoding) -> bytes, for the few .gltf files being viewed
+_COMPRESSED_MAX = 16
+_compressed_lock = threading.Lock()
+
+
+def set_server_address(host: str = None, port: int = None):
+    """Record where the UI listens, for `model_url()`."""
+    host = host or '127.0.0.1'
+    if host in ('0.0.0.0', '::'):
+        host = '127.0.0.1'
+    _server['base'] = f'http://{host}:{port or 7860}'
+
+
+def model_url(name) -> str:
+    """URL of a file in the model directory (`name` may be a path; only its name is used)."""
+    base = (os.environ.get('MODEL_BASE_URL') or _server['base']).rstrip('/')
+    return f'{base}{MODEL_ROUTE}/{quote(Path(str(name)).name)}'
+
+
+def resolve_model(name: str):
+    """The file served for `name`, or None (no sub-paths, nothing outside MODEL_DIR)."""
+    if not name or '/' in name or '\\' in name or name.startswith('.'):
+        return None
+    path = MODEL_DIR / name
+    try:
+        if path.resolve().parent != MODEL_DIR.resolve() or not path.is_file():
+            return None
+    except OSError:
+        return None
+    return path
+
+
+def etag_for(stat) -> str:
+    return f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+
+
+def parse_range(header: str, size: int):
+    """(start, end) inclusive for a single `bytes=` range; None to ignore it, 'invalid' for 416."""
+    m = re.fullmatch(r'\s*bytes=(\d*)-(\d*)\s*', header or '')
+    if not m or not (m.group(1) or m.group(2)):
+        return None  # absent, malformed or multi-range: send the whole file
+    if m.group(1):
+        start = int(m.group(1))
+        end = min(int(m.group(2)), size - 1) if m.group(2) else size - 1
+    else:
+        start, end = max(0, size - int(m.group(2))), size - 1
+    if start >= size or start > end:
+        return 'invalid'
+    return start, end
+
+
+def _not_modified(request, etag: str, mtime: float) -> bool:
+    inm = request.headers.get('if-none-match')
+    if inm is not None:
+        return inm.strip() == '*' or etag in [t.strip() for t in inm.split(',')]
+    ims = request.headers.get('if-modified-since')
+    if ims:
+        try:
+            return int(mtime) <= parsedate_to_datetime(ims).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def _encoding(request, path: Path):
+    if path.suffix.lower() not in COMPRESSIBLE:
+        return None
+    accepted = request.headers.get('accept-encoding', '')
+    if 'br' in accepted:
+        try:
+            import brotli  # noqa: F401
+            return 'br'
+        except ImportError:
+            pass
+    return 'gzip' if 'gzip' in accepted else None
+
+
+def _compressed_body(path: Path, etag: str, encoding: str) -> bytes:
+    key = (str(path), etag, encoding)
+    with _compressed_lock:
+        body = _compressed.get(key)
+    if body is None:
+        data = path.read_bytes()
+        if encoding == 'br':
+            import brotli
+            body = brotli.compress(data)
+        else:
+            body = gzip.compress(data, compresslevel=6)
+        with _compressed_lock:
+            while len(_compressed) >= _COMPRESSED_MAX:
+                _compressed.pop(next(iter(_compressed)))
+            _compressed[key] = body
+    return body
+
+
+def _iter_file(path: Path, start: int, length: int):
+    # a sync generator: Starlette runs it in its thread pool
+    with path.open('rb') as f:
+        f.seek(start)
+        while length > 0:
+            chunk = f.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+def serve_model(request):
+    """Starlette endpoint for `/models/{name}`.
+
+    A plain function on purpose: Starlette runs it in its thread pool, so the stat,
+    file reads and gzip/brotli work never block the event loop serving the UI.
+    """
+    from starlette.responses import Response, StreamingResponse
+
+    path = resolve_model(request.path_params.get('name', ''))
+    if path is None:
+        return Response('model not found', status_code=404, media_type='text/plain')
+    stat = path.stat()
+    etag = etag_for(stat)
+    headers = {
+        'ETag': etag,
+        'Last-Modified': formatdate(stat.st_mtime, usegmt=True),
+        'Cache-Control': f'public, max-age={CACHE_SECONDS}',
+        'Accept-Ranges': 'bytes',
+    }
+    media_type = CONTENT_TYPES.get(path.suffix.lower()) or mimetypes.guess_type(path.name)[0] or 'application/octet-stream'
+    if path.suffix.lower() in COMPRESSIBLE:
+        headers['Vary'] = 'Accept-Encoding'
+    if _not_modified(request, etag, stat.st_mtime):
+        return Response(status_code=304, headers=headers)
+    head = request.method == 'HEAD'
+
+    encoding = _encoding(request, path)
+    if encoding:
+        # compressed responses are sent whole (ranges would refer to the encoded bytes)
+        body = _compressed_body(path, etag, encoding)
+        headers.pop('Accept-Ranges')
+        headers.update({'Content-Encoding': encoding, 'Content-Length': str(len(body))})
+        return Response(b'' if head else body, headers=headers, media_type=media_type)
+
+    size = stat.st_size
+    rng = None
+    if_range = request.headers.get('if-range')
+    if if_range is None or if_range.strip() == etag:
+        rng = parse_range(request.headers.get('range'), size)
+    if rng == 'invalid':
+        return Response(status_code=416, headers={**headers, 'Content-Range': f'bytes */{size}'})
+    start, end = rng or (0, size - 1)
+    length = max(0, end - start + 1)
+    headers['Content-Length'] = str(length)
+    if rng:
+        headers['Content-Range'] = f'bytes {start}-{end}/{size}'
+    status_code = 206 if rng else 200
+    if head:
+        return Response(status_code=status_code, headers=headers, media_type=media_type)
+    return StreamingResponse(_iter_file(path, start, length), status_code=status_code, headers=headers,
+                             media_type=media_type)
+
+
+def add_model_route(app):
+    """Register GET/HEAD `/models/{name}` on a FastAPI/Starlette app, ahead of its other routes."""
+    app.add_route(f'{MODEL_ROUTE}/{{name}}', serve_model, methods=['GET', 'HEAD'], include_in_schema=False)
+    # first match wins in Starlette; keep the model route in front of anything mounted before it
+    app.router.routes.insert(0, app.router.routes.pop())
+    return app
+
+
+def create_app(demo):
+    """A FastAPI app serving `/models/...` with the Gradio UI mounted at `/`."""
+    import gradio as gr
+    from fastapi import FastAPI
+
+    app = add_model_route(FastAPI())
+    return gr.mount_gradio_app(app, demo, path='/')
@@ -0,0 +1,120 @@
+"""Event-driven watcher for finished 3D model files (.glb/.gltf).
+
+Backed by `watchdog` filesystem notifications instead of polling `iterdir()` +
+`stat()`. A model is reported as ready:
+
+- immediately on close-after-write (inotify IN_CLOSE_WRITE, Linux), or
+- immediately when it is renamed into the directory (atomic `.part` -> `.glb`), or
+- on platforms without close events (Windows/macOS), once no further write events
+  arrived for `settle` seconds (a timer, not a sleep loop).
+
+Each finished file is reported once per (size, mtime) through `callback(path)`.
+"""
+import os
+import sys
+import threading
+from pathlib import Path
+
+from watchdog.events import FileSystemEventHandler
+from watchdog.observers import Observer
+
+MODEL_SUFFIXES = ('.glb', '.gltf')
+SETTLE_SECONDS = float(os.environ.get('MODEL_WATCH_SETTLE_SECONDS', '1.0'))
+# the inotify backend reports close-after-write, so no settle timers are needed there
+HAS_CLOSE_EVENTS = sys.platform.startswith('linux')
+
+
+class _ModelEventHandler(FileSystemEventHandler):
+    def __init__(self, watcher: 'ModelWatcher'):
+        super().__init__()
+        self.watcher = watcher
+
+    def on_closed(self, event):
+        if not event.is_directory:
+            self.watcher._ready(event.src_path)
+
+    def on_moved(self, event):
+        if not event.is_directory:
+            self.watcher._ready(event.dest_path)
+
+    def on_created(self, event):
+        if not event.is_directory:
+            self.watcher._touch(event.src_path)
+
+    def on_modified(self, event):
+        if not event.is_directory:
+            self.watcher._touch(event.src_path)
+
+
+class ModelWatcher:
+    def __init__(self, directory, callback, suffixes=MODEL_SUFFIXES, settle: float = SETTLE_SECONDS):
+        self.directory = Path(directory)
+        self.callback = callback
+        self.suffixes = tuple(s.lower() for s in suffixes)
+        self.settle = settle
+        self._observer = None
+        self._lock = threading.Lock()
+        self._timers = {}
+        self._reported = {}
+
+    def _wanted(self, path) -> bool:
+        return Path(path).suffix.lower() in self.suffixes
+
+    def _touch(self, path):
+        # write activity without a close event yet: (re)arm the settle timer
+        if HAS_CLOSE_EVENTS or not self._wanted(path):
+            return
+        with self._lock:
+            old = self._timers.pop(path, None)
+            if old:
+                old.cancel()
+            t = threading.Timer(self.settle, self._ready, args=(path,))
+            t.daemon = True
+            self._timers[path] = t
+        t.start()
+
+    def _ready(self, path):
+        if not self._wanted(path):
+            return
+        p = Path(path)
+        with self._lock:
+            t = self._timers.pop(path, None)
+            if t:
+                t.cancel()
+            try:
+                st = p.stat()
+            except OSError:
+                return
+            sig = (st.st_size, st.st_mtime_ns)
+            if st.st_size == 0 or self._reported.get(str(p)) == sig:
+                return
+            self._reported[str(p)] = sig
+        try:
+            self.callback(p)
+        except Exception:
+            pass
+
+    def start(self) -> 'ModelWatcher':
+        self.directory.mkdir(parents=True, exist_ok=True)
+        observer = Observer()
+        observer.schedule(_ModelEventHandler(self), str(self.directory), recursive=False)
+        observer.daemon = True
+        observer.start()
+        self._observer = observer
+        return self
+
+    def stop(self):
+        with self._lock:
+            for t in self._timers.values():
+                t.cancel()
+            self._timers.clear()
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join(timeout=5)
+            self._observer = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,58 @@
+"""Ask the local Ollama model questions about an uploaded PDF.
+
+The PDF is converted to markdown with pymupdf4llm and sent along with the prompt;
+both libraries are imported on first use.
+"""
+import json
+import threading
+import uuid
+from pathlib import Path
+
+from interior_flow.settings import DOCS_DIR
+
+_ollama = {}
+_ollama_lock = threading.Lock()
+
+
+def get_ollama(json_mode=False):
+    """Shared ChatOllama client (plain or JSON output), created on first use."""
+    with _ollama_lock:
+        if json_mode not in _ollama:
+            from langchain_ollama import ChatOllama
+            _ollama[json_mode] = ChatOllama(model="llama3.2", format="json") if json_mode else ChatOllama(model="llama3.2")
+        return _ollama[json_mode]
+
+
+def structured_query(pdf_upload, prompt, json_mode):
+    if pdf_upload is None:
+        return "No PDF uploaded"
+
+    try:
+        # pdf_upload can be a tempfile-like object or a path
+        if hasattr(pdf_upload, "name") and Path(pdf_upload.name).exists():
+            src = Path(pdf_upload.name)
+            DOCS_DIR.mkdir(parents=True, exist_ok=True)
+            dest = DOCS_DIR / f"{uuid.uuid4()}.pdf"
+            dest.write_bytes(src.read_bytes())
+        else:
+            data = pdf_upload.read()
+            DOCS_DIR.mkdir(parents=True, exist_ok=True)
+            dest = DOCS_DIR / f"{uuid.uuid4()}.pdf"
+            dest.write_bytes(data)
+    except Exception:
+        return "Failed to save uploaded PDF"
+
+    import pymupdf4llm
+
+    md_text = pymupdf4llm.to_markdown(dest)
+    full_prompt = f"{md_text}\n{prompt}"
+
+    if json_mode:
+        response = get_ollama(json_mode=True).invoke(full_prompt)
+        try:
+            return json.dumps(json.loads(response.content), indent=2)
+        except Exception:
+            return getattr(response, "content", str(response))
+    else:
+        response = get_ollama().invoke(full_prompt)
+        return getattr(response, "content", str(response))
@@ -0,0 +1,523 @@
+"""The headless generation pipeline: floorplan -> effect renders -> hi-fi render -> 3D.
+
+`run_pipeline()` is what the Gradio UI, the CLI (`python -m interior_flow run`) and
+batch jobs call; it never imports Gradio. Image calls go through
+`api_generate_image()` (render cache + provider slots); every file a run writes is
+recorded in its `runs/<run_id>/` manifest.
+
+    RENDER_CONCURRENCY   image-model calls one run keeps in flight (default 5:
+                         4 effect renders + 1 hi-fi render)
+"""
+import base64
+import json
+import os
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from interior_flow.artifacts import new_run
+from interior_flow.image_payload import decode_to_file, find_image_payload
+from interior_flow.jobs import get_job_manager
+from interior_flow.model_server import model_url as build_model_url
+from interior_flow.render_cache import cache_key, render_cache
+from interior_flow.settings import TOOLS_DIR, TRIPO_OUTPUT_DIR
+from interior_flow.status import model_status
+
+RENDER_CONCURRENCY = int(os.environ.get('RENDER_CONCURRENCY', '5'))
+
+
+def run_pipeline(layout_prompt, sketch_image, space1, space2, space3, space4, use_api=True, show_ref=False, api_model=None, aspect_ratio='16:9', enable_tripo=False, model_url=None, force_regenerate=False, max_concurrency=None, wait_3d=False, run=None, progress=None):
+    """
+    The simplified flow, without any UI:
+    1) Use `layout_prompt` + optional `sketch_image` to generate a hidden colored floorplan (reference image).
+    2) For each non-empty space in (space1..4), generate an effect image using the colored floorplan as reference.
+       The effect renders and the hi-fi render run concurrently (at most `max_concurrency`
+       calls in flight, default `RENDER_CONCURRENCY`) and are collected in space order.
+    3) With `enable_tripo`, submit the hi-fi render to Tripo for a 3D model: as a background
+       job, or before returning when `wait_3d` is set (CLI / batch use).
+    Identical sub-steps come from the render cache unless `force_regenerate` is set.
+    Files go to `run` (a RunArtifacts) or to a new run under runs/.
+    `progress(message)` is called at each stage when the flow runs as a background job.
+    `model_url` (the UI's hidden model state) is accepted for compatibility and unused:
+    the preview follows the model status store.
+    Returns (gallery_entries, captions, model_file_path_or_url, tripo_status).
+    """
+    if not use_api:
+        # When no external API is available, return an empty model preview (not HTML)
+        return [], "External API is required for this simplified flow. Please enable Use external API.", '', 'Tripo: idle'
+
+    report = progress or (lambda message: None)
+    model = api_model or 'gemini-2.5-flash-image'
+    # Build base prompt for colored floorplan
+    base_prompt = layout_prompt or ''
+    if base_prompt and not base_prompt.strip().endswith('.'):
+        base_prompt = base_prompt.strip() + '.'
+    base_prompt += ' Convert the provided black-and-white floor plan into a clean, colored 2D floor-plan illustration. Keep walls, doors and furniture positions accurate.'
+
+    # generate hidden colored floorplan
+    # every file this run writes goes to runs/<run_id>/ and is recorded in its manifest
+    run = run or new_run()
+    run_id = run.run_id
+    run.set_meta(layout_prompt=layout_prompt or '', spaces=[space1, space2, space3, space4], model=model, aspect_ratio=aspect_ratio)
+    report('彩平图生成中 / Generating colored floorplan...')
+    try:
+        ref_image = api_generate_image(model, base_prompt, sketch_image, aspect_ratio=aspect_ratio, size='1024x576', force=force_regenerate, outdir=run.dir)
+    except Exception as e:
+        return [], f'Failed to generate colored floorplan: {e}', '', 'Tripo: idle'
+
+    if not ref_image:
+        return [], 'Colored floorplan generation returned no image.', '', 'Tripo: idle'
+    run.record('floorplan', ref_image)
+
+    # prepare space prompts and robustly generate effect images (with retries)
+    spaces = [space1, space2, space3, space4]
+    images = []
+    image_captions = []  # one per image (captions also carries failure notes)
+    captions = []
+    run_log = []
+    ts = int(time.time())
+    run_log.append(f"Run at {time.ctime(ts)}")
+    run_log.append(f"Run id: {run_id}")
+    run_log.append(f"Base prompt: {base_prompt}")
+    run_log.append(f"Ref image: {ref_image}")
+
+    # hi-fi prompt used to generate the render to send to Tripo
+    hi_fi_prompt = (
+        "请参考提供的室内照片。生成一个高保真3D室内模型渲染，外观类似3D打印室内模型。保留建筑体量和关键纹理细节，适度游戏化风格。"
+        "渲染要求：真实、基于物理的光影效果；45°等角视角；清晰定义材质（玻璃、金属、混凝土等）；纯白背景；无文字或线条。"
+    )
+
+    def _render_effect(idx, sp):
+        # returns (image_path_or_None, log_lines) so results can be collected in space order
+        effect_prompt = (
+            f"Use the provided colored floorplan image strictly as a layout reference and produce a photorealistic, perspective interior render of the {sp}. "
+            "This must be a human-eye-level (approx. 1.6m) perspective view as if standing inside the room — not a top-down plan or orthographic diagram. "
+            "Do NOT output any floorplan, schematic, blueprint, or labeled diagram. Do NOT keep a birds-eye or plan projection. "
+            "Show realistic materials, textures, accurate furniture placement, natural or interior lighting, shadows, and camera depth of field as in interior photography. "
+            f"Style: photorealistic interior photograph for {sp}, high detail, realistic lighting, no text or labels."
+        )
+        log = [f"Generating effect image for space {idx}: {sp}"]
+        for attempt in range(3):
+            try:
+                out = api_generate_image(model, effect_prompt, ref_image, aspect_ratio=aspect_ratio, size='1024x576', force=force_regenerate, outdir=run.dir)
+                if out:
+                    log.append(f"Generated image for {sp}: {out}")
+                    run.record('effect', out, space=sp, index=idx)
+                    return out, log
+                log.append(f"Attempt {attempt+1} for {sp} returned no image")
+            except Exception as e:
+                log.append(f"Attempt {attempt+1} for {sp} failed: {e}")
+        return None, log
+
+    def _render_hi_fi():
+        # Generate a deterministic hi-fidelity image from the colored floorplan (server-side, hidden)
+        # so we have a deterministic file to submit to Tripo
+        hi_fi_path = run.path('hi_fi.png')
+        try:
+            # generate hi-fi using the colored floorplan as reference
+            gen = api_generate_image(model, hi_fi_prompt, ref_image, aspect_ratio='1:1', size='1024x1024', force=force_regenerate, outdir=run.dir)
+        except Exception as e:
+            try:
+                model_status.set_status('Tripo: hi-fi generation failed: ' + str(e))
+            except Exception:
+                pass
+            return None
+        if not gen:
+            return None
+        # move to the run's deterministic hi-fi path
+        try:
+            Path(gen).replace(hi_fi_path)
+        except Exception:
+            # fallback: copy bytes
+            try:
+                hi_fi_path.write_bytes(Path(gen).read_bytes())
+            except Exception:
+                return str(run.record('hi_fi', gen))
+        return str(run.record('hi_fi', hi_fi_path))
+
+    # One parallel wave: every effect render and the hi-fi render only depend on the
+    # colored floorplan, so fan them out together (bounded by max_concurrency).
+    effect_jobs = []
+    for idx, sp in enumerate(spaces, start=1):
+        if not sp or not sp.strip():
+            run_log.append(f"Space {idx} empty, skipping")
+            continue
+        effect_jobs.append((idx, sp))
+
+    report(f'彩平图完成，渲染 {len(effect_jobs)} 张效果图 + 高保真图 / Colored floorplan ready, rendering {len(effect_jobs)} spaces + hi-fi...')
+    workers = max(1, int(max_concurrency or RENDER_CONCURRENCY))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='render') as pool:
+        hi_fi_future = pool.submit(_render_hi_fi)
+        effect_futures = [(idx, sp, pool.submit(_render_effect, idx, sp)) for idx, sp in effect_jobs]
+        # collect in space order regardless of completion order
+        for idx, sp, fut in effect_futures:
+            try:
+                out, log = fut.result()
+            except Exception as e:
+                out, log = None, [f"Effect render for {sp} crashed: {e}"]
+            run_log.extend(log)
+            if out:
+                images.append(out)
+                image_captions.append(f"效果图-{idx}: {sp}")
+                captions.append(f"效果图-{idx}: {sp}")
+                report(f'效果图-{idx} 完成 / done: {sp}')
+            else:
+                captions.append(f'效果图-{idx} 生成失败')
+                report(f'效果图-{idx} 生成失败 / failed: {sp}')
+        try:
+            hi_fi_img = hi_fi_future.result()
+        except Exception:
+            hi_fi_img = None
+    run_log.append(f"Hi-fi image: {hi_fi_img}")
+
+    # write run log for debugging
+    try:
+        run.write_text('run_log.txt', '\n'.join(run_log), kind='log')
+    except Exception:
+        pass
+
+    if not images:
+        return [], 'No effect images were generated.', '', 'Tripo: idle'
+
+    # build gallery entries as [image, caption] pairs so Gradio maps each image correctly
+    gallery_entries = [[img, cap] for img, cap in zip(images, image_captions)]
+
+    # if user requested to see the colored floorplan, prepend it to the gallery
+    if show_ref and ref_image:
+        # ensure the ref image exists on disk (helper returns a filepath)
+        try:
+            gallery_entries.insert(0, [ref_image, '彩平图（调试可见）'])
+        except Exception:
+            pass
+
+    # start the 3D job only if TRIPO API key is available and user enabled Tripo; it runs on
+    # the shared background loop, which tracks any number of in-flight jobs without a thread each
+    try:
+        from interior_flow.loop import run_on_loop, submit
+
+        tripo_key = os.environ.get('TRIPO_API_KEY') or os.environ.get('TRIPO_KEY')
+        if tripo_key and enable_tripo and wait_3d:
+            report('Tripo 3D 生成中 / Generating Tripo 3D model...')
+            try:
+                run_on_loop(tripo_job(run, hi_fi_img, tripo_key))
+            except Exception:
+                model_status.set_status('Tripo: background runner crashed')
+        elif tripo_key and enable_tripo:
+            # pass the deterministic hi-fidelity image path (hi_fi_img) to a background job
+            submit(tripo_job(run, hi_fi_img, tripo_key))
+            report('Tripo 3D 任务已排队 / Tripo 3D job queued')
+            try:
+                model_status.set_status('Tripo: started in background')
+            except Exception:
+                pass
+        else:
+            try:
+                if not tripo_key:
+                    model_status.set_status('Tripo: no API key configured')
+                else:
+                    model_status.set_status('Tripo: disabled by user (enable_tripo=False)')
+            except Exception:
+                pass
+    except Exception:
+        pass
+
+    # determine model path to return for Model3D component (latest model known to the status store)
+    model_file_out = model_status.snapshot().model
+
+    # Sanitize gallery entries and model_file_out so callers (the Gradio UI) only receive valid file paths or http(s) URLs.
+    def _is_valid_path_or_url(v):
+        try:
+            if not v:
+                return False
+            if isinstance(v, (list, dict)):
+                return False
+            s = str(v).strip()
+            # reject obvious HTML or markup
+            if '<' in s or '>' in s or s.startswith('<'):
+                return False
+            # allow http/https URLs
+            if s.startswith('http://') or s.startswith('https://'):
+                return True
+            # allow existing local files
+            p = Path(s)
+            # ensure it's a regular file (not a directory)
+            return p.exists() and p.is_file()
+        except Exception:
+            return False
+
+    # Debug helper: log any resource that would be returned to Gradio but is invalid
+    def _log_invalid_resource(tag, v):
+        try:
+            logp = run.path('gradio_flow_debug.log')
+            s = f"[{time.ctime()}] INVALID_RESOURCE {tag}: {repr(v)}\n"
+            with logp.open('a', encoding='utf-8') as f:
+                f.write(s)
+        except Exception:
+            pass
+
+    # Filter gallery entries: each entry is [img, caption]
+    safe_gallery = []
+    for ent in gallery_entries:
+        try:
+            img, cap = ent[0], ent[1] if len(ent) > 1 else ''
+            # Normalize to string where possible
+            if isinstance(img, Path):
+                img = str(img)
+            if _is_valid_path_or_url(img):
+                safe_gallery.append([img, cap])
+            else:
+                _log_invalid_resource('gallery_image', img)
+                continue
+        except Exception as e:
+            _log_invalid_resource('gallery_entry_exception', str(e))
+            continue
+
+    # Ensure model_file_out is valid; otherwise clear it so Model3D gets empty string
+    if not _is_valid_path_or_url(model_file_out):
+        _log_invalid_resource('model_file_out', model_file_out)
+        model_file_out = ''
+
+    tripo_status_text = model_status.status
+
+    # final debug: write full dump of what we will return to Gradio (helps diagnose PermissionError)
+    try:
+        dump = {
+            'time': time.ctime(),
+            'run_id': run_id,
+            'gallery_entries_raw': [[str(a[0]) if a else None, a[1] if len(a)>1 else None] for a in (gallery_entries or [])],
+            'safe_gallery': safe_gallery,
+            'captions_joined': '\n'.join(captions),
+            'model_file_out': model_file_out,
+            'tripo_status_text': tripo_status_text
+        }
+        run.write_json('gradio_flow_full_dump.json', dump, kind='dump')
+    except Exception:
+        pass
+
+
+    return safe_gallery, '\n'.join(captions), model_file_out, tripo_status_text
+
+
+def tripo_job(run, hi_fi_image_path=None, api_key_env=None, provider=None):
+    """The 3D job of `run` as a coroutine for the shared background loop.
+
+    Submits the hi-fi render (or the run's latest render) to Tripo, or to `provider`
+    when one is given, and points the status store and the run manifest at the model.
+    """
+    from interior_flow.ai3d import FAILED, SUCCESS, Provider3DError, run_job, tripo_provider
+
+    try:
+        # write queued status
+        model_status.set_status('Tripo: queued')
+    except Exception:
+        pass
+
+    async def _runner():
+        # prefer using the explicitly provided hi-fidelity image path
+        try:
+            hi_fi_img_local = hi_fi_image_path
+            if not hi_fi_img_local:
+                # last resort: this run's most recent render (from the manifest, never another run's file)
+                fallback = run.latest('effect') or run.latest('floorplan')
+                if fallback:
+                    hi_fi_img_local = str(fallback)
+                    try:
+                        model_status.set_status('Tripo: using fallback Gemini image: ' + hi_fi_img_local)
+                    except Exception:
+                        pass
+            if not hi_fi_img_local:
+                model_status.set_status('Tripo: no hi-fidelity image available for submission')
+                return
+        except Exception as e:
+            model_status.set_status('Tripo: error selecting Gemini image: ' + str(e))
+            return
+
+        key = api_key_env or os.environ.get('TRIPO_API_KEY') or os.environ.get('TRIPO_KEY')
+        if not key:
+            model_status.set_status('Tripo: no TRIPO_API_KEY set')
+            return
+
+        model_status.set_status('Tripo: submitting task')
+
+        def _on_status(s):
+            model_status.set_status(f'Tripo: task {s.state} ({s.progress}%), waiting...')
+
+        # SDK when available, the HTTP API otherwise (see interior_flow/ai3d.py); one provider is
+        # shared by all jobs on the loop, so the poller checks concurrent jobs in one batch
+        try:
+            job_provider = provider or tripo_provider(key)
+        except Provider3DError as e:
+            model_status.set_status('Tripo: ' + str(e))
+            return
+        try:
+            result = await run_job(job_provider, hi_fi_img_local, TRIPO_OUTPUT_DIR, on_status=_on_status)
+        except Provider3DError as e:
+            if e.debug:
+                run.write_json('tripo_http_debug.json', e.debug, kind='debug')
+            model_status.set_status('Tripo HTTP fallback failed: ' + str(e))
+            return
+        except Exception as e:
+            run.write_json('tripo_http_exception.json', {'error': str(e)}, kind='debug')
+            model_status.set_status('Tripo: task failed: ' + str(e))
+            return
+
+        if result.state == SUCCESS and result.model:
+            model_file = result.model
+            # served by the UI's own server (interior_flow/model_server.py)
+            url = build_model_url(model_file)
+            run.record('model', model_file, url=url, source=result.provider, task_id=result.job_id)
+            model_status.set_model(url, model_file, status='Tripo: success. Model ready at ' + url)
+        elif result.state == SUCCESS:
+            model_status.set_status('Tripo: success but no files found in response')
+        elif result.state == FAILED:
+            # the provider's own status word when it has one (HTTP: a JSON dict, SDK: a Task)
+            raw = result.raw
+            detail = (raw.get('status') or (raw.get('data') or {}).get('status')) if isinstance(raw, dict) else getattr(raw, 'status', None)
+            model_status.set_status('Tripo: task completed but not successful: ' + str(detail or result.state))
+        else:
+            model_status.set_status('Tripo: timeout waiting for task')
+
+    return _runner()
+
+
+def load_models_list_from_workspace():
+    # try models_list.json in tools/
+    p = TOOLS_DIR / 'models_list.json'
+    if p.exists():
+        try:
+            j = json.loads(p.read_text(encoding='utf-8'))
+            # return list of ids
+            if isinstance(j, dict) and 'data' in j:
+                return [m.get('id') for m in j.get('data', []) if isinstance(m, dict)]
+            if isinstance(j, list):
+                return [m.get('id') if isinstance(m, dict) else str(m) for m in j]
+        except Exception:
+            return []
+    return []
+
+
+def api_generate_image(model, prompt, image_path=None, aspect_ratio='1:1', size=None, force=False, outdir=None):
+    """
+    Generate an image using either chat-style Gemini endpoint (for gemini models)
+    or the images/generations endpoint for other models. Returns saved filepath or None.
+    Results are served from the on-disk render cache when the same (model, prompt,
+    reference image, aspect, size) was generated before, unless `force` is set.
+    Files are written to `outdir` (a run directory) or tools/ when not given.
+    """
+    key = cache_key(model, prompt, image_path, aspect_ratio, size)
+    outdir = Path(outdir) if outdir else TOOLS_DIR
+
+    def _produce():
+        # bounded number of provider calls in flight across all running jobs
+        with get_job_manager().provider_slot():
+            return _api_generate_image(model, prompt, image_path, aspect_ratio=aspect_ratio, size=size, outdir=outdir)
+
+    return render_cache.get_or_create(
+        key,
+        _produce,
+        outdir,
+        force=force,
+        # never cache the quota placeholder image
+        cacheable=lambda out: 'placeholder' not in Path(out).name,
+    )
+
+
+def _api_generate_image(model, prompt, image_path=None, aspect_ratio='1:1', size=None, outdir=None):
+    from interior_flow.gemini_client import generate_image as gemini_generate_image
+    from interior_flow.http_pool import get_client
+    from interior_flow.image_payload import stream_to_file
+
+    api_base = os.environ.get('GOOGLE_GEMINI_BASE_URL') or os.environ.get('NANO_API_URL') or os.environ.get('API_URL') or 'https://newapi.pockgo.com'
+    api_base = api_base.rstrip('/')
+    # Prefer COMFY_GEMINI_API_KEY (local .env for this project), then GEMINI_API_KEY, then other common names
+    api_key = os.environ.get('COMFY_GEMINI_API_KEY') or os.environ.get('GEMINI_API_KEY') or os.environ.get('NANO_API_KEY') or os.environ.get('GOOGLE_API_KEY') or os.environ.get('API_KEY')
+    if not api_key:
+        raise RuntimeError('No API key set in environment (NANO_API_KEY or GOOGLE_API_KEY)')
+
+    outdir = Path(outdir) if outdir else TOOLS_DIR
+    outdir.mkdir(parents=True, exist_ok=True)
+    # Gemini chat-style image models go through the in-process client, which hands
+    # back the exact saved path (no subprocess, no scanning tools/ for new files).
+    if 'gemini' in (model or '').lower():
+        # ensure prompt is a plain string
+        try:
+            prompt_arg = prompt if isinstance(prompt, str) else str(prompt)
+        except Exception:
+            prompt_arg = ''
+        out_path = outdir / f'generated_gemini25_from_{uuid.uuid4().hex}.png'
+        # a couple of attempts (small retry for transient failures)
+        for attempt in range(2):
+            try:
+                saved = gemini_generate_image(prompt_arg, image_path, aspect_ratio or '16:9', model=model, out_path=out_path,
+                                              response_path=outdir / f'{out_path.stem}_response.json')
+            except Exception:
+                saved = None
+            if saved:
+                return str(saved)
+        return None
+
+    headers = {'Authorization': f'Bearer {api_key}', 'Content-Type': 'application/json'}
+
+    # prepare image data URL if provided
+    data_url = None
+    if image_path:
+        p = Path(image_path)
+        if p.exists():
+            data = p.read_bytes()
+            b64 = base64.b64encode(data).decode('utf-8')
+            if p.suffix.lower() in ('.jpg', '.jpeg'):
+                data_url = f'data:image/jpeg;base64,{b64}'
+            else:
+                data_url = f'data:image/png;base64,{b64}'
+
+    # other models: use /v1/images/generations
+    endpoint = api_base + '/v1/images/generations'
+    payload = {'model': model, 'prompt': prompt, 'size': (size if size else '1024x1024'), 'num_images': 1}
+    if data_url:
+        payload['image'] = data_url
+
+    r = get_client(endpoint).post(endpoint, headers=headers, json=payload)
+    if r.status_code != 200:
+        raise RuntimeError(f'API error {r.status_code}: {r.text[:1000]}')
+
+    try:
+        j = r.json()
+    except Exception:
+        j = None
+
+    # save full response for debugging (raw bytes; no re-serialization of the image payload)
+    resp_path = outdir / f'images_generations_response_{uuid.uuid4().hex}.json'
+    try:
+        resp_path.write_bytes(r.content)
+    except Exception:
+        pass
+
+    # check for URL in data
+    arr = (j.get('data') if isinstance(j, dict) else None) or []
+    if arr and isinstance(arr, list) and isinstance(arr[0], dict):
+        url = arr[0].get('url') or arr[0].get('image_url') or arr[0].get('uri')
+        if url:
+            out_file = outdir / f'generated_api_{uuid.uuid4().hex}_{Path(url).name}'
+            return str(stream_to_file(get_client(url), url, out_file))
+
+    # find nested b64 like b64_json (single walk, decoded to disk in chunks)
+    found = find_image_payload(j) if j is not None else None
+    if found and found.kind == 'base64':
+        out_file = outdir / f'generated_api_b64_{uuid.uuid4().hex}.png'
+        return str(decode_to_file(found, out_file))
+
+    return None
+
+
+def start_tripo_output_watcher():
+    """Watch the tripo_output folder and point the status store (and
+    tools/last_model_url.txt) at every model that finishes writing there.
+    Filesystem events drive it, so an idle folder costs nothing.
+    """
+    from interior_flow.model_watcher import ModelWatcher
+
+    def _on_model(path):
+        model_status.set_model(build_model_url(path), path)
+
+    return ModelWatcher(TRIPO_OUTPUT_DIR, _on_model).start()
@@ -0,0 +1,220 @@
+"""Adaptive polling for long-running 3D jobs.
+
+`DurationStats` keeps the recent durations of successful jobs per provider (persisted
+as JSON) and turns them into a completion window: the 10th to 90th percentile. The
+delay before the next status check follows that window:
+
+- no history yet: back off with the job's age (a quarter of it, within bounds);
+- before the window: long waits that halve as the window approaches;
+- inside it: dense checks, about ten per window;
+- past it: back off again with the overrun.
+
+`Poller` multiplexes every in-flight job on one event loop: a single task wakes at
+the earliest due check and queries all jobs due within `POLL_MIN_SECONDS` together
+(`Provider3D.poll_many`, grouped by provider), instead of one sleeping loop per job.
+
+    AI3D_STATS_PATH    duration history (default tools/ai3d_durations.json)
+    POLL_MIN_SECONDS   shortest delay between checks of one job (default 2)
+    POLL_MAX_SECONDS   longest delay between checks of one job (default 30)
+"""
+import asyncio
+import json
+import os
+import threading
+import time
+import uuid
+import weakref
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from interior_flow.ai3d import FAILED, SUCCESS, JobStatus
+from interior_flow.settings import TOOLS_DIR
+
+STATS_PATH = Path(os.environ.get('AI3D_STATS_PATH') or TOOLS_DIR / 'ai3d_durations.json')
+MIN_DELAY = float(os.environ.get('POLL_MIN_SECONDS', '2'))
+MAX_DELAY = float(os.environ.get('POLL_MAX_SECONDS', '30'))
+HISTORY = 50  # durations kept per provider
+MIN_SAMPLES = 5  # below this the window is widened
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Linear-interpolated percentile of `values` (q in 0..1)."""
+    s = sorted(values)
+    pos = (len(s) - 1) * q
+    lo = int(pos)
+    hi = min(lo + 1, len(s) - 1)
+    return s[lo] + (s[hi] - s[lo]) * (pos - lo)
+
+
+class DurationStats:
+    """Recent job durations per provider, loaded on first use and saved after each job."""
+
+    def __init__(self, path: Path = STATS_PATH):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._durations = None
+
+    def _load(self) -> Dict[str, List[float]]:
+        # callers hold self._lock
+        if self._durations is None:
+            try:
+                data = json.loads(self.path.read_text(encoding='utf-8'))
+                self._durations = {k: [float(x) for x in v] for k, v in data.items() if isinstance(v, list)}
+            except (OSError, ValueError):
+                self._durations = {}
+        return self._durations
+
+    def record(self, provider: str, seconds: float):
+        with self._lock:
+            durations = self._load()
+            durations[provider] = (durations.get(provider, []) + [round(seconds, 1)])[-HISTORY:]
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                tmp = self.path.with_name(f'{self.path.name}.{uuid.uuid4().hex[:8]}.part')
+                tmp.write_text(json.dumps(durations, indent=2), encoding='utf-8')
+                os.replace(tmp, self.path)
+            except OSError:
+                pass
+
+    def samples(self, provider: str) -> List[float]:
+        with self._lock:
+            return list(self._load().get(provider, []))
+
+    def window(self, provider: str) -> Optional[Tuple[float, float]]:
+        """(p10, p90) of the provider's job durations, or None without history."""
+        samples = self.samples(provider)
+        if not samples:
+            return None
+        lo, hi = percentile(samples, 0.1), percentile(samples, 0.9)
+        if len(samples) < MIN_SAMPLES:
+            lo, hi = lo * 0.8, hi * 1.25
+        return lo, hi
+
+
+def next_delay(elapsed: float, window: Optional[Tuple[float, float]]) -> float:
+    """Seconds until the next status check of a job that is `elapsed` seconds old."""
+    if window is None:
+        delay = elapsed * 0.25
+    else:
+        lo, hi = window
+        if elapsed < lo:
+            delay = (lo - elapsed) / 2
+        elif elapsed <= hi:
+            delay = (hi - lo) / 10
+        else:
+            delay = (elapsed - hi) / 2
+    return min(MAX_DELAY, max(MIN_DELAY, delay))
+
+
+class _Watch:
+    def __init__(self, provider, job_id, started, deadline, future, on_status):
+        self.key = (id(provider), job_id)
+        self.provider = provider
+        self.job_id = job_id
+        self.started = started
+        self.deadline = deadline
+        self.future = future
+        self.on_status = on_status
+        self.status = JobStatus(job_id, 'queued')
+        self.due = started
+
+
+class Poller:
+    """Tracks in-flight jobs on the running event loop with one shared polling task."""
+
+    def __init__(self, stats: DurationStats = None):
+        self.stats = stats or get_duration_stats()
+        self.queries = 0  # status requests sent, for comparing schedules
+        self._jobs = {}
+        self._wake = asyncio.Event()
+        self._task = None
+
+    async def wait(self, provider, job_id: str, started: float = None, timeout: float = 1200.0,
+                   on_status=None) -> JobStatus:
+        """The job's final status, or its last one if `timeout` passes first."""
+        started = time.monotonic() if started is None else started
+        w = _Watch(provider, job_id, started, started + timeout, asyncio.get_running_loop().create_future(), on_status)
+        w.due = time.monotonic() + next_delay(time.monotonic() - started, self.stats.window(provider.name))
+        self._jobs[w.key] = w
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._run())
+        self._wake.set()
+        try:
+            return await w.future
+        finally:
+            self._jobs.pop(w.key, None)
+
+    async def _run(self):
+        while self._jobs:
+            now = time.monotonic()
+            first = min(w.due for w in self._jobs.values())
+            if first > now:
+                self._wake.clear()
+                try:
+                    await asyncio.wait_for(self._wake.wait(), first - now)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            # everything due soon is checked in this tick, one batch per provider
+            groups = {}
+            for w in list(self._jobs.values()):
+                if w.due <= now + MIN_DELAY:
+                    groups.setdefault(id(w.provider), []).append(w)
+            batches = list(groups.values())
+            self.queries += sum(len(ws) for ws in batches)
+            results = await asyncio.gather(*(ws[0].provider.poll_many([w.job_id for w in ws]) for ws in batches),
+                                           return_exceptions=True)
+            now = time.monotonic()
+            for ws, result in zip(batches, results):
+                for w in ws:
+                    self._update(w, result.get(w.job_id) if isinstance(result, dict) else None, now)
+
+    def _finish(self, w: _Watch):
+        self._jobs.pop(w.key, None)
+        if not w.future.done():
+            w.future.set_result(w.status)
+
+    def _update(self, w: _Watch, status: Optional[JobStatus], now: float):
+        if w.future.done():
+            # the waiter went away (cancelled)
+            self._jobs.pop(w.key, None)
+            return
+        if status is not None:
+            w.status = status
+            if w.on_status is not None:
+                try:
+                    w.on_status(status)
+                except Exception:
+                    pass
+            if status.state in (SUCCESS, FAILED):
+                if status.state == SUCCESS:
+                    self.stats.record(w.provider.name, now - w.started)
+                self._finish(w)
+                return
+        # a failed query is retried on the normal schedule
+        if now >= w.deadline:
+            self._finish(w)
+            return
+        w.due = now + next_delay(now - w.started, self.stats.window(w.provider.name))
+
+
+_stats = None
+_stats_lock = threading.Lock()
+_pollers = weakref.WeakKeyDictionary()
+
+
+def get_duration_stats() -> DurationStats:
+    global _stats
+    with _stats_lock:
+        if _stats is None:
+            _stats = DurationStats()
+        return _stats
+
+
+def get_poller() -> Poller:
+    """The poller of the running event loop (the shared background loop in the app)."""
+    loop = asyncio.get_running_loop()
+    poller = _pollers.get(loop)
+    if poller is None:
+        poller = _pollers[loop] = Poller()
+    return poller
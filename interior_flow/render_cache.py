@@ -0,0 +1,171 @@
+"""Persistent content-addressed cache for generated renders.
+
+Entries are keyed on (model, prompt, SHA-256 of the reference image, aspect ratio,
+size), so re-running the flow with the same sketch and prompts returns the earlier
+images without another model call. The cache directory is bounded in size and
+evicts least-recently-used entries (file mtime is bumped on every hit).
+
+    RENDER_CACHE_DIR      cache location (default tools/render_cache)
+    RENDER_CACHE_MAX_MB   size bound in MB (default 1024, 0 disables the cache)
+"""
+import hashlib
+import json
+import os
+import shutil
+import threading
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Optional
+
+from interior_flow.settings import TOOLS_DIR
+
+CACHE_DIR = Path(os.environ.get('RENDER_CACHE_DIR') or TOOLS_DIR / 'render_cache')
+MAX_BYTES = int(float(os.environ.get('RENDER_CACHE_MAX_MB', '1024')) * 1024 * 1024)
+
+_hash_lock = threading.Lock()
+# (path, size, mtime_ns) -> sha256; the same reference image is hashed once per run, not per render
+_hash_memo = {}
+
+
+def file_sha256(path) -> str:
+    p = Path(path)
+    st = p.stat()
+    memo_key = (str(p.resolve()), st.st_size, st.st_mtime_ns)
+    with _hash_lock:
+        cached = _hash_memo.get(memo_key)
+    if cached:
+        return cached
+    h = hashlib.sha256()
+    with p.open('rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            h.update(chunk)
+    digest = h.hexdigest()
+    with _hash_lock:
+        if len(_hash_memo) > 256:
+            _hash_memo.clear()
+        _hash_memo[memo_key] = digest
+    return digest
+
+
+def cache_key(model, prompt, image_path=None, aspect_ratio=None, size=None) -> str:
+    image_hash = None
+    if image_path and Path(image_path).is_file():
+        image_hash = file_sha256(image_path)
+    raw = json.dumps([model or '', prompt or '', image_hash, aspect_ratio or '', size or ''], ensure_ascii=False)
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+class RenderCache:
+    def __init__(self, root: Path = CACHE_DIR, max_bytes: int = MAX_BYTES):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._key_locks = {}  # key -> [lock, users]
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def _entry_dir(self, key: str) -> Path:
+        return self.root / key[:2]
+
+    def get(self, key: str) -> Optional[Path]:
+        d = self._entry_dir(key)
+        if not d.exists():
+            return None
+        for p in d.glob(key + '.*'):
+            if p.suffix == '.part':
+                continue
+            try:
+                os.utime(p)  # mark as recently used
+            except OSError:
+                pass
+            return p
+        return None
+
+    def put(self, key: str, src) -> Path:
+        src = Path(src)
+        d = self._entry_dir(key)
+        d.mkdir(parents=True, exist_ok=True)
+        dest = d / (key + (src.suffix or '.png'))
+        tmp = d / f'{key}.{uuid.uuid4().hex[:8]}.part'
+        shutil.copyfile(src, tmp)
+        os.replace(tmp, dest)
+        self.evict()
+        return dest
+
+    def evict(self):
+        """Drop least-recently-used entries until the cache fits in max_bytes."""
+        with self._lock:
+            entries = []
+            total = 0
+            for p in self.root.glob('*/*'):
+                try:
+                    st = p.stat()
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, p))
+                total += st.st_size
+            if total <= self.max_bytes:
+                return
+            entries.sort()
+            for _mtime, size, p in entries:
+                if total <= self.max_bytes:
+                    break
+                try:
+                    p.unlink()
+                    total -= size
+                except OSError:
+                    pass
+
+    @contextmanager
+    def _key_lock(self, key: str):
+        # one lock per key while anyone holds or waits for it; dropped by the last user
+        with self._lock:
+            entry = self._key_locks.setdefault(key, [threading.Lock(), 0])
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._lock:
+                entry[1] -= 1
+                if not entry[1]:
+                    del self._key_locks[key]
+
+    def get_or_create(self, key: str, produce: Callable[[], Optional[str]], dest_dir: Path,
+                      force: bool = False, cacheable: Callable[[str], bool] = None) -> Optional[str]:
+        """Return a render for `key`, calling `produce()` only on a miss (or when `force`).
+
+        Hits are materialized as a new file in `dest_dir` (hard link when possible) so
+        callers may move or delete the result without touching the cache. Concurrent
+        requests for the same key wait for the first one instead of calling the model twice.
+        """
+        if not self.enabled:
+            return produce()
+        with self._key_lock(key):
+            if not force:
+                hit = self.get(key)
+                if hit:
+                    return str(_materialize(hit, Path(dest_dir)))
+            out = produce()
+            if out and (cacheable is None or cacheable(out)):
+                try:
+                    self.put(key, out)
+                except OSError:
+                    pass
+            return out
+
+
+def _materialize(cached: Path, dest_dir: Path) -> Path:
+    dest_dir.mkdir(parents=True, exist_ok=True)
+    dest = dest_dir / f'cached_{uuid.uuid4().hex}{cached.suffix}'
+    try:
+        os.link(cached, dest)
+    except OSError:
+        shutil.copyfile(cached, dest)
+    return dest
+
+
+render_cache = RenderCache()
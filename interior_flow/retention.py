@@ -0,0 +1,191 @@
+"""Retention policies and garbage collection for generated artifacts.
+
+Every artifact class (run directories, legacy tools/ outputs, provider debug
+responses, temp workflows, downloaded models) has an age, count and size bound.
+Entries are ranked newest first; anything older than `max_age_days`, beyond
+`max_count`, or past `max_bytes` cumulative is deleted. Entries touched within
+the last GRACE_SECONDS, paths passed as `protect` (e.g. the model currently
+shown in the UI) and entries the policy's `keep` check accepts (unfinished batches,
+which can still resume) are always kept.
+
+    RETENTION_INTERVAL_MINUTES   background GC period (default 60, 0 disables)
+    RETENTION_GRACE_SECONDS      never delete entries younger than this (default 600)
+
+CLI:
+    python -m interior_flow.retention --dry-run
+    python -m interior_flow.retention --policy runs --policy tripo_debug
+"""
+import argparse
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Iterable, List, NamedTuple, Optional, Tuple
+
+from interior_flow.batch import is_unfinished
+from interior_flow.settings import RUNS_DIR, TOOLS_DIR, TRIPO_OUTPUT_DIR, WORKFLOWS_DIR
+INTERVAL_SECONDS = float(os.environ.get('RETENTION_INTERVAL_MINUTES', '60')) * 60
+GRACE_SECONDS = float(os.environ.get('RETENTION_GRACE_SECONDS', '600'))
+
+DAY = 24 * 3600
+MB = 1024 * 1024
+
+
+class Policy(NamedTuple):
+    name: str
+    root: Path
+    patterns: Tuple[str, ...]
+    max_age_days: Optional[float] = None
+    max_count: Optional[int] = None
+    max_bytes: Optional[int] = None
+    dirs: bool = False  # entries are directories (removed as a whole)
+    keep: Optional[Callable[[Path], bool]] = None  # entries it returns True for are never removed
+
+
+POLICIES = (
+    Policy('runs', RUNS_DIR, ('run_*', 'workflow_*', 'sweep_*'), max_age_days=14, max_count=200, max_bytes=4096 * MB, dirs=True),
+    Policy('batches', RUNS_DIR, ('batch_*',), max_age_days=30, max_count=50, max_bytes=8192 * MB, dirs=True,
+           keep=is_unfinished),
+    Policy('hi_fi', TOOLS_DIR, ('run_*_hi_fi.png',), max_age_days=7, max_count=20),
+    Policy('api_responses', TOOLS_DIR, ('images_generations_response_*.json',), max_age_days=2, max_count=50),
+    Policy('tripo_debug', TOOLS_DIR, ('tripo_http_debug_*.json', 'tripo_http_exception_*.json'), max_age_days=7, max_count=20),
+    Policy('logs', TOOLS_DIR, ('run_gradio_flow_log_*.txt',), max_age_days=14, max_count=50),
+    Policy('generated', TOOLS_DIR, ('generated_gemini25_from_*', 'generated_api_*', 'cached_*'), max_age_days=7, max_count=100, max_bytes=1024 * MB),
+    Policy('modified_workflows', WORKFLOWS_DIR, ('*__modified__*.json',), max_age_days=1, max_count=20),
+    Policy('tripo_output', TRIPO_OUTPUT_DIR, ('*.glb', '*.gltf'), max_age_days=30, max_count=50, max_bytes=4096 * MB),
+)
+
+
+class Removed(NamedTuple):
+    policy: str
+    path: Path
+    size: int
+    reason: str
+
+
+def _dir_stats(d: Path) -> Tuple[float, int]:
+    mtime, size = d.stat().st_mtime, 0
+    for p in d.rglob('*'):
+        try:
+            st = p.stat()
+        except OSError:
+            continue
+        if p.is_file():
+            size += st.st_size
+        mtime = max(mtime, st.st_mtime)
+    return mtime, size
+
+
+def _entries(policy: Policy):
+    """(mtime, size, path) for every entry matching the policy, newest first."""
+    if not policy.root.is_dir():
+        return []
+    seen = set()
+    out = []
+    for pattern in policy.patterns:
+        for p in policy.root.glob(pattern):
+            if p in seen or p.is_dir() != policy.dirs:
+                continue
+            seen.add(p)
+            try:
+                if policy.dirs:
+                    mtime, size = _dir_stats(p)
+                else:
+                    st = p.stat()
+                    mtime, size = st.st_mtime, st.st_size
+            except OSError:
+                continue
+            out.append((mtime, size, p))
+    out.sort(key=lambda e: e[0], reverse=True)
+    return out
+
+
+def _remove(p: Path):
+    if p.is_dir():
+        shutil.rmtree(p, ignore_errors=True)
+    else:
+        p.unlink()
+
+
+def apply_policy(policy: Policy, dry_run: bool = False, protect: Iterable = (), now: float = None) -> List[Removed]:
+    now = time.time() if now is None else now
+    protected = {Path(p).resolve() for p in protect if p}
+    removed = []
+    kept = kept_bytes = 0
+    for mtime, size, p in _entries(policy):
+        age = now - mtime
+        reason = None
+        if policy.max_age_days is not None and age > policy.max_age_days * DAY:
+            reason = 'age'
+        elif policy.max_count is not None and kept >= policy.max_count:
+            reason = 'count'
+        elif policy.max_bytes is not None and kept_bytes + size > policy.max_bytes:
+            reason = 'size'
+        if (reason and age >= GRACE_SECONDS and p.resolve() not in protected
+                and not (policy.keep is not None and policy.keep(p))):
+            if not dry_run:
+                try:
+                    _remove(p)
+                except OSError:
+                    continue
+            removed.append(Removed(policy.name, p, size, reason))
+            continue
+        kept += 1
+        kept_bytes += size
+    return removed
+
+
+def collect_garbage(policies=POLICIES, dry_run: bool = False, protect: Iterable = ()) -> List[Removed]:
+    protect = list(protect)
+    removed = []
+    for policy in policies:
+        removed.extend(apply_policy(policy, dry_run=dry_run, protect=protect))
+    return removed
+
+
+class RetentionWorker:
+    """Daemon thread running `collect_garbage()` every `interval` seconds."""
+
+    def __init__(self, interval: float = INTERVAL_SECONDS, policies=POLICIES, protect: Callable[[], Iterable] = None):
+        self.interval = interval
+        self.policies = policies
+        self.protect = protect or (lambda: ())
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _loop(self):
+        while True:
+            try:
+                collect_garbage(self.policies, protect=self.protect())
+            except Exception:
+                pass
+            if self._stop.wait(self.interval):
+                return
+
+    def start(self) -> 'RetentionWorker':
+        if self.interval > 0 and self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name='retention', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Apply retention policies to generated artifacts.')
+    parser.add_argument('--dry-run', action='store_true', help='only list what would be removed')
+    parser.add_argument('--policy', action='append', choices=[p.name for p in POLICIES], help='limit to these policies')
+    args = parser.parse_args(argv)
+
+    policies = [p for p in POLICIES if not args.policy or p.name in args.policy]
+    removed = collect_garbage(policies, dry_run=args.dry_run)
+    for r in removed:
+        print(f'{r.policy:20} {r.reason:6} {r.size / MB:9.2f} MB  {r.path}')
+    verb = 'would remove' if args.dry_run else 'removed'
+    print(f'{verb} {len(removed)} entries, {sum(r.size for r in removed) / MB:.2f} MB')
+
+
+if __name__ == '__main__':
+    main()
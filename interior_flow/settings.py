@@ -0,0 +1,79 @@
+"""Project paths and process environment.
+
+`load_env()` reads the `.env` file in the repository root into `os.environ` (it runs
+once, on first import). The Comfy backend process must also be started with the same
+variables (or otherwise configured) for server-side nodes like GeminiImageNode to
+use the credentials.
+
+    TRIPO_API_KEY           Tripo 3D (or TRIPO_KEY)
+    NANO_API_KEY            image gateway key (or GOOGLE_API_KEY / API_KEY)
+    GOOGLE_GEMINI_BASE_URL  image gateway base URL (or NANO_API_URL / API_URL)
+    RUNS_DIR                where run directories are created (default <repo>/runs)
+
+Every module takes its paths from here.
+"""
+import os
+import threading
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+WORKFLOWS_DIR = ROOT / 'workflows'
+DOCS_DIR = ROOT / 'documents'
+TOOLS_DIR = ROOT / 'tools'
+TRIPO_OUTPUT_DIR = TOOLS_DIR / 'tripo_output'
+RUNS_DIR = Path(os.environ.get('RUNS_DIR') or ROOT / 'runs')
+
+_env_loaded = False
+_env_lock = threading.Lock()
+
+
+def load_env(path: Path = ROOT / '.env'):
+    """Set the variables from `path` in this process (values in the file win)."""
+    global _env_loaded
+    with _env_lock:
+        if _env_loaded:
+            return
+        _env_loaded = True
+    if not path.exists():
+        return
+    try:
+        for line in path.read_text(encoding='utf-8').splitlines():
+            line = line.strip()
+            if not line or line.startswith('#') or '=' not in line:
+                continue
+            k, v = line.split('=', 1)
+            k, v = k.strip(), v.strip()
+            if k and v:
+                os.environ[k] = v
+    except Exception:
+        pass
+
+
+def mask_key(s: str) -> str:
+    if not s:
+        return '<MISSING>'
+    s = str(s)
+    if len(s) <= 8:
+        return s[:2] + '...' + s[-2:]
+    return s[:4] + '...' + s[-4:]
+
+
+def write_env_check():
+    """Write masked key values to tools/env_check.txt, to verify the process sees them."""
+    try:
+        TOOLS_DIR.mkdir(parents=True, exist_ok=True)
+        tripo = os.environ.get('TRIPO_API_KEY') or os.environ.get('TRIPO_KEY')
+        nano = os.environ.get('NANO_API_KEY') or os.environ.get('GOOGLE_API_KEY') or os.environ.get('API_KEY')
+        gemini_base = os.environ.get('GOOGLE_GEMINI_BASE_URL') or os.environ.get('NANO_API_URL') or os.environ.get('API_URL')
+        lines = [
+            f"TRIPO_API_KEY: {mask_key(tripo)}",
+            f"NANO_API_KEY: {mask_key(nano)}",
+            f"GOOGLE_GEMINI_BASE_URL: {mask_key(gemini_base)}",
+        ]
+        (TOOLS_DIR / 'env_check.txt').write_text('\n'.join(lines), encoding='utf-8')
+        print('[env_check] Wrote tools/env_check.txt with masked environment values')
+    except Exception as e:
+        print('[env_check] Failed to write env_check.txt:', e)
+
+
+load_env()
@@ -0,0 +1,127 @@
+"""In-memory 3D-model status with push notifications.
+
+Replaces polling `tools/tripo_status.txt` / `tools/last_model_url.txt` from every
+browser: writers call `set_status()` / `set_model()`, and each UI session awaits
+`changes()`, which only wakes up when something actually changed. Idle sessions
+cost a suspended coroutine and nothing else.
+
+The two text files are still written (write-through) so the scripts in tools/ that
+read them keep working, and are read once at start-up to restore the last model.
+"""
+import asyncio
+import threading
+from pathlib import Path
+from typing import NamedTuple
+
+from interior_flow.settings import TOOLS_DIR, TRIPO_OUTPUT_DIR as MODEL_DIR
+
+STATUS_PATH = TOOLS_DIR / 'tripo_status.txt'
+LAST_URL_PATH = TOOLS_DIR / 'last_model_url.txt'
+
+
+class ModelStatus(NamedTuple):
+    version: int
+    status: str
+    model_url: str
+    model_path: str
+
+    @property
+    def model(self) -> str:
+        """Value for gr.Model3D: the local file when we have it, else the URL."""
+        if self.model_path and Path(self.model_path).is_file():
+            return self.model_path
+        return self.model_url
+
+
+class StatusStore:
+    def __init__(self, status_path: Path = STATUS_PATH, url_path: Path = LAST_URL_PATH):
+        self.status_path = status_path
+        self.url_path = url_path
+        self._lock = threading.Lock()
+        self._waiters = set()
+        self._version = 0
+        self._status = 'Tripo: idle'
+        self._model_url = ''
+        self._model_path = ''
+        self._restore()
+
+    def _restore(self):
+        try:
+            if self.url_path.exists():
+                url = self.url_path.read_text(encoding='utf-8').strip()
+                candidate = MODEL_DIR / Path(url).name
+                self._model_url = url
+                self._model_path = str(candidate) if url and candidate.is_file() else ''
+        except Exception:
+            pass
+
+    def snapshot(self) -> ModelStatus:
+        with self._lock:
+            return ModelStatus(self._version, self._status, self._model_url, self._model_path)
+
+    @property
+    def status(self) -> str:
+        return self.snapshot().status
+
+    def set_status(self, text: str):
+        with self._lock:
+            if text == self._status:
+                return
+            self._status = text
+            self._version += 1
+        self._write(self.status_path, text)
+        self._notify()
+
+    def set_model(self, url: str, path=None, status: str = None):
+        with self._lock:
+            self._model_url = url or ''
+            self._model_path = str(path) if path else ''
+            if status is not None:
+                self._status = status
+            self._version += 1
+        self._write(self.url_path, url or '')
+        if status is not None:
+            self._write(self.status_path, status)
+        self._notify()
+
+    @staticmethod
+    def _write(path: Path, text: str):
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(text, encoding='utf-8')
+        except Exception:
+            pass
+
+    def _notify(self):
+        with self._lock:
+            waiters = list(self._waiters)
+        for loop, event in waiters:
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:
+                # loop already closed; its waiter is gone with it
+                with self._lock:
+                    self._waiters.discard((loop, event))
+
+    async def changes(self, since: int = -1):
+        """Yield the current status, then a new snapshot after every change."""
+        loop = asyncio.get_running_loop()
+        event = asyncio.Event()
+        waiter = (loop, event)
+        with self._lock:
+            self._waiters.add(waiter)
+        try:
+            while True:
+                event.clear()
+                snap = self.snapshot()
+                if snap.version != since:
+                    since = snap.version
+                    yield snap
+                    continue
+                await event.wait()
+        finally:
+            with self._lock:
+                self._waiters.discard(waiter)
+
+
+model_status = StatusStore()
@@ -0,0 +1,132 @@
+"""Parameter sweeps over a ComfyUI workflow.
+
+A sweep expands value lists (seeds, cfg, steps, samplers, ...) into the grid of
+their combinations, derives one graph per combination from a single edited base
+graph (copy-on-write, only the swept nodes are copied), queues every prompt up
+front across the ComfyUI backend pool (each to the least-loaded backend, so the
+boxes work through them in parallel and back to back), and collects
+the images per variant as each prompt finishes: those of every SaveImage /
+PreviewImage node, found by class_type, as AsyncComfyClient.stream does. Images are
+saved into the run directory and recorded in its manifest with the parameters that
+produced them.
+
+    SWEEP_MAX_VARIANTS   refuse grids larger than this (default 64)
+"""
+import asyncio
+import itertools
+import os
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+from interior_flow.workflow_graph import IMAGE_OUTPUT_CLASSES
+
+MAX_VARIANTS = int(os.environ.get('SWEEP_MAX_VARIANTS', '64'))
+
+INT_KEYS = ('seed', 'noise_seed', 'steps', 'width', 'height', 'batch_size')
+FLOAT_KEYS = ('cfg', 'denoise')
+
+
+class SweepResult(NamedTuple):
+    index: int
+    params: dict
+    images: List[str]
+    error: str = ''
+
+    @property
+    def label(self) -> str:
+        return variant_label(self.params)
+
+
+def _coerce(key: str, token: str):
+    if key in INT_KEYS:
+        return int(float(token))
+    if key in FLOAT_KEYS:
+        return float(token)
+    return token
+
+
+def parse_values(key: str, text) -> list:
+    """'1,2,3' -> [1, 2, 3]; '100-103' -> [100, 101, 102, 103] for integer keys; '' -> []."""
+    if text is None:
+        return []
+    if isinstance(text, (int, float)):
+        return [_coerce(key, str(text))]
+    values = []
+    for token in str(text).replace('\n', ',').split(','):
+        token = token.strip()
+        if not token:
+            continue
+        if key in INT_KEYS and '-' in token[1:]:
+            # inclusive range; the first character may be a minus sign
+            cut = token.index('-', 1)
+            lo, hi = int(token[:cut]), int(token[cut + 1:])
+            values.extend(range(lo, hi + 1) if lo <= hi else range(lo, hi - 1, -1))
+        else:
+            values.append(_coerce(key, token))
+    return values
+
+
+def expand_grid(axes: Dict[str, list]) -> List[dict]:
+    """Every combination of the non-empty axes, in axis order (first axis varies slowest)."""
+    axes = {k: v for k, v in axes.items() if v}
+    if not axes:
+        return []
+    keys = list(axes)
+    variants = [dict(zip(keys, combo)) for combo in itertools.product(*(axes[k] for k in keys))]
+    if len(variants) > MAX_VARIANTS:
+        raise ValueError(f'Sweep has {len(variants)} variants; the limit is {MAX_VARIANTS} (SWEEP_MAX_VARIANTS)')
+    return variants
+
+
+def variant_label(params: dict) -> str:
+    return ' '.join(f'{k}={v}' for k, v in params.items())
+
+
+def variant_graph(base_edit, params: dict) -> dict:
+    """The base graph with `params` applied to every node carrying those input keys."""
+    edit = base_edit.fork()
+    for key, value in params.items():
+        edit.set_key(key, value)
+    return edit.graph
+
+
+async def run_sweep(pool, base_edit, variants: List[dict], run, output_classes=IMAGE_OUTPUT_CLASSES,
+                    on_result: Optional[Callable[[SweepResult], None]] = None) -> List[SweepResult]:
+    """Queue every variant across the pool's backends, then collect each one's images
+    as it completes (results in variant order)."""
+    graphs = [variant_graph(base_edit, params) for params in variants]
+    leases = []
+    for graph in graphs:
+        try:
+            leases.append(await pool.submit(graph))
+        except Exception as e:
+            leases.append(e)
+
+    async def _collect(i: int) -> SweepResult:
+        params, lease = variants[i], leases[i]
+        try:
+            if isinstance(lease, Exception):
+                raise lease
+            client, pid = lease.client, lease.prompt_id
+            await client.wait(pid)
+            history = (await client.get_history(pid))[pid]
+            paths = []
+            for nid, output in (history.get('outputs') or {}).items():
+                if (lease.workflow.get(nid) or {}).get('class_type') not in output_classes:
+                    continue
+                for img in output.get('images') or []:
+                    data = await client.get_image(img['filename'], img.get('subfolder', ''), img.get('type', 'output'))
+                    p = run.path(f"sweep_{i:03d}_{nid}_{img['filename']}")
+                    p.write_bytes(data)
+                    run.record('sweep', p, params=params, node=nid, prompt_id=pid, backend=lease.backend.url)
+                    paths.append(str(p))
+            result = SweepResult(i, params, paths)
+        except Exception as e:
+            result = SweepResult(i, params, [], str(e) or type(e).__name__)
+        finally:
+            if not isinstance(lease, Exception):
+                pool.release(lease)
+        if on_result is not None:
+            on_result(result)
+        return result
+
+    return list(await asyncio.gather(*(_collect(i) for i in range(len(variants)))))
@@ -0,0 +1,183 @@
+"""Gradio UI for the pipeline and the ComfyUI workflows.
+
+This is the only module that imports Gradio (inside `build_ui()`); the logic it
+wires up lives in `interior_flow.pipeline` and `interior_flow.workflows`.
+`launch()` starts the app together with its background services, on a FastAPI
+server that also serves the generated models (`/models/<name>`, see
+interior_flow/model_server.py).
+"""
+import os
+import uuid
+
+from interior_flow.jobs import DONE, FAILED, get_job_manager
+from interior_flow.model_server import add_model_route, create_app, set_server_address
+from interior_flow.pipeline import run_pipeline, start_tripo_output_watcher
+from interior_flow.retention import RetentionWorker
+from interior_flow.settings import write_env_check
+from interior_flow.status import model_status
+from interior_flow.workflows import list_workflows, load_defaults, run_workflow_sweep, stream_workflow
+
+
+def build_ui():
+    import gradio as gr
+
+    with gr.Blocks() as demo:
+        gr.Markdown("# 简化流程：上传草图 → 填写材质与空间 → 生成 4 张效果图\n# Simplified Flow: Upload sketch → specify materials & spaces → generate 4 effect images")
+
+        gr.Markdown("### 1) 彩平图（自动生成，用户不可见）\n### 1) Colored floorplan (generated, hidden from user)")
+        layout_prompt = gr.Textbox(label="空间与材质（示例：木地板 客厅, 瓷砖 卫生间） / Spaces & Materials (e.g. wood floor living room, tile bathroom)", placeholder="例如：木地板 客厅, 瓷砖 卫生间 / e.g.: wood floor living room, tile bathroom", lines=1)
+        sketch = gr.Image(label="上传草图（黑白平面图） / Upload sketch (B&W floorplan)", type="filepath")
+
+        gr.Markdown("### 2) 指定要生成的 4 个空间效果图（只保留这四个）\n### 2) Specify 4 room effect renders (only these four will be generated)")
+        space1 = gr.Textbox(label="空间 1 / Space 1", placeholder="例如：客厅 / e.g.: Living room")
+        space2 = gr.Textbox(label="空间 2 / Space 2", placeholder="例如：卧室 / e.g.: Bedroom")
+        space3 = gr.Textbox(label="空间 3 / Space 3", placeholder="例如：卫生间 / e.g.: Bathroom")
+        space4 = gr.Textbox(label="空间 4 / Space 4", placeholder="例如：厨房 / e.g.: Kitchen")
+
+        use_api = gr.Checkbox(label="使用外部 API（必需） / Use external API for image nodes (required)", value=True)
+        show_colored = gr.Checkbox(label="显示彩平图（调试） / Show colored floorplan (debug)", value=False)
+        aspect_ratio = gr.Dropdown(label="长宽比 / Aspect Ratio", choices=["16:9","1:1","3:2","9:16"], value="16:9")
+        # Hidden state for model URL (the UI preview is pushed from the in-memory model status store)
+        model_url = gr.State(value='')
+        tripo_enable = gr.Checkbox(label="启用 3D 生成功能（Tripo） / Enable 3D generation (Tripo)", value=False)
+        force_regen = gr.Checkbox(label="强制重新生成（忽略缓存） / Force regenerate (ignore render cache)", value=False)
+
+        run_button = gr.Button("Run / 运行")
+        gallery = gr.Gallery(label="Results / 结果", elem_id="gallery")
+        captions = gr.Textbox(label="Captions / 说明")
+
+        with gr.Accordion("ComfyUI 工作流 / ComfyUI workflow", open=False):
+            wf_select = gr.Dropdown(label="工作流 / Workflow", choices=list_workflows(), value=None)
+            with gr.Row():
+                wf_spaces = gr.Textbox(label="室内空间 / Indoor spaces")
+                wf_materials = gr.Textbox(label="材质 / Interior materials")
+            with gr.Row():
+                wf_se1 = gr.Textbox(label="效果图 1 / Effect 1")
+                wf_se2 = gr.Textbox(label="效果图 2 / Effect 2")
+                wf_se3 = gr.Textbox(label="效果图 3 / Effect 3")
+                wf_se4 = gr.Textbox(label="效果图 4 / Effect 4")
+            wf_positive = gr.Textbox(label="正向提示词 / Positive prompt", lines=2)
+            wf_negative = gr.Textbox(label="反向提示词 / Negative prompt", lines=2)
+            with gr.Row():
+                wf_seed = gr.Number(label="Seed", precision=0)
+                wf_steps = gr.Number(label="Steps", precision=0)
+                wf_cfg = gr.Number(label="CFG")
+                wf_sampler = gr.Textbox(label="Sampler")
+            with gr.Row():
+                wf_width = gr.Number(label="Width", precision=0)
+                wf_height = gr.Number(label="Height", precision=0)
+                wf_batch = gr.Number(label="Batch size", precision=0)
+                wf_prefix = gr.Textbox(label="Filename prefix")
+            wf_other = gr.Textbox(label="其他提示词（JSON：节点标题 → 文本） / Other prompts (JSON: node title -> text)", lines=3)
+            wf_image = gr.Image(label="输入图片 / Input image", type="filepath")
+
+            gr.Markdown("**参数扫描 / Parameter sweep**（逗号分隔，整数可写范围，如 1-8 / comma-separated, integer ranges like 1-8）")
+            with gr.Row():
+                sweep_seeds = gr.Textbox(label="Seeds", placeholder="1-4")
+                sweep_cfg = gr.Textbox(label="CFG", placeholder="6, 7.5")
+                sweep_steps = gr.Textbox(label="Steps", placeholder="20, 30")
+                sweep_samplers = gr.Textbox(label="Samplers", placeholder="euler, dpmpp_2m")
+            wf_incremental = gr.Checkbox(label="增量运行（只重跑受修改影响的节点） / Incremental (only re-run nodes affected by edits)", value=True)
+            with gr.Row():
+                wf_run_btn = gr.Button("运行工作流 / Run workflow")
+                sweep_btn = gr.Button("运行扫描 / Run sweep")
+            wf_gallery = gr.Gallery(label="工作流结果 / Workflow results")
+            wf_captions = gr.Textbox(label="说明 / Captions")
+
+            wf_inputs = [wf_select, wf_spaces, wf_materials, wf_se1, wf_se2, wf_se3, wf_se4, wf_positive, wf_negative,
+                         wf_seed, wf_steps, wf_cfg, wf_sampler, wf_width, wf_height, wf_batch, wf_prefix, wf_other, wf_image]
+            wf_select.change(fn=load_defaults, inputs=[wf_select], outputs=wf_inputs[1:])
+
+            # per browser session, so incremental runs only build on this session's last run
+            wf_session = gr.State(value=lambda: uuid.uuid4().hex)
+
+            def _run_workflow_ui(*args):
+                yield from stream_workflow(*args[:-2], incremental=args[-2], session=args[-1])
+
+            # no per-event concurrency limit (Gradio's default is 1): each designer's run or sweep
+            # waits on ComfyUI, not on the previous designer's
+            wf_run_btn.click(fn=_run_workflow_ui, inputs=wf_inputs + [wf_incremental, wf_session], outputs=[wf_gallery, wf_captions],
+                             concurrency_limit=None)
+            sweep_btn.click(fn=run_workflow_sweep, inputs=wf_inputs + [sweep_seeds, sweep_cfg, sweep_steps, sweep_samplers], outputs=[wf_gallery, wf_captions],
+                            concurrency_limit=None)
+
+        # place a divider and then a large preview area at the bottom
+        gr.Markdown("---")
+        gr.Markdown("**3D Preview (自动预览) / 3D 预览（自动）**")
+        # Use Gradio's Model3D output so we can display .glb/.gltf files directly
+        model_preview = gr.Model3D(label="3D Model Preview / 3D 模型预览")
+
+        # Tripo status and manual refresh
+        tripo_status = gr.Textbox(label='Tripo Status / Tripo 状态', lines=1, value='Idle')
+        check_preview_btn = gr.Button('Check 3D Preview / 刷新 3D 预览')
+
+        def check_model_preview():
+            # prefer local downloaded model in tools/tripo_output, else the model URL
+            snap = model_status.snapshot()
+            return snap.model, snap.status
+
+        async def stream_model_preview():
+            # one push subscription per browser session: wakes up only when the
+            # status store changes, so idle sessions cost nothing
+            async for snap in model_status.changes():
+                yield snap.model, snap.status
+
+        # Run submits run_pipeline as a background job and returns its id immediately;
+        # watch_run then streams the job's progress and finally its result
+        # (gallery_entries, captions, model_file_path_or_url, tripo_status).
+        job_id = gr.State(value='')
+
+        def submit_run(*flow_args):
+            jid = get_job_manager().submit(run_pipeline, *flow_args, name='run_pipeline')
+            return jid, f'已排队 / Queued job {jid}'
+
+        def watch_run(jid):
+            for snap in get_job_manager().subscribe(jid):
+                if snap['status'] == DONE:
+                    yield snap['result']
+                elif snap['status'] == FAILED:
+                    yield [], f"运行失败 / Run failed: {snap['error']}", '', 'Tripo: idle'
+                else:
+                    yield gr.update(), '\n'.join(snap['progress']) or f"{snap['status']}...", gr.update(), gr.update()
+
+        evt = run_button.click(fn=submit_run, inputs=[layout_prompt, sketch, space1, space2, space3, space4, use_api, show_colored, gr.State(value='gemini-2.5-flash-image'), aspect_ratio, tripo_enable, model_url, force_regen], outputs=[job_id, captions])
+        # watch_run only waits on the job manager; the pool bounds the actual work, so every
+        # session's watcher runs at once instead of one at a time (Gradio's default limit is 1)
+        evt = evt.then(fn=watch_run, inputs=[job_id], outputs=[gallery, captions, model_preview, tripo_status],
+                       concurrency_limit=None)
+        # after the flow returns, run a quick preview check to refresh Model3D (this will pick up any background-updated model)
+        evt.then(fn=check_model_preview, inputs=[], outputs=[model_preview, tripo_status])
+
+        # wire check preview button (manual refresh)
+        check_preview_btn.click(fn=check_model_preview, inputs=[], outputs=[model_preview, tripo_status])
+
+        # push updates: refresh the preview as soon as a Tripo job (or the output watcher) reports a new model
+        demo.load(fn=stream_model_preview, inputs=[], outputs=[model_preview, tripo_status], concurrency_limit=None)
+
+    return demo
+
+
+def launch(server_name=None, server_port=None, share=False, **launch_kwargs):
+    """Start the background services and serve the UI (blocks until the server stops)."""
+    host = server_name or os.environ.get('GRADIO_SERVER_NAME') or '127.0.0.1'
+    port = int(server_port or os.environ.get('GRADIO_SERVER_PORT') or 7860)
+    set_server_address(host, port)
+    # masked env check, so we can verify keys are visible to the process
+    write_env_check()
+    output_watcher = start_tripo_output_watcher()
+    # periodic cleanup of runs/, tools/ outputs and temp workflows (never the model on screen)
+    retention = RetentionWorker(protect=lambda: [model_status.snapshot().model_path]).start()
+    try:
+        demo = build_ui()
+        if share or launch_kwargs:
+            # Gradio's own launcher (share link, other launch options); models go on its app
+            demo.launch(server_name=host, server_port=port, share=share, prevent_thread_lock=True, **launch_kwargs)
+            add_model_route(demo.app)
+            demo.block_thread()
+        else:
+            import uvicorn
+
+            uvicorn.run(create_app(demo), host=host, port=port)
+    finally:
+        retention.stop()
+        output_watcher.stop()
@@ -0,0 +1,211 @@
+"""Dependency analysis and incremental re-execution for ComfyUI API graphs.
+
+Inputs that are links are `[node_id, output_slot]` pairs. Every node gets a
+signature: a hash of its class_type, its literal inputs and the signatures of the
+nodes it reads from, so a node is dirty exactly when it or anything upstream of it
+changed since the last run of the same workflow. Inputs naming a local file (an
+uploaded sketch for LoadImage) also carry the file's content hash: a new upload
+saved under the same name is a change.
+
+`plan_run()` then builds the graph to submit:
+
+- only output nodes (sinks) that are dirty are executed; clean sinks keep the images
+  they produced last time (`Plan.cached_outputs`);
+- a clean image producer feeding dirty nodes (e.g. the colored floorplan
+  GeminiImageNode) is replaced by a LoadImage of the file it saved last run
+  (`"<subfolder>/<file> [output]"`), so nothing upstream of it runs again;
+- everything not needed by the dirty sinks is pruned.
+
+The reused files live on the ComfyUI backend that ran the previous prompt, so a plan
+carries that backend (`Plan.backend`) and the full graph as a fallback for when the
+run has to go anywhere else.
+"""
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Set
+
+from interior_flow.render_cache import file_sha256
+
+# node classes whose images are a run's results (also what AsyncComfyClient.stream delivers)
+IMAGE_OUTPUT_CLASSES = ('SaveImage', 'PreviewImage')
+
+
+def is_link(value) -> bool:
+    return isinstance(value, list) and len(value) == 2 and isinstance(value[0], str) and isinstance(value[1], int)
+
+
+def links(node: dict):
+    """(input_key, source_node_id, slot) for every linked input of `node`."""
+    for key, value in (node.get('inputs') or {}).items():
+        if is_link(value):
+            yield key, value[0], value[1]
+
+
+def consumers(graph: dict) -> Dict[str, Set[str]]:
+    out = {nid: set() for nid in graph}
+    for nid, node in graph.items():
+        for _key, src, _slot in links(node):
+            if src in out:
+                out[src].add(nid)
+    return out
+
+
+def sinks(graph: dict) -> List[str]:
+    """Nodes nothing reads from: the outputs ComfyUI executes the graph for."""
+    return [nid for nid, used_by in consumers(graph).items() if not used_by]
+
+
+def _file_digest(value) -> Optional[str]:
+    # local files only (the same rule ComfyPool uses to decide what to upload)
+    if not isinstance(value, str) or not value:
+        return None
+    try:
+        p = Path(value)
+        return file_sha256(p) if p.is_absolute() and p.is_file() else None
+    except (OSError, ValueError):
+        return None
+
+
+def signatures(graph: dict) -> Dict[str, str]:
+    sigs = {}
+
+    def sig(nid, visiting):
+        if nid in sigs:
+            return sigs[nid]
+        if nid in visiting or nid not in graph:
+            return f'missing:{nid}'
+        visiting.add(nid)
+        node = graph[nid]
+        items = []
+        for key, value in sorted((node.get('inputs') or {}).items()):
+            if is_link(value):
+                items.append([key, 'link', sig(value[0], visiting), value[1]])
+            else:
+                digest = _file_digest(value)
+                items.append([key, value, digest] if digest else [key, value])
+        raw = json.dumps([node.get('class_type'), items], ensure_ascii=False, sort_keys=True, default=str)
+        sigs[nid] = hashlib.sha256(raw.encode('utf-8')).hexdigest()
+        visiting.discard(nid)
+        return sigs[nid]
+
+    for nid in graph:
+        sig(nid, set())
+    return sigs
+
+
+class Plan(NamedTuple):
+    graph: Optional[dict]  # graph to submit; None when nothing is dirty
+    full_graph: dict
+    signatures: Dict[str, str]
+    dirty: frozenset
+    reused: Dict[str, str]  # producer node id -> LoadImage value that replaced it
+    cached_outputs: Dict[str, dict]  # clean sink id -> its outputs from the last run
+    backend: Optional[str]  # backend holding the reused files
+
+    @property
+    def incremental(self) -> bool:
+        return self.graph is not self.full_graph
+
+
+def _saved_image(graph: dict, producer: str, used_by: Set[str], outputs: Dict[str, dict]) -> Optional[str]:
+    """LoadImage value for the single image `producer` saved last run, if there is one.
+
+    SaveImage files ('output') are preferred over PreviewImage files ('temp'), which
+    ComfyUI clears on restart.
+    """
+    found = []
+    for nid in used_by:
+        node = graph[nid]
+        if node.get('class_type') not in IMAGE_OUTPUT_CLASSES or node['inputs'].get('images') != [producer, 0]:
+            continue
+        refs = (outputs.get(nid) or {}).get('refs') or []
+        if len(refs) == 1:
+            found.append(refs[0])
+    if not found:
+        return None
+    ref = min(found, key=lambda r: (r.get('type', 'output') != 'output', r['filename']))
+    name = f"{ref['subfolder']}/{ref['filename']}" if ref.get('subfolder') else ref['filename']
+    return f"{name} [{ref.get('type', 'output')}]"
+
+
+def plan_run(graph: dict, last: Optional[dict]) -> Plan:
+    """Plan a run of `graph` given the memory of the previous run (see WorkflowMemory)."""
+    sigs = signatures(graph)
+    if not last:
+        return Plan(graph, graph, sigs, frozenset(graph), {}, {}, None)
+
+    prev_sigs = last.get('signatures') or {}
+    outputs = last.get('outputs') or {}
+    dirty = frozenset(nid for nid in graph if prev_sigs.get(nid) != sigs[nid])
+    all_sinks = sinks(graph)
+    # a clean sink without recorded outputs (e.g. Preview3D) has nothing to show; only re-run dirty ones
+    cached = {nid: outputs[nid] for nid in all_sinks if nid not in dirty and nid in outputs}
+    run_sinks = [nid for nid in all_sinks if nid in dirty]
+    if not run_sinks:
+        return Plan(None, graph, sigs, dirty, {}, cached, last.get('backend'))
+
+    used_by = consumers(graph)
+    needed, reused = set(), {}
+    stack = list(run_sinks)
+    while stack:
+        nid = stack.pop()
+        if nid in needed:
+            continue
+        needed.add(nid)
+        for _key, src, _slot in links(graph[nid]):
+            if src in needed or src in reused or src not in graph:
+                continue
+            # LoadImage only stands in for output slot 0 (IMAGE)
+            if src not in dirty and all(s == 0 for c in used_by[src] for _k, n, s in links(graph[c]) if n == src):
+                saved = _saved_image(graph, src, used_by[src], outputs)
+                if saved:
+                    reused[src] = saved
+                    continue
+            stack.append(src)
+
+    pruned = {nid: graph[nid] for nid in needed}
+    for nid, value in reused.items():
+        pruned[nid] = {'class_type': 'LoadImage', 'inputs': {'image': value},
+                       '_meta': {'title': f"{(graph[nid].get('_meta') or {}).get('title', nid)} (reused)"}}
+    return Plan(pruned, graph, sigs, dirty, reused, cached, last.get('backend'))
+
+
+def memory_key(workflow: str, session: str = None) -> str:
+    """Runs are remembered per UI session, so one designer's edits never make another's run incremental."""
+    return f'{session}/{workflow}' if session else workflow
+
+
+class WorkflowMemory:
+    """What the last successful run of each workflow produced, for `plan_run()`.
+
+    Keyed by `memory_key()`; the least recently used of more than `max_entries`
+    entries are dropped.
+    """
+
+    def __init__(self, max_entries: int = 128):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._runs = OrderedDict()
+
+    def last(self, key: str) -> Optional[dict]:
+        with self._lock:
+            if key in self._runs:
+                self._runs.move_to_end(key)
+            return self._runs.get(key)
+
+    def remember(self, key: str, backend: str, sigs: Dict[str, str], outputs: Dict[str, dict]):
+        with self._lock:
+            self._runs[key] = {'backend': backend, 'signatures': dict(sigs), 'outputs': dict(outputs)}
+            self._runs.move_to_end(key)
+            while len(self._runs) > self.max_entries:
+                self._runs.popitem(last=False)
+
+    def forget(self, key: str):
+        with self._lock:
+            self._runs.pop(key, None)
+
+
+workflow_memory = WorkflowMemory()
@@ -0,0 +1,122 @@
+"""Parsed ComfyUI workflow templates with node indexes and copy-on-write edits.
+
+`load_template(path)` parses a workflow JSON once per (path, mtime) and builds
+indexes from input key, node title and class_type to node ids, so edits touch
+only the nodes that carry a given input instead of scanning the whole graph per
+key. `template.edit()` returns a `WorkflowEdit` that shares every node with the
+template and copies a node only when one of its inputs is changed; the cached
+template itself is never mutated. Values derived from a template (such as the UI
+defaults) can be memoized on it with `template.memo()`.
+"""
+import json
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Tuple
+
+MAX_TEMPLATES = 32
+
+
+class WorkflowTemplate:
+    def __init__(self, path: Path, mtime_ns: int, graph: dict):
+        self.path = path
+        self.mtime_ns = mtime_ns
+        self.graph = graph
+        self.by_input: Dict[str, Tuple[str, ...]] = {}
+        self.by_title: Dict[str, Tuple[str, ...]] = {}
+        self.by_class: Dict[str, Tuple[str, ...]] = {}
+        self._memo = {}
+        self._memo_lock = threading.Lock()
+        self._index()
+
+    def _index(self):
+        by_input, by_title, by_class = {}, {}, {}
+        for nid, node in self.graph.items():
+            if not isinstance(node, dict):
+                continue
+            for key in (node.get('inputs') or {}):
+                by_input.setdefault(key, []).append(nid)
+            title = (node.get('_meta') or {}).get('title')
+            if title:
+                by_title.setdefault(title, []).append(nid)
+            if node.get('class_type'):
+                by_class.setdefault(node['class_type'], []).append(nid)
+        self.by_input = {k: tuple(v) for k, v in by_input.items()}
+        self.by_title = {k: tuple(v) for k, v in by_title.items()}
+        self.by_class = {k: tuple(v) for k, v in by_class.items()}
+
+    def title(self, nid: str) -> str:
+        return ((self.graph.get(nid) or {}).get('_meta') or {}).get('title', '')
+
+    def memo(self, name: str, compute: Callable[['WorkflowTemplate'], object]):
+        """Compute a value derived from this template once and keep it with the template."""
+        with self._memo_lock:
+            if name not in self._memo:
+                self._memo[name] = compute(self)
+            return self._memo[name]
+
+    def edit(self) -> 'WorkflowEdit':
+        return WorkflowEdit(self)
+
+
+class WorkflowEdit:
+    """Copy-on-write view of a template: untouched nodes stay shared with it."""
+
+    def __init__(self, template: WorkflowTemplate):
+        self.template = template
+        self.graph = dict(template.graph)
+        self._owned = set()
+
+    def inputs(self, nid: str) -> dict:
+        return (self.graph.get(nid) or {}).get('inputs') or {}
+
+    def _own(self, nid: str) -> dict:
+        node = self.graph[nid]
+        if nid not in self._owned:
+            node = dict(node)
+            node['inputs'] = dict(node.get('inputs') or {})
+            self.graph[nid] = node
+            self._owned.add(nid)
+        return node
+
+    def set_input(self, nid: str, key: str, value):
+        if nid in self.graph:
+            self._own(nid)['inputs'][key] = value
+
+    def set_key(self, key: str, value, nids: Iterable[str] = None):
+        """Set `key` on every node that has it (or on the given subset of those nodes)."""
+        for nid in (self.template.by_input.get(key, ()) if nids is None else nids):
+            self.set_input(nid, key, value)
+
+    def fork(self) -> 'WorkflowEdit':
+        """A new copy-on-write view starting from this edit's graph (for per-variant changes)."""
+        child = WorkflowEdit(self.template)
+        child.graph = dict(self.graph)
+        return child
+
+    def replace_node(self, nid: str, node: dict):
+        self.graph[nid] = node
+        self._owned.add(nid)
+
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def load_template(path) -> WorkflowTemplate:
+    """Parsed template for `path`, re-read only when the file's mtime changes."""
+    p = Path(path)
+    key = str(p.resolve())
+    mtime_ns = p.stat().st_mtime_ns
+    with _cache_lock:
+        t = _cache.get(key)
+        if t is not None and t.mtime_ns == mtime_ns:
+            _cache.move_to_end(key)
+            return t
+    t = WorkflowTemplate(p, mtime_ns, json.loads(p.read_text(encoding='utf-8')))
+    with _cache_lock:
+        _cache[key] = t
+        _cache.move_to_end(key)
+        while len(_cache) > MAX_TEMPLATES:
+            _cache.popitem(last=False)
+    return t
@@ -0,0 +1,445 @@
+"""Run and edit the project's ComfyUI workflows (workflows/*.json and top-level *.json).
+
+`edit_workflow()` applies the form fields (spaces, materials, effect labels, sampler
+settings, prompts, input image) to a cached template; `stream_workflow()` runs the
+result on the ComfyUI backend pool (or through the image API with `use_api`),
+`run_workflow_sweep()` runs a parameter grid, and `load_defaults()` reads the form
+values back out of a workflow file. Nothing here imports Gradio.
+
+    COMFY_DUMP_WORKFLOWS   set to 1 to save each submitted graph into its run directory
+"""
+import copy
+import json
+import os
+from pathlib import Path
+
+from interior_flow.artifacts import new_run
+from interior_flow.pipeline import api_generate_image
+from interior_flow.settings import DOCS_DIR, ROOT, WORKFLOWS_DIR
+from interior_flow.workflow_templates import load_template
+
+DUMP_WORKFLOWS = os.environ.get('COMFY_DUMP_WORKFLOWS', '').lower() in ('1', 'true', 'yes')
+
+
+def list_workflows():
+    # include workflows in workflows/ and also top-level json files (e.g., api_google_gemini_image.json)
+    files = {p.name for p in WORKFLOWS_DIR.glob("*.json")}
+    files.update({p.name for p in ROOT.glob("*.json")})
+    # per-call temp copies written by run_workflow are not selectable workflows
+    return sorted(f for f in files if '__modified__' not in f)
+
+
+def get_workflow_path(name: str) -> Path:
+    p = WORKFLOWS_DIR / name
+    if p.exists():
+        return p
+    p2 = ROOT / name
+    if p2.exists():
+        return p2
+    # fallback to WORKFLOWS_DIR path
+    return p
+
+def edit_workflow(selected_workflow, indoor_spaces, interior_materials, se1, se2, se3, se4, positive, negative, seed, steps, cfg, sampler, width, height, batch_size, filename_prefix, other_prompts, image_input):
+    """
+    Apply the UI edits to the selected workflow template.
+    Returns (workflow_path, template, edit); `edit.graph` is the graph to submit.
+    Raises when the workflow cannot be loaded.
+    """
+    # load original workflow JSON (resolve whether it's in workflows/ or project root);
+    # parsed once per file version, edits only copy the nodes they touch
+    orig_path = get_workflow_path(selected_workflow)
+    template = load_template(orig_path)
+    edit = template.edit()
+
+    # apply edits to specific node ids if present
+    # node 70: string_b -> indoor spaces
+    if indoor_spaces is not None:
+        edit.set_input("70", "string_b", indoor_spaces)
+
+    # node 45: interior materials
+    if interior_materials is not None:
+        edit.set_input("45", "string_b", interior_materials)
+
+    # space effect labels for nodes 34,48,53,58
+    for nid, val in [("34", se1), ("48", se2), ("53", se3), ("58", se4)]:
+        if val is not None:
+            edit.set_input(nid, "string_b", val)
+
+    # apply other common fields where present (only nodes that carry the key are visited)
+    for key, value in (("seed", seed), ("steps", steps), ("cfg", cfg), ("sampler_name", sampler),
+                       ("width", width), ("height", height), ("batch_size", batch_size),
+                       ("filename_prefix", filename_prefix)):
+        if value is not None:
+            edit.set_key(key, value)
+
+    # set positive/negative if there are CLIPTextEncode or similar nodes
+    if positive is not None:
+        edit.set_key("positive", positive)
+    if negative is not None:
+        edit.set_key("negative", negative)
+    if positive or negative:
+        # text fields: conservative, only where the node title hints at positive/negative
+        for nid in template.by_input.get("text", ()):
+            title = template.title(nid).lower()
+            if "positive" in title and positive is not None:
+                edit.set_input(nid, "text", positive)
+            elif "negative" in title and negative is not None:
+                edit.set_input(nid, "text", negative)
+
+    # other_prompts: expects JSON mapping of node_title->text
+    try:
+        other_map = json.loads(other_prompts) if other_prompts else {}
+        if isinstance(other_map, dict):
+            for title, text in other_map.items():
+                # if a key matches title, and node has text input, set it
+                for nid in template.by_title.get(title, ()):
+                    if "text" in edit.inputs(nid):
+                        edit.set_input(nid, "text", text)
+    except Exception:
+        # ignore malformed JSON
+        pass
+
+    # image_input: if provided, write to documents and update any LoadImage nodes
+    if image_input:
+        try:
+            # image_input is a filepath from gradio
+            img_path = Path(image_input)
+            if img_path.exists():
+                DOCS_DIR.mkdir(parents=True, exist_ok=True)
+                dest = DOCS_DIR / img_path.name
+                dest.write_bytes(img_path.read_bytes())
+                # update nodes where key is 'image'
+                edit.set_key("image", str(dest))
+            else:
+                # gradio may supply bytes-like -- try to save
+                pass
+        except Exception:
+            pass
+    return orig_path, template, edit
+
+
+def run_workflow(selected_workflow, indoor_spaces, interior_materials, se1, se2, se3, se4, positive, negative, seed, steps, cfg, sampler, width, height, batch_size, filename_prefix, other_prompts, image_input, use_api=False, api_model=None, aspect_ratio='1:1', dump_workflow=None, incremental=True, session=None):
+    """
+    Apply the UI edits to the selected workflow and run it to completion.
+    Returns images list and a captions string (the last update of stream_workflow).
+    """
+    result = [], ''
+    for result in stream_workflow(selected_workflow, indoor_spaces, interior_materials, se1, se2, se3, se4, positive, negative, seed, steps, cfg, sampler, width, height, batch_size, filename_prefix, other_prompts, image_input, use_api=use_api, api_model=api_model, aspect_ratio=aspect_ratio, dump_workflow=dump_workflow, incremental=incremental, session=session):
+        pass
+    return result
+
+
+def stream_workflow(selected_workflow, indoor_spaces, interior_materials, se1, se2, se3, se4, positive, negative, seed, steps, cfg, sampler, width, height, batch_size, filename_prefix, other_prompts, image_input, use_api=False, api_model=None, aspect_ratio='1:1', dump_workflow=None, incremental=True, session=None):
+    """
+    Apply the UI edits to the selected workflow and run it, yielding (images, captions)
+    as it goes: per-node progress from the ComfyUI websocket, and each SaveImage /
+    PreviewImage node's images as soon as that node finishes. The edited graph is
+    submitted from memory; with `dump_workflow` (default COMFY_DUMP_WORKFLOWS) it
+    is also saved into the run directory for debugging. With `incremental`, only the
+    subgraph affected by edits since this workflow's last run (in the same UI
+    `session`) is executed.
+    """
+    if not selected_workflow:
+        yield [], "No workflow selected"
+        return
+
+    try:
+        orig_path, template, edit = edit_workflow(selected_workflow, indoor_spaces, interior_materials, se1, se2, se3, se4, positive, negative, seed, steps, cfg, sampler, width, height, batch_size, filename_prefix, other_prompts, image_input)
+    except Exception as e:
+        yield [], f"Failed to load workflow: {e}"
+        return
+    wf_obj = edit.graph
+
+    run = new_run('workflow')
+    run.set_meta(workflow=selected_workflow)
+    if DUMP_WORKFLOWS if dump_workflow is None else dump_workflow:
+        # the exact graph that was submitted, as a debugging aid
+        try:
+            run.write_json(f'{orig_path.stem}.json', wf_obj, kind='workflow')
+        except Exception:
+            pass
+
+    # If use_api is True, bypass Comfy image nodes and generate via API instead
+    if use_api:
+        images = []
+        captions = []
+        # Build a base prompt for colored floor plan
+        base_prompt = ''
+        if positive:
+            base_prompt += positive + '. '
+        if indoor_spaces:
+            base_prompt += 'Indoor spaces: ' + indoor_spaces + '. '
+        if interior_materials:
+            base_prompt += 'Materials: ' + interior_materials + '. '
+        base_prompt += 'Convert the provided black-and-white floor plan into a clean, colored 2D floor-plan illustration. Keep walls, doors and furniture accurate.'
+
+        try:
+            # generate colored floor-plan using the API; pass input image if provided
+            ref_image = None
+            if image_input:
+                ref_image = api_generate_image(api_model or 'gemini-2.5-flash-image', base_prompt, image_input, aspect_ratio=aspect_ratio, size=f'{width}x{height}', outdir=run.dir)
+            else:
+                ref_image = api_generate_image(api_model or 'gemini-2.5-flash-image', base_prompt, None, aspect_ratio=aspect_ratio, size=f'{width}x{height}', outdir=run.dir)
+            # NOTE: Do not append the colored floorplan to the returned images; keep it internal as reference.
+            if ref_image:
+                run.record('floorplan', ref_image)
+        except Exception as e:
+            yield [], f'API generation failed: {e}'
+            return
+
+        # generate space effect images
+        for idx, sp in enumerate([se1, se2, se3, se4], start=1):
+            if not sp:
+                continue
+            try:
+                # Use the generated colored floorplan as reference for effect renders when available
+                effect_prompt = sp
+                img = api_generate_image(api_model or 'gemini-2.5-flash-image', effect_prompt, ref_image, aspect_ratio=aspect_ratio, size=f'{width}x{height}', outdir=run.dir)
+                if img:
+                    images.append(str(run.record('effect', img, index=idx)))
+                    captions.append(f'效果图-{idx}')
+            except Exception as e:
+                captions.append(f'效果图-{idx} 生成失败: {e}')
+
+        yield images, '\n'.join(captions)
+        return
+
+    # run workflow via Comfy, submitting the edited graph straight from memory. With `incremental`,
+    # only nodes affected by the edits since this workflow's last run execute; clean upstream images
+    # are fed back in via LoadImage and clean outputs are reused (interior_flow/workflow_graph.py).
+    from interior_flow.loop import iter_on_loop
+    from interior_flow.comfy_pool import get_comfy_pool
+    from interior_flow.workflow_graph import memory_key, plan_run, workflow_memory
+
+    memory = memory_key(selected_workflow, session)
+    plan = plan_run(wf_obj, workflow_memory.last(memory) if incremental else None)
+    images = []
+    captions = []
+    outputs = {}  # output node id -> {'refs': [...], 'images': [[path, caption], ...]}
+    started = set()
+    total = len(plan.graph or {})
+    backend = plan.backend
+
+    def _title(nid):
+        return template.title(nid) or (wf_obj.get(nid) or {}).get('class_type', nid)
+
+    def _show_cached():
+        for nid, out in plan.cached_outputs.items():
+            for path, caption in out.get('images') or []:
+                if Path(path).is_file():
+                    images.append([path, caption])
+                    captions.append(f"{caption} (复用 / reused)")
+
+    if plan.incremental:
+        _show_cached()
+        run.set_meta(incremental=True, dirty=sorted(plan.dirty), reused=plan.reused)
+    if plan.graph is None:
+        # nothing changed since the last run
+        captions.append("未修改，复用上次结果 / No changes since the last run; showing previous results")
+        yield images, "\n".join(captions)
+        return
+    if plan.incremental:
+        yield list(images), "\n".join(captions + [f"增量运行 / Incremental run: {total}/{len(wf_obj)} nodes"])
+
+    try:
+        for upd in iter_on_loop(get_comfy_pool().stream(plan.graph, prefer=plan.backend if plan.incremental else None, fallback=plan.full_graph)):
+            if upd.kind == 'fallback':
+                # reused files are not reachable: the full graph runs, so drop the reused outputs
+                plan = plan._replace(graph=plan.full_graph, cached_outputs={})
+                images, captions, total = [], [], len(wf_obj)
+                status = "完整运行 / Running the full graph"
+            elif upd.kind == 'dispatched':
+                backend = upd.node
+                run.set_meta(backend=upd.node)
+                status = f"ComfyUI: {upd.node}"
+            elif upd.kind in ('executing', 'cached'):
+                started.add(upd.node)
+                if upd.kind == 'cached':
+                    continue
+                status = f"[{len(started)}/{total}] {_title(upd.node)}..."
+            elif upd.kind == 'progress':
+                status = f"[{len(started)}/{total}] {_title(upd.node)}: {upd.value}/{upd.max}"
+            elif upd.kind == 'images':
+                out_entry = outputs.setdefault(upd.node, {'refs': [], 'images': []})
+                out_entry['refs'].extend(upd.refs)
+                for filename, data in upd.images:
+                    out = run.path(f"{upd.node}_{filename}")
+                    out.write_bytes(data)
+                    run.record('comfy_output', out, node=upd.node, title=_title(upd.node))
+                    images.append([str(out), f"{_title(upd.node)}: {filename}"])
+                    out_entry['images'].append([str(out), f"{_title(upd.node)}: {filename}"])
+                    captions.append(f"{_title(upd.node)}: {filename}")
+                status = f"[{len(started)}/{total}] {_title(upd.node)} 完成 / done"
+            else:
+                continue
+            yield list(images), "\n".join(captions + [status])
+    except Exception as e:
+        # Provide a friendly message for common authorization errors
+        msg = str(e)
+        if "Unauthorized" in msg or "login" in msg.lower():
+            hint = (
+                "Comfy backend reported an authorization error. "
+                "This workflow uses external Gemini nodes that require you to login or provide credentials in ComfyUI. "
+                "Please open your ComfyUI backend, configure/login the Gemini/third-party node, then retry."
+            )
+            yield list(images), f"Execution failed: {msg}\n\nHint: {hint}"
+            return
+        yield list(images), f"Workflow execution failed: {msg}"
+        return
+
+    # remember what every output now holds, for the next incremental run
+    workflow_memory.remember(memory, backend, plan.signatures, {**plan.cached_outputs, **outputs})
+    yield images, "\n".join(captions)
+
+
+def run_workflow_sweep(selected_workflow, indoor_spaces, interior_materials, se1, se2, se3, se4, positive, negative, seed, steps, cfg, sampler, width, height, batch_size, filename_prefix, other_prompts, image_input, sweep_seeds='', sweep_cfg='', sweep_steps='', sweep_samplers=''):
+    """
+    Run the selected workflow once per combination of the sweep values
+    (e.g. seeds "1-4", cfg "6,7.5"). Every variant is queued to ComfyUI up front;
+    the images are saved in the run directory and returned as [image, params] pairs.
+    Returns (gallery_entries, captions).
+    """
+    if not selected_workflow:
+        return [], "No workflow selected"
+    from interior_flow.loop import run_on_loop
+    from interior_flow.comfy_pool import get_comfy_pool
+    from interior_flow.sweeps import expand_grid, parse_values, run_sweep
+
+    try:
+        variants = expand_grid({
+            'seed': parse_values('seed', sweep_seeds),
+            'cfg': parse_values('cfg', sweep_cfg),
+            'steps': parse_values('steps', sweep_steps),
+            'sampler_name': parse_values('sampler_name', sweep_samplers),
+        })
+    except ValueError as e:
+        return [], f"Invalid sweep: {e}"
+    if not variants:
+        return [], "Sweep is empty: enter seeds, cfg, steps or samplers to vary"
+
+    try:
+        orig_path, template, edit = edit_workflow(selected_workflow, indoor_spaces, interior_materials, se1, se2, se3, se4, positive, negative, seed, steps, cfg, sampler, width, height, batch_size, filename_prefix, other_prompts, image_input)
+    except Exception as e:
+        return [], f"Failed to load workflow: {e}"
+
+    run = new_run('sweep')
+    run.set_meta(workflow=selected_workflow, variants=variants)
+    try:
+        results = run_on_loop(run_sweep(get_comfy_pool(), edit, variants, run))
+    except Exception as e:
+        return [], f"Sweep failed: {e}"
+
+    gallery_entries = []
+    captions = []
+    for res in results:
+        if res.error:
+            captions.append(f"[{res.index + 1}] {res.label}: 失败 / failed: {res.error}")
+            continue
+        for img in res.images:
+            gallery_entries.append([img, res.label])
+        captions.append(f"[{res.index + 1}] {res.label}: {len(res.images)} image(s)")
+    return gallery_entries, '\n'.join(captions)
+
+
+def extract_defaults_from_workflow(path: Path):
+    # Return a mapping of common defaults found in the workflow JSON
+    defaults = {
+        "positive": "",
+        "negative": "",
+        "seed": None,
+        "steps": None,
+        "cfg": None,
+        "sampler_name": "",
+        "width": None,
+        "height": None,
+        "batch_size": None,
+        "filename_prefix": "",
+        "other_prompts": {},
+        "image_path": None,
+    }
+    try:
+        template = load_template(path)
+    except Exception:
+        return defaults
+    # computed once per workflow file version; callers get their own copy
+    return copy.deepcopy(template.memo('defaults', lambda t: _collect_workflow_defaults(t.graph, path, defaults)))
+
+
+def _collect_workflow_defaults(obj, path: Path, defaults: dict):
+    # obj is mapping of node id -> node spec
+    for nid, node in obj.items():
+        inputs = node.get("inputs", {})
+        meta = node.get("_meta", {})
+        title = meta.get("title", "").lower()
+
+        # common text fields
+        if "text" in inputs:
+            txt = inputs.get("text")
+            # if text is a simple string, use it
+            if isinstance(txt, str):
+                if "positive" in title:
+                    defaults["positive"] = txt
+                elif "negative" in title:
+                    defaults["negative"] = txt
+                else:
+                    defaults["other_prompts"][title or nid] = txt
+
+        # numeric/simple inputs
+        for key in ("seed", "steps", "cfg", "sampler_name", "width", "height", "batch_size", "filename_prefix"):
+            if key in inputs:
+                val = inputs.get(key)
+                # if it's a primitive, set default
+                if isinstance(val, (int, float, str)):
+                    defaults[key] = val
+
+        # look for image or filename inputs
+        for k, v in inputs.items():
+            if isinstance(v, str) and (".png" in v.lower() or ".jpg" in v.lower() or ".jpeg" in v.lower() or v.endswith('.webp')):
+                p = Path(v)
+                if p.exists():
+                    defaults["image_path"] = str(p)
+                else:
+                    # maybe relative to workflows folder
+                    p2 = path.parent / v
+                    if p2.exists():
+                        defaults["image_path"] = str(p2)
+
+        # specific nodes for this project: capture predefined prompts if present
+        # node ids used in your workflow: 70 (spaces list), 45 (interior materials),
+        # 34/48/53/58 are individual effect labels
+        if nid == "70":
+            b = inputs.get("string_b")
+            if isinstance(b, str):
+                defaults["indoor_spaces"] = b
+        if nid == "45":
+            b = inputs.get("string_b")
+            if isinstance(b, str):
+                defaults["interior_materials"] = b
+        if nid in ("34", "48", "53", "58"):
+            b = inputs.get("string_b")
+            if isinstance(b, str):
+                # store in list under space_effects key
+                defaults.setdefault("space_effects", {})[nid] = b
+
+    return defaults
+
+
+def load_defaults(selected_workflow):
+    if not selected_workflow:
+        # return empty/default values for all components
+        return ["", "", "", "", "", "", "", "", None, None, None, "", None, None, None, "", "", None]
+
+    wf_path = get_workflow_path(selected_workflow)
+    d = extract_defaults_from_workflow(wf_path)
+    # new order: indoor_spaces, interior_materials, space_effects(4), positive, negative, seed, steps, cfg, sampler, width, height, batch_size, filename_prefix, other_prompts, image
+    other_prompts_str = json.dumps(d.get("other_prompts", {}), ensure_ascii=False, indent=2)
+    indoor = d.get("indoor_spaces", "")
+    materials = d.get("interior_materials", "")
+    se = d.get("space_effects", {})
+    # map node ids to a deterministic order: 34,48,53,58
+    se34 = se.get("34", "左边客厅效果图")
+    se48 = se.get("48", "卧室效果图")
+    se53 = se.get("53", "卫生间效果图")
+    se58 = se.get("58", "厨房效果图")
+
+    return [indoor, materials, se34, se48, se53, se58, d.get("positive", ""), d.get("negative", ""), d.get("seed"), d.get("steps"), d.get("cfg"), d.get("sampler_name", ""), d.get("width"), d.get("height"), d.get("batch_size"), d.get("filename_prefix", ""), other_prompts_str, d.get("image_path")]
@@ -1,5 +1,11 @@
 import httpx,sys
-url='http://127.0.0.1:8000/eaa56d7f-2bcc-4469-a704-28dd5f51344e_pbr.glb'
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from interior_flow.model_server import model_url  # noqa: E402
+# the model named on the command line, else the last one recorded (served by the running app)
+last = Path(__file__).resolve().parent / 'last_model_url.txt'
+name = sys.argv[1] if len(sys.argv) > 1 else (last.read_text(encoding='utf-8').strip() if last.exists() else 'eaa56d7f-2bcc-4469-a704-28dd5f51344e_pbr.glb')
+url = model_url(name)
 try:
     r=httpx.get(url, timeout=5.0)
     print('GET', url, '=>', r.status_code)
@@ -4,6 +4,9 @@ import httpx
 import sys
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from interior_flow.http_pool import get_client
+
 API_URL = os.getenv('NANO_API_URL', 'https://nanoapi.poloai.top').rstrip('/')
 API_KEY = os.getenv('NANO_API_KEY') or os.getenv('NANOAPI_KEY') or os.getenv('NANO_API_TOKEN')
 
@@ -12,7 +15,7 @@ if not API_KEY:
     sys.exit(1)
 
 headers = {'Authorization': f'Bearer {API_KEY}', 'Content-Type': 'application/json'}
-client = httpx.Client(timeout=120.0)
+client = get_client(API_URL)
 
 endpoint = API_URL + '/v1/images/generations'
 model = 'doubao-seedream-4-0-250828'
@@ -37,7 +40,7 @@ out_path = Path(__file__).resolve().parent.parent / 'bedroom_render.png'
 
 print('Requesting bedroom render...')
 try:
-    r = client.post(endpoint, headers=headers, json=payload)
+    r = client.post(endpoint, headers=headers, json=payload, timeout=120.0)
     print('Status:', r.status_code)
     r.raise_for_status()
 except httpx.HTTPStatusError as e:
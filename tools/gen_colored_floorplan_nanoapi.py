@@ -4,7 +4,8 @@ import json
 import base64
 from pathlib import Path
 
-import httpx
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from interior_flow.http_pool import get_client
 
 API_URL = os.environ.get("NANO_API_URL", "https://nanoapi.poloai.top")
 API_KEY = os.environ.get("NANO_API_KEY")
@@ -93,7 +94,7 @@ def main():
     print(f"Querying {url} with model={MODEL}")
 
     try:
-        resp = httpx.post(url, headers=headers, json=payload, timeout=120)
+        resp = get_client(url).post(url, headers=headers, json=payload, timeout=120)
     except Exception as e:
         print("Request error:", e)
         sys.exit(5)
@@ -118,7 +119,7 @@ def main():
             # download the url
             img_url = d0["url"]
             print("Downloading returned URL:", img_url)
-            r2 = httpx.get(img_url, timeout=120)
+            r2 = get_client(img_url).get(img_url, timeout=120, follow_redirects=True)
             if r2.status_code == 200:
                 with out_path.open("wb") as f:
                     f.write(r2.content)
@@ -1,17 +1,13 @@
 import os
 import sys
 from pathlib import Path
-import importlib.util
 import json
 
 BASE = Path(__file__).resolve().parent.parent
-APP_PATH = BASE / 'app (1).py'
+sys.path.insert(0, str(BASE))
 
-def load_app_module(path: Path):
-    spec = importlib.util.spec_from_file_location('app_main', str(path))
-    mod = importlib.util.module_from_spec(spec)
-    spec.loader.exec_module(mod)
-    return mod
+from interior_flow.settings import WORKFLOWS_DIR
+from interior_flow.workflows import list_workflows, load_defaults, run_workflow
 
 def main():
     # ensure env vars are set by caller; otherwise use defaults
@@ -20,22 +16,16 @@ def main():
     print('API base:', api_base)
     print('API key present:', bool(api_key))
 
-    if not APP_PATH.exists():
-        print('app (1).py not found at', APP_PATH)
-        sys.exit(2)
-
-    app = load_app_module(APP_PATH)
-
     # choose a workflow (first available)
-    wf_list = app.list_workflows()
+    wf_list = list_workflows()
     if not wf_list:
-        print('No workflows found in', app.comfyui_flows)
+        print('No workflows found in', WORKFLOWS_DIR)
         selected = None
     else:
         selected = wf_list[0]
 
     # load defaults for selected workflow
-    defaults = app.load_defaults(selected)
+    defaults = load_defaults(selected)
     # defaults ordering in load_defaults: indoor, materials, se34, se48, se53, se58, positive, negative, seed, steps, cfg, sampler, width, height, batch_size, filename_prefix, other_prompts, image_path
     indoor = defaults[0]
     materials = defaults[1]
@@ -59,7 +49,7 @@ def main():
         img = None
 
     print('Running run_workflow with use_api=True, model=gemini-2.5-flash-image, aspect_ratio=16:9')
-    images, captions = app.run_workflow(selected, indoor, materials, se1, se2, se3, se4, positive, negative, seed, steps, cfg, sampler, width, height, batch_size, filename_prefix, other_prompts, str(img) if img else None, use_api=True, api_model='gemini-2.5-flash-image', aspect_ratio='16:9')
+    images, captions = run_workflow(selected, indoor, materials, se1, se2, se3, se4, positive, negative, seed, steps, cfg, sampler, width, height, batch_size, filename_prefix, other_prompts, str(img) if img else None, use_api=True, api_model='gemini-2.5-flash-image', aspect_ratio='16:9')
 
     print('Returned captions:')
     print(captions)
@@ -1,9 +1,13 @@
 import os
+import sys
 import asyncio
 from pathlib import Path
 import json
 
 BASE = Path(__file__).parent
+sys.path.insert(0, str(BASE.parent))
+from interior_flow.model_server import model_url  # noqa: E402
+
 IN_IMG = BASE / 'submit_image_for_tripo.png'
 OUT_DIR = BASE / 'tripo_output'
 OUT_DIR.mkdir(parents=True, exist_ok=True)
@@ -65,7 +69,7 @@ async def main():
             files = await client.download_task_models(task, str(OUT_DIR))
             if files:
                 fn = Path(files[0]).name
-                url = f'http://127.0.0.1:8000/{fn}'
+                url = model_url(fn)
                 LAST_URL.write_text(url, encoding='utf-8')
                 STATUS.write_text('Success. Model ready at ' + url, encoding='utf-8')
                 print('Success. Model URL:', url)
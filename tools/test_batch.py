@@ -0,0 +1,76 @@
+"""Resumable batches (interior_flow/batch.py).
+
+`run_item` is replaced by a fake that only creates the item's run directory, so no
+provider is called. Checks that a second `run_batch()` over the same directory skips
+the items already done, re-runs failed items and items whose sketch changed, runs
+everything with `force`, and that the batch counts as unfinished only while it runs.
+
+Run directly (`python tools/test_batch.py`) or via pytest.
+"""
+import sys
+import tempfile
+from pathlib import Path
+
+BASE = Path(__file__).resolve().parent.parent
+if str(BASE) not in sys.path:
+    sys.path.insert(0, str(BASE))
+
+from interior_flow import batch  # noqa: E402
+from interior_flow.artifacts import new_run  # noqa: E402
+
+
+def _run_batch(items, directory, fail=(), **kwargs):
+    calls = []
+
+    def fake_run_item(b, item, **_kwargs):
+        calls.append(item.id)
+        assert batch.is_unfinished(b.dir)
+        run = new_run(f'item_{item.id}', root=b.dir)
+        if item.id in fail:
+            return batch.ItemResult(item.id, batch.FAILED, run.run_id, error='provider down')
+        return batch.ItemResult(item.id, batch.DONE, run.run_id, (f'{item.id}.png',))
+
+    saved = batch.run_item
+    batch.run_item = fake_run_item
+    try:
+        results = batch.run_batch(items, directory, concurrency=2, **kwargs)
+    finally:
+        batch.run_item = saved
+    return sorted(calls), {r.id: r.status for r in results}
+
+
+def test_resume_skips_completed_items():
+    with tempfile.TemporaryDirectory() as d:
+        sketches = Path(d) / 'sketches'
+        sketches.mkdir()
+        for name in ('a', 'b', 'c'):
+            (sketches / f'{name}.png').write_bytes(name.encode())
+        items = batch.load_items(sketches, layout='two bedrooms', spaces=('living room',))
+        out = Path(d) / 'batch'
+
+        calls, statuses = _run_batch(items, out, fail={'b'})
+        assert calls == ['a', 'b', 'c']
+        assert statuses == {'a': batch.DONE, 'b': batch.FAILED, 'c': batch.DONE}
+        assert not batch.is_unfinished(out)
+
+        # resumed: only the failed item runs again
+        calls, statuses = _run_batch(items, out)
+        assert calls == ['b']
+        assert statuses == {'a': batch.SKIPPED, 'b': batch.DONE, 'c': batch.SKIPPED}
+        skipped = batch.Batch(out).state['items']['a']
+        assert skipped['status'] == batch.DONE and skipped['images'] == ['a.png']
+
+        # a changed sketch is a new item
+        (sketches / 'c.png').write_bytes(b'redrawn')
+        assert _run_batch(batch.load_items(sketches, layout='two bedrooms', spaces=('living room',)), out)[0] == ['c']
+        assert _run_batch(items, out, force=True)[0] == ['a', 'b', 'c']
+        assert '3 items' in (out / 'summary.md').read_text(encoding='utf-8')
+
+
+def main():
+    test_resume_skips_completed_items()
+    print('OK')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+"""Request-shape negotiation (interior_flow/capabilities.py) against a fake endpoint.
+
+Checks that `negotiate()` probes the candidate shapes only until one is accepted,
+then sends the remembered shape alone (also from a new process), that auth, server
+and network errors stop after one request without forgetting that shape, and that
+only a schema error makes it probe the others again.
+
+Run directly (`python tools/test_capabilities.py`) or via pytest.
+"""
+import asyncio
+import sys
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+BASE = Path(__file__).resolve().parent.parent
+if str(BASE) not in sys.path:
+    sys.path.insert(0, str(BASE))
+
+from interior_flow.capabilities import CapabilityCache, NegotiationError, negotiate  # noqa: E402
+
+URL = 'https://api.example/v2/task'
+VARIANTS = {'image/type': 'A', 'file/type': 'B', 'file/payload': 'C'}
+
+
+class FakeEndpoint:
+    """Accepts one shape; answers `error` (a status code or an exception) when set."""
+
+    def __init__(self, accepts: str):
+        self.accepts = accepts
+        self.error = None
+        self.sent = []
+
+    async def send(self, shape):
+        self.sent.append(shape)
+        if isinstance(self.error, Exception):
+            raise self.error
+        if self.error:
+            return SimpleNamespace(status_code=self.error, text='error')
+        ok = shape == self.accepts
+        return SimpleNamespace(status_code=200 if ok else 422, text='ok' if ok else 'unknown field')
+
+    def negotiate(self, cache):
+        self.sent = []
+        return asyncio.run(negotiate(URL, VARIANTS, self.send, cache=cache))
+
+
+def test_reprobes_only_after_schema_error():
+    with tempfile.TemporaryDirectory() as d:
+        path = Path(d) / 'capabilities.json'
+        cache = CapabilityCache(path)
+        endpoint = FakeEndpoint('B')
+        vid, r, attempts = endpoint.negotiate(cache)
+        assert vid == 'file/type' and r.status_code == 200
+        assert endpoint.sent == ['A', 'B'] and len(attempts) == 2
+        # remembered, also by a new process
+        assert endpoint.negotiate(CapabilityCache(path))[0] == 'file/type' and endpoint.sent == ['B']
+
+        for error in (401, 429, 503, ConnectionError('reset')):
+            endpoint.error = error
+            with pytest.raises(NegotiationError) as e:
+                endpoint.negotiate(cache)
+            assert endpoint.sent == ['B'] and len(e.value.attempts) == 1
+            assert cache.get(URL) == 'file/type'
+        endpoint.error = None
+
+        # the endpoint changed its schema: the remembered shape fails, the others are probed
+        endpoint.accepts = 'C'
+        assert endpoint.negotiate(cache)[0] == 'file/payload'
+        assert endpoint.sent == ['B', 'A', 'C']
+        assert CapabilityCache(path).get(URL) == 'file/payload'
+
+        endpoint.accepts = None
+        with pytest.raises(NegotiationError, match='no request shape accepted'):
+            endpoint.negotiate(cache)
+        assert cache.get(URL) is None
+
+
+def main():
+    test_reprobes_only_after_schema_error()
+    print('OK')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,128 @@
+"""Dispatch and failover across ComfyUI backends (interior_flow/comfy_pool.py).
+
+Two backends with fake clients (no network): checks that `submit()` and `stream()`
+move a prompt off a backend that refuses the connection and mark it down, that a
+run failing after it made progress is not retried, and that a graph pinned to a
+backend that is down or rejects it falls back to the self-contained graph.
+
+Run directly (`python tools/test_comfy_pool.py`) or via pytest; skipped when the
+HTTP / websocket clients (httpx, websockets) are not installed.
+"""
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+BASE = Path(__file__).resolve().parent.parent
+if str(BASE) not in sys.path:
+    sys.path.insert(0, str(BASE))
+
+A, B = 'http://gpu1:8188', 'http://gpu2:8188'
+PINNED = {'2': {'class_type': 'LoadImage', 'inputs': {'image': 'out_3.png [output]'}}}
+FULL = {'1': {'class_type': 'EmptyImage', 'inputs': {}}}
+
+
+class FakeClient:
+    """Fails with `error` (before or after one progress update), else runs the graph."""
+
+    def __init__(self, error=None, after_progress=False):
+        self.error = error
+        self.after_progress = after_progress
+        self.graphs = []
+
+    async def queue_prompt(self, graph):
+        if self.error:
+            raise self.error
+        self.graphs.append(graph)
+        return f'p{len(self.graphs)}'
+
+    async def stream(self, graph, output_classes=()):
+        from interior_flow.comfy_client import ComfyUpdate
+
+        if self.error and not self.after_progress:
+            raise self.error
+        self.graphs.append(graph)
+        yield ComfyUpdate('progress', '1', 1, 2)
+        if self.error:
+            raise self.error
+        yield ComfyUpdate('done')
+
+
+def _pool(a: FakeClient, b: FakeClient):
+    pytest.importorskip('httpx')
+    pytest.importorskip('websockets')
+    from interior_flow.comfy_pool import ComfyPool
+
+    pool = ComfyPool([A, B], health_ttl=3600)
+    for backend, client, depth in zip(pool.backends, (a, b), (0, 1)):
+        backend.client = client
+        backend.queue_depth = depth  # gpu1 is picked first
+        backend.checked = time.monotonic()
+    return pool
+
+
+def _stream(pool, graph, **kwargs):
+    async def _run():
+        return [(u.kind, u.node) for u in [u async for u in pool.stream(graph, **kwargs)]]
+    return asyncio.run(_run())
+
+
+def test_submit_fails_over_and_marks_down():
+    pytest.importorskip('websockets')
+    from interior_flow.comfy_client import ComfyConnectionError
+    from interior_flow.comfy_pool import ComfyUnavailable
+
+    pool = _pool(FakeClient(ComfyConnectionError('refused')), FakeClient())
+    lease = asyncio.run(pool.submit(FULL))
+    down, up = pool.backends
+    assert lease.backend is up and lease.prompt_id == 'p1'
+    assert not down.healthy and down.inflight == 0 and up.inflight == 1
+    pool.release(lease)
+    assert up.inflight == 0
+    up.mark_down()
+    with pytest.raises(ComfyUnavailable):
+        asyncio.run(pool.submit(FULL))
+
+
+def test_stream_fails_over_before_progress_only():
+    pytest.importorskip('websockets')
+    from interior_flow.comfy_client import ComfyConnectionError
+
+    pool = _pool(FakeClient(ConnectionResetError('dropped')), FakeClient())
+    assert _stream(pool, FULL) == [('dispatched', A), ('dispatched', B), ('progress', '1'), ('done', '')]
+    assert not pool.backends[0].healthy
+    assert all(b.inflight == 0 for b in pool.backends)
+
+    pool = _pool(FakeClient(ComfyConnectionError('lost'), after_progress=True), FakeClient())
+    with pytest.raises(ComfyConnectionError):
+        _stream(pool, FULL)
+    assert pool.backends[1].client.graphs == []  # a run that made progress is not restarted
+
+
+def test_pinned_graph_falls_back():
+    # the backend holding the reused files is down
+    pool = _pool(FakeClient(), FakeClient())
+    pool.backends[1].mark_down()
+    assert _stream(pool, PINNED, prefer=B, fallback=FULL) == [
+        ('fallback', ''), ('dispatched', A), ('progress', '1'), ('done', '')]
+    assert pool.backends[0].client.graphs == [FULL]
+
+    # the pinned backend is up but rejects the graph (a reused file is gone)
+    pool = _pool(FakeClient(), FakeClient(RuntimeError('invalid prompt')))
+    kinds = _stream(pool, PINNED, prefer=B, fallback=FULL)
+    assert kinds[:2] == [('dispatched', B), ('fallback', '')] and kinds[-1] == ('done', '')
+    assert pool.backends[0].client.graphs == [FULL] and pool.backends[1].healthy
+
+
+def main():
+    for test in (test_submit_fails_over_and_marks_down, test_stream_fails_over_before_progress_only,
+                 test_pinned_graph_falls_back):
+        test()
+        print('ok', test.__name__)
+    print('OK')
+
+
+if __name__ == '__main__':
+    main()
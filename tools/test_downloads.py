@@ -0,0 +1,153 @@
+"""Resumable downloads (interior_flow/downloads.py) against a local HTTP server.
+
+The server drops the connection halfway through the first response; `download()`
+must resume from the `.part` file with a Range / If-Range request, rename the
+complete file into place, and reject results that fail the size or sha256 check.
+A `.part` file left by an earlier process is resumed only with its saved validator;
+without one, or when the validator no longer matches, the file is fetched whole.
+
+Run directly (`python tools/test_downloads.py`) or via pytest; skipped when the
+HTTP client (httpx) is not installed.
+"""
+import asyncio
+import hashlib
+import os
+import socket
+import sys
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+BASE = Path(__file__).resolve().parent.parent
+if str(BASE) not in sys.path:
+    sys.path.insert(0, str(BASE))
+
+DATA = os.urandom(256 * 1024 + 123)
+ETAG = '"v1"'
+
+
+class DroppingHandler(BaseHTTPRequestHandler):
+    """Serves DATA with Range / If-Range support; the first GET is cut off halfway."""
+    protocol_version = 'HTTP/1.1'
+    requests = []
+    drop_first = True
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        self.requests.append(self.headers)
+        rng = self.headers.get('Range')
+        if self.headers.get('If-Range', ETAG) != ETAG:
+            rng = None  # changed since: send the whole file
+        start = int(rng.split('=')[1].split('-')[0]) if rng else 0
+        body = DATA[start:]
+        self.send_response(206 if rng else 200)
+        if rng:
+            self.send_header('Content-Range', f'bytes {start}-{len(DATA) - 1}/{len(DATA)}')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', ETAG)
+        self.end_headers()
+        if self.drop_first and len(self.requests) == 1:
+            self.wfile.write(body[:len(body) // 2])
+            self.wfile.flush()
+            self.close_connection = True
+            self.connection.shutdown(socket.SHUT_RDWR)
+            return
+        self.wfile.write(body)
+
+
+def _serve(drop_first=True):
+    DroppingHandler.requests = []
+    DroppingHandler.drop_first = drop_first
+    server = ThreadingHTTPServer(('127.0.0.1', 0), DroppingHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_port}/model.glb'
+
+
+def _download(*args, **kwargs):
+    from interior_flow.downloads import download
+    from interior_flow.http_pool import aclose_async_clients
+
+    async def _run():
+        try:
+            return await download(*args, **kwargs)
+        finally:
+            await aclose_async_clients()
+
+    return asyncio.run(_run())
+
+
+def test_download_resumes_after_dropped_connection():
+    pytest.importorskip('httpx')
+    server, url = _serve()
+    try:
+        with tempfile.TemporaryDirectory() as d:
+            out = _download(url, d, sha256=hashlib.sha256(DATA).hexdigest())
+            assert out == Path(d) / 'model.glb'
+            assert out.read_bytes() == DATA
+            assert os.listdir(d) == ['model.glb']  # no .part left behind
+            first, second = DroppingHandler.requests[:2]
+            assert 'Range' not in first
+            assert second.get('Range') == f'bytes={len(DATA) // 2}-'
+            assert second.get('If-Range') == ETAG
+    finally:
+        server.shutdown()
+
+
+def test_download_leftover_part_needs_its_validator():
+    pytest.importorskip('httpx')
+    server, url = _serve(drop_first=False)
+    half = len(DATA) // 2
+    try:
+        # current validator: resumed; none: fetched whole; stale: the server sends it whole
+        for validator in (ETAG, None, '"v0"'):
+            DroppingHandler.requests = []
+            with tempfile.TemporaryDirectory() as d:
+                (Path(d) / 'model.glb.part').write_bytes(DATA[:half])
+                if validator:
+                    (Path(d) / 'model.glb.part.validator').write_text(validator)
+                out = _download(url, d)
+                assert out.read_bytes() == DATA
+                assert os.listdir(d) == ['model.glb']
+                first = DroppingHandler.requests[0]
+                assert len(DroppingHandler.requests) == 1
+                if validator:
+                    assert first.get('Range') == f'bytes={half}-' and first.get('If-Range') == validator
+                else:
+                    assert 'Range' not in first
+    finally:
+        server.shutdown()
+
+
+def test_download_rejects_bad_checksum_and_size():
+    pytest.importorskip('httpx')
+    from interior_flow.downloads import DownloadError
+
+    server, url = _serve()
+    try:
+        with tempfile.TemporaryDirectory() as d:
+            with pytest.raises(DownloadError, match='sha256'):
+                _download(url, d, 'a.glb', sha256='00')
+            with pytest.raises(DownloadError, match='expected'):
+                _download(url, d, 'b.glb', size=len(DATA) + 1)
+            assert os.listdir(d) == []
+    finally:
+        server.shutdown()
+
+
+def main():
+    test_download_resumes_after_dropped_connection()
+    print('ok resume after dropped connection')
+    test_download_leftover_part_needs_its_validator()
+    print('ok leftover part file')
+    test_download_rejects_bad_checksum_and_size()
+    print('ok checksum / size mismatch')
+    print('OK')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""Image payloads in provider responses (interior_flow/image_payload.py).
+
+Checks chunked base64 decoding across chunk boundaries, with and without the
+trailing padding, a data URL embedded in markdown text, `b64_json` fields, and the
+fallback to the first image URL.
+
+Run directly (`python tools/test_image_payload.py`) or via pytest.
+"""
+import base64
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+BASE = Path(__file__).resolve().parent.parent
+if str(BASE) not in sys.path:
+    sys.path.insert(0, str(BASE))
+
+from interior_flow import image_payload  # noqa: E402
+from interior_flow.image_payload import ImagePayload, decode_to_file, find_image_payload  # noqa: E402
+
+DATA = os.urandom(1001)  # not a multiple of 3: the encoding ends in padding
+B64 = base64.b64encode(DATA).decode()
+
+
+def test_chunked_decode_with_padding():
+    assert B64.endswith('=')
+    saved = image_payload.CHUNK_CHARS
+    image_payload.CHUNK_CHARS = 4 * 16  # many chunks, the last one short
+    try:
+        with tempfile.TemporaryDirectory() as d:
+            for text in (B64, B64.rstrip('=')):
+                out = decode_to_file(ImagePayload('base64', text, 0, len(text)), Path(d) / 'a.png')
+                assert out.read_bytes() == DATA
+            # wrapped base64 in a raw field
+            wrapped = '\n'.join(B64[i:i + 76] for i in range(0, len(B64), 76))
+            out = decode_to_file(ImagePayload('base64', wrapped, 0, len(wrapped)), Path(d) / 'b.png')
+            assert out.read_bytes() == DATA
+    finally:
+        image_payload.CHUNK_CHARS = saved
+
+
+def test_data_url_inside_markdown():
+    text = f'Here is the render:\n\n![room](data:image/png;base64,{B64}) enjoy'
+    response = {'candidates': [{'content': {'parts': [{'text': 'thinking...'}, {'text': text}]}}]}
+    payload = find_image_payload(response)
+    assert payload.kind == 'base64' and payload.source[payload.start:payload.end] == B64
+    with tempfile.TemporaryDirectory() as d:
+        assert decode_to_file(payload, Path(d) / 'a.png').read_bytes() == DATA
+
+
+def test_b64_field_and_url_fallback():
+    payload = find_image_payload({'data': [{'url': 'https://cdn.example/x.png', 'b64_json': B64}]})
+    assert payload == ImagePayload('base64', B64, 0, len(B64))
+    payload = find_image_payload({'text': 'see https://cdn.example/page and https://cdn.example/out.webp'})
+    assert payload.kind == 'url' and payload.source == 'https://cdn.example/out.webp'
+    assert find_image_payload({'text': 'no image here'}) is None
+
+
+def main():
+    for test in (test_chunked_decode_with_padding, test_data_url_inside_markdown, test_b64_field_and_url_fallback):
+        test()
+        print('ok', test.__name__)
+    print('OK')
+
+
+if __name__ == '__main__':
+    main()
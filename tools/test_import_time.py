@@ -0,0 +1,62 @@
+"""Import-time budget for `app (1).py` and the `interior_flow` entry points.
+
+Loads the app launcher by path (the way the older tools/ scripts do) plus the
+pipeline, workflow, UI and CLI modules in a fresh interpreter and checks that they
+- import within IMPORT_BUDGET_SECONDS (default 1.5), and
+- do not pull in gradio, the LLM/PDF libraries or the ComfyUI/HTTP/Tripo
+  clients; those load on first use.
+
+Run directly (`python tools/test_import_time.py`) or via pytest.
+"""
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+BASE = Path(__file__).resolve().parent.parent
+APP_PATH = BASE / 'app (1).py'
+BUDGET = float(os.environ.get('IMPORT_BUDGET_SECONDS', '1.5'))
+HEAVY_MODULES = ('gradio', 'langchain_ollama', 'pymupdf4llm', 'comfy_api_simplified', 'httpx',
+                 'requests', 'websockets', 'watchdog', 'tripo3d', 'tencentcloud')
+
+PROBE = r'''
+import importlib.util, json, sys, time
+t0 = time.perf_counter()
+spec = importlib.util.spec_from_file_location('app_main', sys.argv[1])
+mod = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(mod)
+import interior_flow.cli, interior_flow.pipeline, interior_flow.ui, interior_flow.workflows
+elapsed = time.perf_counter() - t0
+mod.list_workflows()
+print(json.dumps({'seconds': elapsed, 'modules': sorted(m.split('.')[0] for m in sys.modules)}))
+'''
+
+
+def measure_import():
+    out = subprocess.run([sys.executable, '-c', PROBE, str(APP_PATH)], cwd=str(BASE),
+                         capture_output=True, text=True, timeout=120)
+    if out.returncode != 0:
+        raise RuntimeError(f'importing {APP_PATH.name} failed:\n{out.stderr}')
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def test_app_import_budget():
+    result = measure_import()
+    loaded = sorted(set(HEAVY_MODULES) & set(result['modules']))
+    assert not loaded, f'heavy modules imported at startup: {loaded}'
+    assert result['seconds'] <= BUDGET, f"import took {result['seconds']:.2f}s (budget {BUDGET}s)"
+
+
+def main():
+    result = measure_import()
+    loaded = sorted(set(HEAVY_MODULES) & set(result['modules']))
+    print(f"import {APP_PATH.name}: {result['seconds']:.3f}s (budget {BUDGET}s)")
+    print('heavy modules loaded:', ', '.join(loaded) or 'none')
+    ok = not loaded and result['seconds'] <= BUDGET
+    print('OK' if ok else 'FAILED')
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
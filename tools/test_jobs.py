@@ -0,0 +1,91 @@
+"""Background jobs (interior_flow/jobs.py).
+
+Checks that `subscribe()` yields snapshots in order (progress only ever grows, each
+step is seen, and the final snapshot is last), that failures end the stream with
+the error, that a late subscriber gets the final state at once, and that
+`provider_slot()` caps concurrent provider calls.
+
+Run directly (`python tools/test_jobs.py`) or via pytest.
+"""
+import sys
+import threading
+import time
+from pathlib import Path
+
+BASE = Path(__file__).resolve().parent.parent
+if str(BASE) not in sys.path:
+    sys.path.insert(0, str(BASE))
+
+from interior_flow.jobs import DONE, FAILED, JobManager  # noqa: E402
+
+STEPS = ('layout', 'renders', 'hi-fi')
+
+
+def test_subscribe_yields_in_order():
+    manager = JobManager(max_workers=2)
+    acks = [threading.Event() for _ in STEPS]
+
+    def flow(progress):
+        for step, ack in zip(STEPS, acks):
+            progress(step)
+            assert ack.wait(5)  # the subscriber saw this step
+        return 'result'
+
+    job_id = manager.submit(flow, name='flow')
+    snaps = []
+    for snap in manager.subscribe(job_id, timeout=5):
+        snaps.append(snap)
+        if snap['progress']:
+            acks[len(snap['progress']) - 1].set()
+    progress = [s['progress'] for s in snaps]
+    assert all(a == b[:len(a)] for a, b in zip(progress, progress[1:]))
+    assert [p for p in progress if p][:3] == [['layout'], ['layout', 'renders'], list(STEPS)]
+    assert snaps[-1]['status'] == DONE and snaps[-1]['result'] == 'result'
+    assert all(s['status'] != DONE for s in snaps[:-1])
+
+    # a late subscriber gets the final state once
+    assert [s['status'] for s in manager.subscribe(job_id)] == [DONE]
+
+
+def test_failed_job_ends_stream():
+    manager = JobManager(max_workers=1)
+
+    def broken(progress):
+        progress('starting')
+        raise RuntimeError('provider down')
+
+    snaps = list(manager.subscribe(manager.submit(broken), timeout=5))
+    assert snaps[-1]['status'] == FAILED and snaps[-1]['error'] == 'provider down'
+    assert snaps[-1]['progress'] == ['starting']
+    assert list(manager.subscribe('missing')) == []
+
+
+def test_provider_slots_cap_calls():
+    manager = JobManager(max_workers=4, max_provider_calls=2)
+    lock = threading.Lock()
+    active, peak = [0], [0]
+
+    def call(progress):
+        with manager.provider_slot():
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.1)
+            with lock:
+                active[0] -= 1
+
+    ids = [manager.submit(call) for _ in range(4)]
+    for job_id in ids:
+        assert list(manager.subscribe(job_id, timeout=5))[-1]['status'] == DONE
+    assert peak[0] == 2
+
+
+def main():
+    for test in (test_subscribe_yields_in_order, test_failed_job_ends_stream, test_provider_slots_cap_calls):
+        test()
+        print('ok', test.__name__)
+    print('OK')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+"""The `/models/<name>` route (interior_flow/model_server.py).
+
+`parse_range`, `model_url` and `resolve_model` are checked directly; `serve_model` is
+mounted on a bare Starlette app over a temporary model directory and exercised with
+its test client: full and ranged GETs, 416, 304 revalidation, If-Range, HEAD, gzip
+for `.gltf`, and names that must not resolve. The endpoint must stay a plain
+function, which Starlette runs off the event loop.
+
+Run directly (`python tools/test_model_server.py`) or via pytest; the route tests are
+skipped when Starlette (installed with gradio) is not available.
+"""
+import gzip
+import inspect
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+BASE = Path(__file__).resolve().parent.parent
+if str(BASE) not in sys.path:
+    sys.path.insert(0, str(BASE))
+
+from interior_flow import model_server  # noqa: E402
+from interior_flow.model_server import parse_range  # noqa: E402
+
+DATA = os.urandom(1000)
+GLTF = '{"asset": {"version": "2.0"}}' * 50
+
+
+def test_parse_range():
+    assert parse_range(None, 1000) is None
+    assert parse_range('bytes=100-199', 1000) == (100, 199)
+    assert parse_range('bytes=900-', 1000) == (900, 999)
+    assert parse_range('bytes=990-5000', 1000) == (990, 999)
+    assert parse_range('bytes=-10', 1000) == (990, 999)
+    assert parse_range('bytes=-5000', 1000) == (0, 999)
+    assert parse_range('bytes=1000-', 1000) == 'invalid'
+    assert parse_range('bytes=200-100', 1000) == 'invalid'
+    # malformed and multi-range headers are ignored: the whole file is sent
+    assert parse_range('bytes=-', 1000) is None
+    assert parse_range('bytes=0-1,5-6', 1000) is None
+    assert parse_range('items=0-1', 1000) is None
+
+
+def test_model_url_and_resolve():
+    with tempfile.TemporaryDirectory() as d:
+        saved = model_server.MODEL_DIR, dict(model_server._server)
+        model_server.MODEL_DIR = Path(d)
+        try:
+            model_server.set_server_address('0.0.0.0', 7861)
+            assert model_server.model_url(Path(d) / 'a b.glb') == 'http://127.0.0.1:7861/models/a%20b.glb'
+            (Path(d) / 'a.glb').write_bytes(DATA)
+            assert model_server.resolve_model('a.glb') == Path(d) / 'a.glb'
+            for name in ('', 'missing.glb', '../a.glb', 'sub/a.glb', '.hidden'):
+                assert model_server.resolve_model(name) is None, name
+        finally:
+            model_server.MODEL_DIR = saved[0]
+            model_server._server.update(saved[1])
+
+
+def _client(model_dir: Path):
+    from starlette.applications import Starlette
+    from starlette.testclient import TestClient
+
+    model_server.MODEL_DIR = model_dir
+    (model_dir / 'a.glb').write_bytes(DATA)
+    (model_dir / 's.gltf').write_text(GLTF, encoding='utf-8')
+    return TestClient(model_server.add_model_route(Starlette()))
+
+
+def test_serve_model():
+    pytest.importorskip('starlette.testclient')
+    assert not inspect.iscoroutinefunction(model_server.serve_model)
+    saved = model_server.MODEL_DIR
+    try:
+        with tempfile.TemporaryDirectory() as d:
+            c = _client(Path(d))
+            r = c.get('/models/a.glb')
+            assert r.status_code == 200 and r.content == DATA
+            assert r.headers['content-type'] == 'model/gltf-binary'
+            assert r.headers['accept-ranges'] == 'bytes'
+            etag = r.headers['etag']
+
+            r = c.get('/models/a.glb', headers={'Range': 'bytes=100-199'})
+            assert r.status_code == 206 and r.content == DATA[100:200]
+            assert r.headers['content-range'] == 'bytes 100-199/1000'
+            r = c.get('/models/a.glb', headers={'Range': 'bytes=5000-'})
+            assert r.status_code == 416 and r.headers['content-range'] == 'bytes */1000'
+
+            assert c.get('/models/a.glb', headers={'If-None-Match': etag}).status_code == 304
+            r = c.get('/models/a.glb', headers={'Range': 'bytes=0-9', 'If-Range': '"stale"'})
+            assert r.status_code == 200 and r.content == DATA
+
+            r = c.head('/models/a.glb')
+            assert r.status_code == 200 and r.headers['content-length'] == '1000' and not r.content
+
+            r = c.get('/models/s.gltf', headers={'Accept-Encoding': 'gzip'})
+            assert r.headers['content-encoding'] == 'gzip' and r.text == GLTF
+            assert int(r.headers['content-length']) == len(gzip.compress(GLTF.encode(), compresslevel=6))
+
+            assert c.get('/models/missing.glb').status_code == 404
+            assert c.get('/models/..%2Fa.glb').status_code == 404
+    finally:
+        model_server.MODEL_DIR = saved
+
+
+def main():
+    test_parse_range()
+    test_model_url_and_resolve()
+    print('ok parse_range / model_url / resolve_model')
+    test_serve_model()
+    print('ok serve_model')
+    print('OK')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+"""Adaptive 3D job polling (interior_flow/polling.py).
+
+Checks the percentile window learned from past durations, the delay schedule of
+`next_delay()` before / inside / past that window, and that the shared `Poller`
+checks concurrent jobs of one provider in a single `poll_many` round (the pipeline's
+Tripo jobs share one provider per event loop for that).
+
+Run directly (`python tools/test_polling.py`) or via pytest; the poller test is
+skipped when the HTTP client (httpx, imported by interior_flow.ai3d) is missing.
+"""
+import asyncio
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+BASE = Path(__file__).resolve().parent.parent
+if str(BASE) not in sys.path:
+    sys.path.insert(0, str(BASE))
+
+
+def _polling():
+    pytest.importorskip('httpx')
+    from interior_flow import polling
+    return polling
+
+
+def test_percentile_and_window():
+    polling = _polling()
+    assert polling.percentile([10.0], 0.9) == 10.0
+    assert polling.percentile([0.0, 10.0], 0.5) == 5.0
+    assert polling.percentile([4.0, 1.0, 3.0, 2.0, 5.0], 0.1) == pytest.approx(1.4)
+    with tempfile.TemporaryDirectory() as d:
+        stats = polling.DurationStats(Path(d) / 'durations.json')
+        assert stats.window('tripo') is None
+        stats.record('tripo', 100.0)
+        # few samples: the window is widened on both sides
+        assert stats.window('tripo') == pytest.approx((80.0, 125.0))
+        for s in (60.0, 80.0, 120.0, 140.0):
+            stats.record('tripo', s)
+        assert stats.window('tripo') == pytest.approx((68.0, 132.0))
+        # persisted, and per provider
+        reloaded = polling.DurationStats(Path(d) / 'durations.json')
+        assert reloaded.samples('tripo') == [100.0, 60.0, 80.0, 120.0, 140.0]
+        assert reloaded.window('tencent') is None
+
+
+def test_next_delay():
+    polling = _polling()
+    lo, hi = polling.MIN_DELAY, polling.MAX_DELAY
+    # no history: a quarter of the job's age, within bounds
+    assert polling.next_delay(0, None) == lo
+    assert polling.next_delay(40, None) == min(hi, max(lo, 10))
+    assert polling.next_delay(10_000, None) == hi
+    window = (100.0, 200.0)
+    # before the window: half the remaining time, so checks get denser as it approaches
+    assert polling.next_delay(60, window) == min(hi, max(lo, 20))
+    assert polling.next_delay(96, window) == lo
+    # inside it: about ten checks per window
+    assert polling.next_delay(150, window) == min(hi, max(lo, 10))
+    # past it: back off with the overrun
+    assert polling.next_delay(220, window) == min(hi, max(lo, 10))
+    assert polling.next_delay(5_000, window) == hi
+
+
+def test_poller_batches_jobs_of_one_provider():
+    polling = _polling()
+    from interior_flow.ai3d import RUNNING, SUCCESS, JobStatus, Provider3D
+
+    class FakeProvider(Provider3D):
+        name = 'fake'
+
+        def __init__(self):
+            self.rounds = []
+
+        async def poll_many(self, job_ids):
+            self.rounds.append(sorted(job_ids))
+            state = SUCCESS if len(self.rounds) >= 2 else RUNNING
+            return {j: JobStatus(j, state, 100 if state == SUCCESS else 50) for j in job_ids}
+
+    saved = polling.MIN_DELAY, polling.MAX_DELAY
+    polling.MIN_DELAY, polling.MAX_DELAY = 0.02, 0.05
+    try:
+        with tempfile.TemporaryDirectory() as d:
+            provider = FakeProvider()
+            poller = polling.Poller(polling.DurationStats(Path(d) / 'durations.json'))
+
+            async def _main():
+                return await asyncio.gather(*(poller.wait(provider, j, timeout=5) for j in ('a', 'b', 'c')))
+
+            statuses = asyncio.run(_main())
+            assert [s.state for s in statuses] == [SUCCESS] * 3
+            assert provider.rounds == [['a', 'b', 'c'], ['a', 'b', 'c']]
+            assert poller.queries == 6
+            assert len(poller.stats.samples('fake')) == 3
+    finally:
+        polling.MIN_DELAY, polling.MAX_DELAY = saved
+
+
+def test_tripo_jobs_share_one_provider_per_loop():
+    pytest.importorskip('httpx')
+    from interior_flow.ai3d import tripo_provider
+
+    async def _providers():
+        return tripo_provider('key-1'), tripo_provider('key-1'), tripo_provider('key-2')
+
+    a, b, c = asyncio.run(_providers())
+    assert a is b and a is not c
+    assert asyncio.run(_providers())[0] is not a  # another loop gets its own
+
+
+def main():
+    for test in (test_percentile_and_window, test_next_delay, test_poller_batches_jobs_of_one_provider,
+                 test_tripo_jobs_share_one_provider_per_loop):
+        test()
+        print('ok', test.__name__)
+    print('OK')
+
+
+if __name__ == '__main__':
+    main()
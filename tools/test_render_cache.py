@@ -0,0 +1,80 @@
+"""The on-disk render cache (interior_flow/render_cache.py).
+
+Checks that `get_or_create()` calls the model once per key and serves later calls
+from the cache (as a separate file the caller may delete), that `force` calls it
+again and replaces the entry, that rejected outputs are not stored, and that the
+size bound evicts the least recently used entry, where a hit counts as a use.
+
+Run directly (`python tools/test_render_cache.py`) or via pytest.
+"""
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BASE = Path(__file__).resolve().parent.parent
+if str(BASE) not in sys.path:
+    sys.path.insert(0, str(BASE))
+
+from interior_flow.render_cache import RenderCache, cache_key  # noqa: E402
+
+
+def _producer(d: Path, data: bytes, calls: list):
+    def produce():
+        calls.append(data)
+        out = d / f'render_{len(calls)}.png'
+        out.write_bytes(data)
+        return str(out)
+    return produce
+
+
+def test_hit_and_force():
+    with tempfile.TemporaryDirectory() as d:
+        d = Path(d)
+        cache = RenderCache(d / 'cache', max_bytes=1024 * 1024)
+        sketch = d / 'sketch.png'
+        sketch.write_bytes(b'sketch')
+        key = cache_key('gemini', 'living room', sketch, '16:9')
+        assert key != cache_key('gemini', 'bedroom', sketch, '16:9')
+        calls = []
+        first = cache.get_or_create(key, _producer(d, b'v1', calls), d / 'out')
+        hit = cache.get_or_create(key, _producer(d, b'v2', calls), d / 'out')
+        assert calls == [b'v1']
+        assert hit != first and Path(hit).parent == d / 'out' and Path(hit).read_bytes() == b'v1'
+        os.unlink(hit)  # the caller owns the materialized file
+        assert cache.get(key).read_bytes() == b'v1'
+
+        forced = cache.get_or_create(key, _producer(d, b'v2', calls), d / 'out', force=True)
+        assert calls == [b'v1', b'v2'] and Path(forced).read_bytes() == b'v2'
+        assert cache.get(key).read_bytes() == b'v2'
+
+        other = cache_key('gemini', 'kitchen', sketch)
+        cache.get_or_create(other, _producer(d, b'bad', calls), d / 'out', cacheable=lambda out: False)
+        assert cache.get(other) is None
+
+
+def test_lru_eviction():
+    with tempfile.TemporaryDirectory() as d:
+        d = Path(d)
+        cache = RenderCache(d / 'cache', max_bytes=250)
+        src = d / 'src.png'
+        src.write_bytes(b'x' * 100)
+        now = time.time()
+        for age, key in ((30, 'aa' + '1' * 62), (20, 'bb' + '2' * 62)):
+            os.utime(cache.put(key, src), (now - age, now - age))
+        assert cache.get('aa' + '1' * 62)  # a hit makes the older entry the most recent
+        cache.put('cc' + '3' * 62, src)
+        assert cache.get('bb' + '2' * 62) is None
+        assert cache.get('aa' + '1' * 62) and cache.get('cc' + '3' * 62)
+
+
+def main():
+    for test in (test_hit_and_force, test_lru_eviction):
+        test()
+        print('ok', test.__name__)
+    print('OK')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+"""Retention policies: which entries match, and which are kept.
+
+Builds run directories, tools/-style files and batch directories in a temporary
+directory with backdated mtimes, then applies copies of the `runs`, `batches` and
+`generated` policies pointed at it.
+
+Run directly (`python tools/test_retention.py`) or via pytest.
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BASE = Path(__file__).resolve().parent.parent
+if str(BASE) not in sys.path:
+    sys.path.insert(0, str(BASE))
+
+from interior_flow import retention  # noqa: E402
+
+DAY = retention.DAY
+
+
+def _policy(name: str, root: Path) -> retention.Policy:
+    return next(p for p in retention.POLICIES if p.name == name)._replace(root=root)
+
+
+def _make(path: Path, age_days: float, size: int = 10, is_dir: bool = False) -> Path:
+    when = time.time() - age_days * DAY
+    if is_dir:
+        path.mkdir(parents=True)
+        (path / 'manifest.json').write_bytes(b'x' * size)
+        os.utime(path / 'manifest.json', (when, when))
+    else:
+        path.write_bytes(b'x' * size)
+    os.utime(path, (when, when))
+    return path
+
+
+def _batch(root: Path, name: str, age_days: float, finished: bool) -> Path:
+    d = root / name
+    d.mkdir()
+    (d / 'batch.json').write_text(json.dumps({'items': {}, 'finished': time.time() if finished else None}),
+                                  encoding='utf-8')
+    for p in (d / 'batch.json', d):
+        os.utime(p, (time.time() - age_days * DAY,) * 2)
+    return d
+
+
+def test_runs_policy_matches_run_workflow_and_sweep_dirs():
+    with tempfile.TemporaryDirectory() as d:
+        root = Path(d)
+        old = [_make(root / f'{prefix}_old', 30, is_dir=True) for prefix in ('run', 'workflow', 'sweep')]
+        new = _make(root / 'run_new', 1, is_dir=True)
+        other = _make(root / 'batch_old', 30, is_dir=True)  # another policy's entry
+        removed = retention.apply_policy(_policy('runs', root))
+        assert sorted(r.path for r in removed) == sorted(old)
+        assert all(r.reason == 'age' for r in removed)
+        assert new.exists() and other.exists()
+
+
+def test_count_bound_keeps_newest_and_protected():
+    with tempfile.TemporaryDirectory() as d:
+        root = Path(d)
+        files = [_make(root / f'generated_api_{i}.png', 1 + i * 0.01) for i in range(5)]
+        policy = _policy('generated', root)._replace(max_count=2)
+        removed = retention.apply_policy(policy, protect=[files[4]])
+        assert sorted(r.path for r in removed) == sorted(files[2:4])
+        assert all(r.reason == 'count' for r in removed)
+
+
+def test_grace_period_and_dry_run():
+    with tempfile.TemporaryDirectory() as d:
+        root = Path(d)
+        fresh = _make(root / 'generated_api_fresh.png', 0)
+        stale = _make(root / 'generated_api_stale.png', 30)
+        policy = _policy('generated', root)._replace(max_count=0)
+        removed = retention.apply_policy(policy, dry_run=True)
+        assert [r.path for r in removed] == [stale]
+        assert fresh.exists() and stale.exists()
+
+
+def test_unfinished_batches_are_kept():
+    with tempfile.TemporaryDirectory() as d:
+        root = Path(d)
+        done = _batch(root, 'batch_done', 60, finished=True)
+        running = _batch(root, 'batch_running', 60, finished=False)
+        removed = retention.apply_policy(_policy('batches', root))
+        assert [r.path for r in removed] == [done]
+        assert running.exists()
+
+
+def main():
+    for test in (test_runs_policy_matches_run_workflow_and_sweep_dirs, test_count_bound_keeps_newest_and_protected,
+                 test_grace_period_and_dry_run, test_unfinished_batches_are_kept):
+        test()
+        print('ok', test.__name__)
+    print('OK')
+
+
+if __name__ == '__main__':
+    main()
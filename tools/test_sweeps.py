@@ -0,0 +1,93 @@
+"""Parameter sweeps (interior_flow/sweeps.py) over the shipped workflow.
+
+Runs `run_sweep()` on workflows/api_google_gemini_image.json, with a fake ComfyUI
+pool that answers every prompt with one image per output node, and checks that each
+variant gets its parameters applied and collects the images of every SaveImage /
+PreviewImage node (the shipped workflow titles them "保存图像", not "Save Image").
+
+Run directly (`python tools/test_sweeps.py`) or via pytest.
+"""
+import asyncio
+import sys
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
+
+BASE = Path(__file__).resolve().parent.parent
+if str(BASE) not in sys.path:
+    sys.path.insert(0, str(BASE))
+
+from interior_flow.artifacts import new_run  # noqa: E402
+from interior_flow.sweeps import expand_grid, parse_values, run_sweep  # noqa: E402
+from interior_flow.workflow_templates import load_template  # noqa: E402
+
+WORKFLOW = BASE / 'workflows' / 'api_google_gemini_image.json'
+
+
+class FakeClient:
+    def __init__(self):
+        self.graphs = {}
+
+    async def wait(self, prompt_id):
+        pass
+
+    async def get_history(self, prompt_id):
+        graph = self.graphs[prompt_id]
+        # one image per node that ComfyUI lists with images, output or not
+        outputs = {nid: {'images': [{'filename': f'{prompt_id}_{nid}.png', 'subfolder': '', 'type': 'output'}]}
+                   for nid, node in graph.items() if node['class_type'] in ('SaveImage', 'PreviewImage', 'Preview3D')}
+        return {prompt_id: {'outputs': outputs}}
+
+    async def get_image(self, filename, subfolder='', folder_type='output'):
+        return filename.encode()
+
+
+class FakePool:
+    def __init__(self):
+        self.client = FakeClient()
+        self.backend = SimpleNamespace(url='http://fake:8188')
+        self.released = 0
+
+    async def submit(self, graph):
+        prompt_id = f'p{len(self.client.graphs)}'
+        self.client.graphs[prompt_id] = graph
+        return SimpleNamespace(backend=self.backend, client=self.client, prompt_id=prompt_id, workflow=graph)
+
+    def release(self, lease):
+        self.released += 1
+
+
+def run_shipped_sweep(tmp: Path):
+    template = load_template(WORKFLOW)
+    variants = expand_grid({'seed': parse_values('seed', '1-2'), 'aspect_ratio': ['16:9', '1:1']})
+    pool = FakePool()
+    run = new_run('sweep', root=tmp)
+    results = asyncio.run(run_sweep(pool, template.edit(), variants, run))
+    return template, pool, results
+
+
+def test_sweep_collects_every_image_output():
+    with tempfile.TemporaryDirectory() as d:
+        template, pool, results = run_shipped_sweep(Path(d))
+        outputs = sorted(template.by_class['SaveImage'] + template.by_class['PreviewImage'])
+        assert len(outputs) == 7
+        assert len(results) == 4 and pool.released == 4
+        for i, res in enumerate(results):
+            assert res.error == '', res.error
+            assert res.index == i
+            assert sorted(Path(p).name.split('_')[2] for p in res.images) == outputs
+            assert all(Path(p).read_bytes() == Path(p).name.split('_', 3)[3].encode() for p in res.images)
+            graph = pool.client.graphs[f'p{i}']
+            for nid in template.by_input['seed']:
+                assert graph[nid]['inputs']['seed'] == res.params['seed']
+        # the template itself is never changed by a sweep
+        assert template.graph['5']['inputs']['seed'] == 544758004681276
+
+
+def main():
+    test_sweep_collects_every_image_output()
+    print('OK')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+"""The pipeline's 3D job end to end, with a fake provider instead of Tripo.
+
+Runs `interior_flow.pipeline.tripo_job()` on a fresh event loop and checks that the
+model it downloads is served under `/models/<name>`, and that this URL lands in the
+status store and in the run manifest. Also checks that Tripo HTTP error answers end
+the job as failed instead of leaving it running. Output, status files and duration stats go to
+a temporary directory.
+
+Run directly (`python tools/test_tripo_job.py`) or via pytest; skipped when the
+HTTP client (httpx) is not installed.
+"""
+import asyncio
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+BASE = Path(__file__).resolve().parent.parent
+if str(BASE) not in sys.path:
+    sys.path.insert(0, str(BASE))
+
+
+def run_fake_job(tmp: Path):
+    from interior_flow import ai3d, pipeline, polling
+    from interior_flow.artifacts import new_run
+    from interior_flow.status import StatusStore
+
+    class FakeProvider(ai3d.Provider3D):
+        name = 'fake'
+
+        async def submit(self, image, prompt=''):
+            return 'job1'
+
+        async def poll(self, job_id):
+            return ai3d.JobStatus(job_id, ai3d.SUCCESS, 100, ('https://example.invalid/job1.glb',), {'status': 'success'})
+
+        async def download(self, status, outdir):
+            out = Path(outdir) / f'{status.job_id}.glb'
+            out.write_bytes(b'glTF')
+            return [out]
+
+    image = tmp / 'hifi.png'
+    image.write_bytes(b'png')
+    store = StatusStore(tmp / 'tripo_status.txt', tmp / 'last_model_url.txt')
+    saved = (pipeline.model_status, pipeline.TRIPO_OUTPUT_DIR, polling._stats, polling.MIN_DELAY)
+    pipeline.model_status = store
+    pipeline.TRIPO_OUTPUT_DIR = tmp
+    polling._stats = polling.DurationStats(tmp / 'durations.json')
+    polling.MIN_DELAY = 0.01
+    try:
+        run = new_run('test', root=tmp / 'runs')
+        asyncio.run(pipeline.tripo_job(run, str(image), 'test-key', provider=FakeProvider()))
+    finally:
+        pipeline.model_status, pipeline.TRIPO_OUTPUT_DIR, polling._stats, polling.MIN_DELAY = saved
+    return run, store.snapshot()
+
+
+def test_tripo_job_serves_model():
+    pytest.importorskip('httpx')
+    from interior_flow.model_server import model_url
+
+    with tempfile.TemporaryDirectory() as d:
+        run, snap = run_fake_job(Path(d))
+        url = model_url('job1.glb')
+        assert snap.model_url == url, snap
+        assert snap.status == 'Tripo: success. Model ready at ' + url
+        assert run.latest('model') == Path(d) / 'job1.glb'
+        manifest = json.loads(run.manifest_path.read_text(encoding='utf-8'))
+        entry = [a for a in manifest['artifacts'] if a['kind'] == 'model'][-1]
+        assert entry['url'] == url and entry['task_id'] == 'job1' and entry['source'] == 'fake'
+
+
+def test_tripo_http_poll_maps_errors_to_failed():
+    httpx = pytest.importorskip('httpx')
+    from interior_flow import ai3d
+
+    class FakeHTTP:
+        def __init__(self, response):
+            self.response = response
+
+        async def get(self, url, headers=None):
+            return self.response
+
+    def poll(status_code, body):
+        provider = ai3d.TripoHTTP('test-key')
+        ai3d.TripoHTTP.http = FakeHTTP(httpx.Response(status_code, json=body))
+        return asyncio.run(provider.poll('job1'))
+
+    saved = ai3d.TripoHTTP.http
+    try:
+        ok = poll(200, {'code': 0, 'data': {'status': 'running', 'progress': 40}})
+        assert ok.state == ai3d.RUNNING and ok.progress == 40
+        assert poll(200, {'code': 2001, 'message': 'task not found'}).state == ai3d.FAILED
+        assert poll(403, {'message': 'forbidden'}).state == ai3d.FAILED
+        # rate limits and server errors are retried by the poller
+        assert poll(503, {}).state == ai3d.RUNNING
+    finally:
+        ai3d.TripoHTTP.http = saved
+
+
+def main():
+    with tempfile.TemporaryDirectory() as d:
+        run, snap = run_fake_job(Path(d))
+        print('status:', snap.status)
+        print('manifest model:', run.latest('model'))
+    test_tripo_job_serves_model()
+    test_tripo_http_poll_maps_errors_to_failed()
+    print('OK')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+"""Incremental re-execution planning (interior_flow/workflow_graph.py).
+
+A small graph with two branches off one LoadImage: a colored-floorplan producer
+feeding an effect render, and an independent render. Checks that `plan_run()`
+- marks exactly the edited node and everything downstream of it dirty,
+- replaces a clean producer feeding dirty nodes by a LoadImage of its saved file,
+- prunes everything the dirty outputs do not need and keeps clean outputs cached,
+- treats a new upload saved under the same file name as a change,
+and that the run memory is kept per session.
+
+Run directly (`python tools/test_workflow_graph.py`) or via pytest.
+"""
+import copy
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BASE = Path(__file__).resolve().parent.parent
+if str(BASE) not in sys.path:
+    sys.path.insert(0, str(BASE))
+
+from interior_flow.workflow_graph import WorkflowMemory, memory_key, plan_run, signatures  # noqa: E402
+
+
+def _graph(sketch: Path) -> dict:
+    def gemini(src, prompt):
+        return {'class_type': 'GeminiImageNode', 'inputs': {'images': [src, 0], 'prompt': prompt}}
+
+    def save(src):
+        return {'class_type': 'SaveImage', 'inputs': {'images': [src, 0], 'filename_prefix': 'ComfyUI'}}
+
+    return {
+        '1': {'class_type': 'LoadImage', 'inputs': {'image': str(sketch)}},
+        '2': gemini('1', 'colored floorplan'),
+        '3': save('2'),
+        '4': gemini('2', 'living room'),
+        '5': save('4'),
+        '6': gemini('1', 'bedroom'),
+        '7': save('6'),
+    }
+
+
+def _memory(graph: dict) -> dict:
+    ref = {'subfolder': '', 'type': 'output'}
+    outputs = {nid: {'refs': [dict(ref, filename=f'out_{nid}.png')], 'images': []} for nid in ('3', '5', '7')}
+    return {'backend': 'http://gpu1:8188', 'signatures': signatures(graph), 'outputs': outputs}
+
+
+def _sketch(d: str, data: bytes) -> Path:
+    p = Path(d) / 'sketch.png'
+    p.write_bytes(data)
+    return p
+
+
+def test_edit_dirties_downstream_and_reuses_clean_producer():
+    with tempfile.TemporaryDirectory() as d:
+        graph = _graph(_sketch(d, b'sketch v1'))
+        last = _memory(graph)
+        edited = copy.deepcopy(graph)
+        edited['4']['inputs']['prompt'] = 'kitchen'
+        plan = plan_run(edited, last)
+        assert plan.dirty == {'4', '5'}
+        assert plan.incremental and plan.backend == 'http://gpu1:8188'
+        # the floorplan producer is clean: fed back in from the file it saved last time
+        assert plan.reused == {'2': 'out_3.png [output]'}
+        assert plan.graph['2']['class_type'] == 'LoadImage'
+        assert plan.graph['2']['inputs'] == {'image': 'out_3.png [output]'}
+        # only what the dirty output needs is submitted; clean outputs keep their images
+        assert set(plan.graph) == {'2', '4', '5'}
+        assert set(plan.cached_outputs) == {'3', '7'}
+        assert plan.full_graph is edited
+
+
+def test_unchanged_graph_runs_nothing_and_first_run_runs_everything():
+    with tempfile.TemporaryDirectory() as d:
+        graph = _graph(_sketch(d, b'sketch v1'))
+        plan = plan_run(graph, _memory(graph))
+        assert plan.graph is None and not plan.dirty
+        assert set(plan.cached_outputs) == {'3', '5', '7'}
+        first = plan_run(graph, None)
+        assert first.graph is graph and first.dirty == set(graph)
+
+
+def test_new_upload_under_same_name_is_a_change():
+    with tempfile.TemporaryDirectory() as d:
+        sketch = _sketch(d, b'sketch v1')
+        graph = _graph(sketch)
+        last = _memory(graph)
+        sketch.write_bytes(b'another sketch')
+        later = time.time() + 5
+        os.utime(sketch, (later, later))
+        plan = plan_run(_graph(sketch), last)
+        assert plan.dirty == set(graph)
+        assert plan.graph is not None and not plan.reused
+
+
+def test_memory_is_per_session():
+    memory = WorkflowMemory(max_entries=2)
+    memory.remember(memory_key('wf.json', 'a'), 'b1', {'1': 'x'}, {})
+    assert memory.last(memory_key('wf.json', 'b')) is None
+    assert memory.last(memory_key('wf.json', 'a'))['backend'] == 'b1'
+    memory.remember(memory_key('wf.json', 'b'), 'b2', {}, {})
+    memory.remember(memory_key('wf.json', 'c'), 'b3', {}, {})
+    assert memory.last(memory_key('wf.json', 'a')) is None  # least recently used, dropped
+
+
+def main():
+    for test in (test_edit_dirties_downstream_and_reuses_clean_producer,
+                 test_unchanged_graph_runs_nothing_and_first_run_runs_everything,
+                 test_new_upload_under_same_name_is_a_change, test_memory_is_per_session):
+        test()
+        print('ok', test.__name__)
+    print('OK')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,7 +1,19 @@
+"""Find the payload shape the nanoapi image endpoint accepts for each model.
+
+Uses the app's negotiation (interior_flow/capabilities.py): the shape recorded in
+tools/provider_capabilities.json for a model is tried first, the others only after
+a schema error, and the accepted one is recorded. `--reprobe` forgets them first.
+"""
 import os
+import sys
 import json
 import base64
-import httpx
+import asyncio
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from interior_flow.capabilities import NegotiationError, get_capabilities, negotiate  # noqa: E402
+from interior_flow.http_pool import get_async_client  # noqa: E402
 
 API_URL = os.getenv('NANO_API_URL', 'https://nanoapi.poloai.top').rstrip('/')
 API_KEY = os.getenv('NANO_API_KEY') or os.getenv('NANOAPI_KEY') or os.getenv('NANO_API_TOKEN')
@@ -11,7 +23,6 @@ if not API_KEY:
     raise SystemExit(1)
 
 headers = {'Authorization': f'Bearer {API_KEY}', 'Content-Type': 'application/json'}
-client = httpx.Client(timeout=60.0)
 
 models = [
     'gemini-2.5-flash-image',
@@ -21,16 +32,17 @@ models = [
 
 prompt = 'Create a picture of a nano banana dish in a fancy restaurant with a Gemini theme'
 
-payload_variants = [
-    lambda m: {'model': m, 'prompt': prompt, 'size': '1024x1024'},
-    lambda m: {'model': m, 'text_prompts': [{'text': prompt}], 'size': '1024x1024'},
-    lambda m: {'model': m, 'input': prompt},
-    lambda m: {'model': m, 'prompts': prompt},
-    lambda m: {'model': m, 'prompt': [{'text': prompt}]},
-]
+payload_variants = {
+    'prompt': lambda m: {'model': m, 'prompt': prompt, 'size': '1024x1024'},
+    'text_prompts': lambda m: {'model': m, 'text_prompts': [{'text': prompt}], 'size': '1024x1024'},
+    'input': lambda m: {'model': m, 'input': prompt},
+    'prompts': lambda m: {'model': m, 'prompts': prompt},
+    'prompt_list': lambda m: {'model': m, 'prompt': [{'text': prompt}]},
+}
 
 endpoint = API_URL + '/v1/images/generations'
 
+
 def save_b64(b64, fname):
     try:
         data = base64.b64decode(b64)
@@ -40,47 +52,57 @@ def save_b64(b64, fname):
     except Exception as e:
         print('Failed to save', fname, e)
 
-print('Testing image generation endpoint:', endpoint)
-for model in models:
-    for i, pv in enumerate(payload_variants):
-        payload = pv(model)
-        print('\n== Trying model:', model, 'variant', i)
+
+def find_b64_urls(obj):
+    b64s = []
+    urls = []
+    if isinstance(obj, dict):
+        for k, v in obj.items():
+            if k == 'b64_json' and isinstance(v, str):
+                b64s.append(v)
+            if k in ('url', 'image_url') and isinstance(v, str):
+                urls.append(v)
+            bs, us = find_b64_urls(v)
+            b64s.extend(bs); urls.extend(us)
+    elif isinstance(obj, list):
+        for it in obj:
+            bs, us = find_b64_urls(it)
+            b64s.extend(bs); urls.extend(us)
+    return b64s, urls
+
+
+async def main():
+    print('Testing image generation endpoint:', endpoint)
+    client = get_async_client(endpoint)
+
+    async def _send(payload):
         print('Payload:', json.dumps(payload, ensure_ascii=False))
+        return await client.post(endpoint, headers=headers, json=payload, timeout=60.0)
+
+    for model in models:
+        key = f'{endpoint}#{model}'
+        if '--reprobe' in sys.argv:
+            get_capabilities().forget(key)
+        print('\n== Model:', model, 'known shape:', get_capabilities().get(key) or 'none (probing)')
         try:
-            r = client.post(endpoint, headers=headers, json=payload)
-            print('Status:', r.status_code)
-            ct = r.headers.get('content-type','')
-            if 'application/json' in ct:
-                data = r.json()
-                print('Response JSON (truncated):', json.dumps(data, ensure_ascii=False)[:2000])
-                # Try to find b64_json or url
-                def find_b64_urls(obj):
-                    b64s = []
-                    urls = []
-                    if isinstance(obj, dict):
-                        for k,v in obj.items():
-                            if k == 'b64_json' and isinstance(v, str):
-                                b64s.append(v)
-                            if k in ('url','image_url') and isinstance(v, str):
-                                urls.append(v)
-                            bs, us = find_b64_urls(v)
-                            b64s.extend(bs); urls.extend(us)
-                    elif isinstance(obj, list):
-                        for it in obj:
-                            bs, us = find_b64_urls(it)
-                            b64s.extend(bs); urls.extend(us)
-                    return b64s, urls
-
-                b64s, urls = find_b64_urls(data)
-                if b64s:
-                    for idx, b in enumerate(b64s):
-                        save_b64(b, f'generated_nano_{model}_{i}_{idx}.png')
-                if urls:
-                    for idx, u in enumerate(urls):
-                        print('Found URL:', u)
-            else:
-                print('Text response (truncated):', r.text[:1000])
-        except Exception as e:
-            print('Exception for model', model, 'variant', i, e)
-
-print('\nDone testing image variants.')
+            variant, r, attempts = await negotiate(key, {k: pv(model) for k, pv in payload_variants.items()}, _send)
+        except NegotiationError as e:
+            print('No shape accepted for', model, '-', e)
+            continue
+        print('Accepted shape:', variant, 'after', len(attempts), 'request(s)')
+        ct = r.headers.get('content-type', '')
+        if 'application/json' not in ct:
+            print('Text response (truncated):', r.text[:1000])
+            continue
+        data = r.json()
+        print('Response JSON (truncated):', json.dumps(data, ensure_ascii=False)[:2000])
+        b64s, urls = find_b64_urls(data)
+        for idx, b in enumerate(b64s):
+            save_b64(b, f'generated_nano_{model}_{variant}_{idx}.png')
+        for u in urls:
+            print('Found URL:', u)
+
+    print('\nDone testing image variants.')
+
+
+asyncio.run(main())